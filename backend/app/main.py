@@ -1,24 +1,59 @@
+import asyncio
 import logging
 import os
 import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 
+from .routers.analyze import router as analyze_router
 from .routers.health import router as health_router
-from .routers.parse import router as parse_router
 from .routers.interpret import router as interpret_router
+from .routers.jobs import router as jobs_router
+from .routers.metrics import router as metrics_router
+from .routers.parse import router as parse_router
+from .services.access_log import (
+    configure_logging,
+    get_access_log,
+    request_id,
+    start_access_log,
+    stop_access_log,
+)
+from .services.jobs import start_job_runner, stop_job_runner
+from .services.llm import close_http_client, get_interpret_cache, start_http_client
+from .services.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+from .services.parse_cache import get_parse_cache
+from .services.profiling import start_profile, stop_profile
+from .services.uploads import configure_multipart
+from .services.warmup import start_warm_up, stop_warm_up
+from .services.workers import shutdown_pools
+
+METRIC_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
 
 
 def get_frontend_origin() -> str:
     return os.getenv("FRONTEND_URL", "http://localhost:3000").rstrip("/")
 
 
+def _route_template(scope) -> str:
+    # The matched path with each path parameter put back as {name}. Built from the path
+    # itself because included routers may not carry their prefix in route.path.
+    if scope.get("route") is None:
+        return "unmatched"
+    params = {str(v): k for k, v in (scope.get("path_params") or {}).items()}
+    if not params:
+        return scope.get("path", "")
+    return "/".join(
+        f"{{{params[seg]}}}" if seg in params else seg for seg in scope.get("path", "").split("/")
+    )
+
+
 class PHIScrubbedLoggingMiddleware:
     def __init__(self, app: FastAPI) -> None:
         self.app = app
-        # Configure basic structured-ish logging
-        logging.basicConfig(level=logging.INFO, format="%(message)s")
+        # Records are written as JSON lines off the event loop; see services/access_log.py
         self.logger = logging.getLogger("reportrx.backend")
 
     async def __call__(self, scope, receive, send):
@@ -29,30 +64,88 @@ class PHIScrubbedLoggingMiddleware:
         path = scope.get("path")
         start = time.perf_counter()
         status_code_holder = {"status": None}
+        request_headers = dict(scope.get("headers") or [])
+        # Echoed back and logged, so a client can quote it when reporting a problem
+        rid = request_id(request_headers)
+        # Operator-only; see app/services/profiling.py
+        profile = start_profile(request_headers)
 
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
                 status_code_holder["status"] = message.get("status", 0)
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-request-id", rid.encode("ascii")))
+                if profile is not None:
+                    headers.append((b"x-profile-id", profile.id.encode("ascii")))
+                message = {**message, "headers": headers}
             await send(message)
 
+        HTTP_IN_FLIGHT.inc()
         try:
             await self.app(scope, receive, send_wrapper)
         finally:
-            duration_ms = int((time.perf_counter() - start) * 1000)
-            # Intentionally avoid logging headers, bodies, or files
-            self.logger.info(
-                {
-                    "event": "http_request",
-                    "method": method,
-                    "path": path,
-                    "status": status_code_holder["status"],
-                    "duration_ms": duration_ms,
-                }
-            )
+            HTTP_IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - start
+            duration_ms = int(elapsed * 1000)
+            self._record_metrics(scope, status_code_holder["status"], elapsed)
+            if profile is not None:
+                stop_profile(profile)
+                await self._write_profile(profile, scope, status_code_holder["status"], duration_ms)
+            # Intentionally avoid logging headers, bodies, or files. Paths with parameters
+            # are logged as their template: a job id is the key to that job's result.
+            if scope.get("path_params"):
+                path = _route_template(scope)
+            if self.logger.isEnabledFor(logging.INFO):
+                status = status_code_holder["status"]
+                get_access_log().http(method, path, status, duration_ms, rid)
+
+    async def _write_profile(self, profile, scope, status, duration_ms: int) -> None:
+        details = {
+            "method": scope.get("method"),
+            "route": _route_template(scope),
+            "status": status,
+            "duration_ms": duration_ms,
+        }
+        try:
+            await asyncio.to_thread(profile.write, details)
+        except OSError as e:
+            self.logger.warning({"event": "profile_write_failed", "error": type(e).__name__})
+
+    @staticmethod
+    def _record_metrics(scope, status, elapsed: float) -> None:
+        # Label by route template, never the raw path, and by a fixed set of methods, so
+        # label values cannot carry request data
+        route = _route_template(scope)
+        method = scope.get("method") if scope.get("method") in METRIC_METHODS else "other"
+        HTTP_REQUESTS.inc(method, route, str(status or 500))
+        HTTP_LATENCY.observe(elapsed, method, route)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Shared LLM connection pool lives for the whole app. Worker pools, PyMuPDF and the
+    # first upstream connection are warmed in the background (see /api/v1/ready), so
+    # startup itself does not wait on them. Job workers resume anything left queued or
+    # running by a previous process. The log writer thread flushes what is queued on exit.
+    # Caches are opened here so a refused disk tier is logged when the app starts.
+    start_access_log()
+    get_parse_cache()
+    get_interpret_cache()
+    await start_http_client()
+    start_warm_up()
+    await start_job_runner()
+    yield
+    await stop_warm_up()
+    await stop_job_runner()
+    await close_http_client()
+    shutdown_pools()
+    stop_access_log()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="ReportRx API", version="0.1.0")
+    configure_logging()
+    app = FastAPI(title="ReportRx API", version="0.1.0", lifespan=lifespan)
+    configure_multipart()
 
     # CORS: only allow the configured frontend origin
     frontend_origin = get_frontend_origin()
@@ -60,7 +153,7 @@ def create_app() -> FastAPI:
         CORSMiddleware,
         allow_origins=[frontend_origin],
         allow_credentials=False,
-        allow_methods=["GET", "POST", "OPTIONS"],
+        allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
         allow_headers=["*"],
         max_age=600,
     )
@@ -72,6 +165,10 @@ def create_app() -> FastAPI:
     app.include_router(health_router, prefix="/api/v1")
     app.include_router(parse_router, prefix="/api/v1")
     app.include_router(interpret_router, prefix="/api/v1")
+    app.include_router(jobs_router, prefix="/api/v1")
+    app.include_router(analyze_router, prefix="/api/v1")
+    # Prometheus scrapes /metrics at the root by convention
+    app.include_router(metrics_router)
 
     @app.get("/", include_in_schema=False)
     async def root(_: Request) -> Response:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.routers.parse import (
+    POOL_ERRORS,
+    observe_pages,
+    open_pages,
+    page_options,
+    pool_error_frame,
+    row_dict,
+    stream_frame,
+)
+from app.services.llm import (
+    ParsedRowIn,
+    encode_parsed_row,
+    interpret_rows_stream,
+    public_meta,
+)
+from app.services.parser import ParsedRow
+from app.services.pdf import PageOptions, ParsedPage
+from app.services.prompt import EncodedRow
+
+router = APIRouter()
+
+
+def _row_in(r: ParsedRow) -> ParsedRowIn:
+    # Parser output already satisfies ParsedRowIn; skip re-validating every row
+    return ParsedRowIn.model_construct(
+        test_name=r.test_name,
+        value=r.value,
+        unit=r.unit,
+        reference_range=r.reference_range,
+        flag=r.flag,
+        confidence=r.confidence,
+    )
+
+
+async def _analyze_frames(pages: AsyncIterator[ParsedPage], fmt: str) -> AsyncIterator[str]:
+    # The next pages are extracted in the parse pool while this one's rows are sent and
+    # encoded for the prompt. Only that encoding overlaps with parsing: the LLM request
+    # needs every row (the token budget keeps abnormal rows first), so it starts once the
+    # last page is parsed, without a further pass over the rows.
+    start = time.perf_counter()
+    rows: List[ParsedRowIn] = []
+    encoded: List[EncodedRow] = []
+    n_pages = n_unparsed = 0
+    timings: List[Dict[str, Any]] = []
+    pending = asyncio.ensure_future(anext(pages, None))
+    try:
+        while True:
+            try:
+                page = await pending
+            except POOL_ERRORS as e:
+                yield pool_error_frame(fmt, e)
+                return
+            if page is None:
+                break
+            pending = asyncio.ensure_future(anext(pages, None))
+            page_no, items, timing = page
+            n_pages += 1
+            if timing is not None:
+                timings.append(timing)
+            page_rows = [item for item in items if not isinstance(item, str)]
+            unparsed = [item for item in items if isinstance(item, str)]
+            n_unparsed += len(unparsed)
+            for r in page_rows:
+                row = _row_in(r)
+                rows.append(row)
+                encoded.append(encode_parsed_row(row))
+            yield stream_frame(
+                fmt,
+                "rows",
+                {"page": page_no, "rows": [row_dict(r) for r in page_rows], "unparsed": unparsed},
+            )
+    finally:
+        # Client gone or pool error: let the in-flight job finish, then release the upload
+        if not pending.done():
+            await asyncio.wait([pending])
+        await pages.aclose()
+
+    summary: Dict[str, Any] = {
+        "pages": n_pages,
+        "rows": len(rows),
+        "unparsed_lines": n_unparsed,
+        "duration_ms": int((time.perf_counter() - start) * 1000),
+    }
+    if timings:
+        summary["page_timings"] = timings
+        observe_pages(summary)
+    yield stream_frame(fmt, "parsed", summary)
+
+    if not rows:
+        yield stream_frame(fmt, "done", {"ok": False, "rows": {"included": 0, "elided": 0}})
+        return
+    async for event, data in interpret_rows_stream(rows, encoded):
+        if event == "done":
+            data = public_meta(data, ("fallback_sections",))
+            data["total_ms"] = int((time.perf_counter() - start) * 1000)
+        # Text and list sections are sent as {"<event>": value}
+        yield stream_frame(fmt, event, data if isinstance(data, dict) else {event: data})
+
+
+@router.post("/analyze")
+async def analyze_endpoint(
+    request: Request,
+    file: UploadFile | None = File(default=None),
+    fmt: Optional[str] = Query(default=None, alias="format", pattern=r"^(ndjson|sse)$"),
+    options: PageOptions = Depends(page_options),
+) -> StreamingResponse:
+    # Parse and interpret in one request. Same inputs as /parse/stream; emits a "rows"
+    # frame per page, "parsed" once extraction is done, then the interpretation events
+    # of /interpret/stream ("summary", "per_test", "flag", "next_steps", "disclaimer")
+    # and "done" with meta.
+    if fmt is None:
+        fmt = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+    pages = await open_pages(request, file, options)
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _analyze_frames(pages, fmt),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,17 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.access_log import access_log_stats
+from app.services.jobs import job_stats
+from app.services.llm import (
+    get_interpret_cache,
+    llm_pool_stats,
+    llm_resilience_stats,
+    single_flight_stats,
+)
+from app.services.parse_cache import parse_cache_stats
+from app.services.warmup import readiness
+from app.services.workers import get_parse_pool
 
 router = APIRouter()
 
@@ -7,3 +20,27 @@ router = APIRouter()
 def health():
     return {"status": "ok"}
 
+
+@router.get("/ready", tags=["health"])
+def ready():
+    # Liveness is /health; this is for load balancers: 503 until the warm-up has finished
+    state = readiness()
+    return JSONResponse(
+        {"status": "ready" if state["ready"] else "warming", "steps": state["steps"]},
+        status_code=200 if state["ready"] else 503,
+    )
+
+
+@router.get("/health/stats", tags=["health"])
+def health_stats():
+    # Counters and pool usage only; nothing request-specific
+    return {
+        "parse_pool": get_parse_pool().stats(),
+        "parse_cache": parse_cache_stats(),
+        "llm_pool": llm_pool_stats(),
+        "llm_resilience": llm_resilience_stats(),
+        "interpret_cache": get_interpret_cache().stats(),
+        "interpret_single_flight": single_flight_stats(),
+        "jobs": job_stats(),
+        "access_log": access_log_stats(),
+    }
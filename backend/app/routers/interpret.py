@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.services.llm import ParsedRowIn, InterpretationOut, interpret_rows
+from app.services.llm import (
+    ParsedRowIn,
+    interpret_rows,
+    interpret_rows_batch,
+    interpret_rows_stream,
+    public_meta,
+)
 
 
 router = APIRouter()
@@ -23,5 +32,46 @@ async def interpret_endpoint(payload: InterpretRequest) -> Dict[str, Any]:
         raise HTTPException(status_code=400, detail="rows must be a non-empty array")
 
     result, meta = await interpret_rows(rows)
-    # Never include PHI; meta only contains timings and opaque info
-    return {"interpretation": result.model_dump(), "meta": {k: meta[k] for k in ["duration_ms", "llm", "attempts", "ok"] if k in meta}}
+    return {"interpretation": result.model_dump(), "meta": public_meta(meta)}
+
+
+async def _sse_events(rows: List[ParsedRowIn]) -> AsyncIterator[str]:
+    async for event, data in interpret_rows_stream(rows):
+        if event == "done":
+            data = public_meta(data, ("fallback_sections",))
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/interpret/stream")
+async def interpret_stream_endpoint(payload: InterpretRequest) -> StreamingResponse:
+    # Server-sent events: each section is sent as soon as the model has produced it
+    rows = payload.rows or []
+    if not rows:
+        raise HTTPException(status_code=400, detail="rows must be a non-empty array")
+    return StreamingResponse(
+        _sse_events(rows),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class InterpretBatchRequest(BaseModel):
+    reports: List[InterpretRequest] = Field(default_factory=list)
+
+
+@router.post("/interpret/batch")
+async def interpret_batch_endpoint(payload: InterpretBatchRequest) -> Dict[str, Any]:
+    # Many reports in one call; results (or per-item errors) are returned in input order
+    reports = payload.reports or []
+    if not reports:
+        raise HTTPException(status_code=400, detail="reports must be a non-empty array")
+    max_reports = int(os.getenv("BATCH_MAX_REPORTS", "500"))
+    if len(reports) > max_reports:
+        raise HTTPException(status_code=413, detail=f"At most {max_reports} reports per batch.")
+
+    valid = [i for i, report in enumerate(reports) if report.rows]
+    results, meta = await interpret_rows_batch([reports[i].rows for i in valid])
+    out: List[Dict[str, Any]] = [{"error": "rows must be a non-empty array"} for _ in reports]
+    for i, (result, item_meta) in zip(valid, results):
+        out[i] = {"interpretation": result.model_dump(), "meta": public_meta(item_meta)}
+    return {"results": out, "meta": meta}
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from app.routers.parse import (
+    POOL_ERRORS,
+    ROW_FIELDS,
+    ResultFormat,
+    check_pdf_upload,
+    observe_pages,
+    page_options,
+    parse_result,
+    pool_http_error,
+    shape_result,
+    spool_pdf,
+)
+from app.services.fastjson import FastJSONResponse
+from app.services.jobs import (
+    Job,
+    JobError,
+    JobRetry,
+    get_job_runner,
+    get_job_store,
+    register_stage,
+)
+from app.services.llm import ParsedRowIn, interpret_rows, public_meta
+from app.services.parse_cache import lookup_parse, parse_cache_key, store_parse, text_cache_key
+from app.services.parser import parse_text
+from app.services.pdf import PageOptions, parse_pdf, server_page_limit
+from app.services.profiling import wrap_job
+from app.services.workers import PoolSaturatedError, get_parse_pool
+
+router = APIRouter()
+
+# kind -> first stage. "analyze" is parse followed by interpret on the parsed rows.
+KINDS = {"parse": "extract", "interpret": "interpret", "analyze": "extract"}
+JobKind = Query(default="analyze", pattern=r"^(parse|interpret|analyze)$")
+
+
+def _page_options_from(payload: Dict[str, Any]) -> PageOptions:
+    opts = dict(payload.get("options") or {})
+    if opts.get("pages"):
+        opts["pages"] = tuple(tuple(r) for r in opts["pages"])
+    return PageOptions(**opts)
+
+
+async def _run_extract(job: Job, options: Optional[PageOptions]) -> Tuple:
+    if options is None:
+        return await get_parse_pool().run(*wrap_job(parse_text, job.payload.get("text", "")))
+    # The sealed input is opened only on a cache miss, into memory or a temporary file
+    size, sha256 = job.payload["size"], job.payload["sha256"]
+    upload = await asyncio.to_thread(get_job_store().open_input, job, size, sha256)
+    try:
+        return await get_parse_pool().run(
+            *wrap_job(parse_pdf, upload.source, server_page_limit(), options)
+        )
+    finally:
+        upload.close()
+
+
+async def _extract(job: Job) -> Tuple[Optional[str], Dict[str, Any]]:
+    # Same work and cache as /parse, always in the parse worker pool
+    options: Optional[PageOptions] = None
+    if job.input_path is not None:
+        options = _page_options_from(job.payload)
+        key = parse_cache_key(f"pdf:{options.cache_tag()}", job.payload["sha256"])
+        size = job.payload["size"]
+    else:
+        key, size = text_cache_key(job.payload.get("text", ""))
+
+    result = await lookup_parse(key, size)
+    if result is None:
+        try:
+            parsed = await _run_extract(job, options)
+        except (PoolSaturatedError, BrokenProcessPool) as e:
+            raise JobRetry(getattr(e, "retry_after_s", 1))
+        except POOL_ERRORS as e:
+            err = pool_http_error(e)
+            raise JobError(err.status_code, err.detail)
+        result = parse_result(*parsed)
+        observe_pages(result.get("meta"))
+        await store_parse(key, result)
+    return ("interpret" if job.kind == "analyze" else None), {"parse": result}
+
+
+def _rows_from_columns(columns: Dict[str, List[Any]]) -> List[ParsedRowIn]:
+    values = zip(*(columns[name] for name in ROW_FIELDS))
+    return [ParsedRowIn.model_validate(dict(zip(ROW_FIELDS, row))) for row in values]
+
+
+async def _interpret(job: Job) -> Tuple[Optional[str], Dict[str, Any]]:
+    result = dict(job.result or {})
+    if job.kind == "analyze":
+        rows = _rows_from_columns(result["parse"]["columns"])
+    else:
+        rows = [ParsedRowIn.model_validate(r) for r in job.payload.get("rows", [])]
+    if not rows:
+        # Nothing recognised in the document: the parse result is the whole answer
+        return None, {**result, "interpretation": None}
+    interpretation, meta = await interpret_rows(rows)
+    result.update(interpretation=interpretation.model_dump(), meta=public_meta(meta))
+    return None, result
+
+
+register_stage("extract", _extract, "JOBS_EXTRACT_CONCURRENCY", 2)
+register_stage("interpret", _interpret, "JOBS_INTERPRET_CONCURRENCY", 4)
+
+
+def _max_queued() -> int:
+    return int(os.getenv("JOBS_MAX_QUEUED", "1000"))
+
+
+async def _read_job_json(request: Request, kind: str) -> Dict[str, Any]:
+    if "application/json" not in request.headers.get("content-type", "").lower():
+        raise HTTPException(status_code=400, detail="Send a PDF file or a JSON body.")
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON body.")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object.")
+    if kind == "interpret":
+        rows = payload.get("rows")
+        if not isinstance(rows, list) or not rows:
+            raise HTTPException(status_code=400, detail="rows must be a non-empty array")
+        try:
+            return {"rows": [ParsedRowIn.model_validate(r).model_dump() for r in rows]}
+        except ValidationError:
+            raise HTTPException(status_code=422, detail="Invalid rows.")
+    if not isinstance(payload.get("text"), str):
+        raise HTTPException(status_code=400, detail="Body must include 'text'.")
+    return {"text": payload["text"]}
+
+
+def _job_view(job: Job, fmt: str) -> Dict[str, Any]:
+    view: Dict[str, Any] = {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "created": job.created,
+        "updated": job.updated,
+    }
+    if job.status == "done" and job.result is not None:
+        result = dict(job.result)
+        if "parse" in result:
+            result["parse"] = shape_result(result["parse"], fmt)
+        view["result"] = result
+    if job.error is not None:
+        view["error"] = job.error
+    return view
+
+
+async def _get_job(job_id: str) -> Job:
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    request: Request,
+    file: UploadFile | None = File(default=None),
+    options: PageOptions = Depends(page_options),
+    kind: str = JobKind,
+) -> FastJSONResponse:
+    # Returns as soon as the input is stored; poll GET /jobs/{id} or follow /events
+    store = get_job_store()
+    if (await asyncio.to_thread(store.counts))["queued"] >= _max_queued():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many queued jobs. Please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    stage = KINDS[kind]
+    if file is not None:
+        if kind == "interpret":
+            raise HTTPException(status_code=400, detail="interpret jobs take JSON rows.")
+        check_pdf_upload(file)
+        upload = await spool_pdf(file)
+        try:
+            # Copied chunk by chunk into a sealed file the job owns
+            payload = {"options": asdict(options), "size": upload.size, "sha256": upload.sha256}
+            job_id = await asyncio.to_thread(store.create, kind, stage, payload, upload.source)
+        finally:
+            upload.close()
+    else:
+        payload = await _read_job_json(request, kind)
+        job_id = await asyncio.to_thread(store.create, kind, stage, payload)
+    get_job_runner().notify(stage)
+    url = f"{request.url.path}/{job_id}"
+    return FastJSONResponse(
+        {"id": job_id, "kind": kind, "status": "queued", "url": url, "events": f"{url}/events"},
+        status_code=202,
+        headers={"Location": url},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, fmt: str = ResultFormat) -> FastJSONResponse:
+    return FastJSONResponse(_job_view(await _get_job(job_id), fmt))
+
+
+@router.delete("/jobs/{job_id}", status_code=204)
+async def delete_job(job_id: str) -> None:
+    # Lets a client drop its result before the retention period ends
+    if not await asyncio.to_thread(get_job_store().delete, job_id):
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+
+
+def _events_poll_s() -> float:
+    return float(os.getenv("JOBS_EVENTS_POLL_S", "0.25"))
+
+
+async def _job_events(job: Job, fmt: str) -> AsyncIterator[str]:
+    # A "status" event whenever the status or stage changes, then "done" with the full
+    # job view once it finishes (or disappears)
+    last: Optional[Tuple[str, str]] = None
+    current: Optional[Job] = job
+    while current is not None:
+        if (current.status, current.stage) != last:
+            last = (current.status, current.stage)
+            if current.finished:
+                yield _sse("done", _job_view(current, fmt))
+                return
+            yield _sse("status", {"status": current.status, "stage": current.stage})
+        await asyncio.sleep(_events_poll_s())
+        current = await asyncio.to_thread(get_job_store().get, job.id)
+    yield _sse("done", {"id": job.id, "status": "expired"})
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, fmt: str = ResultFormat) -> StreamingResponse:
+    job = await _get_job(job_id)
+    return StreamingResponse(
+        _job_events(job, fmt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
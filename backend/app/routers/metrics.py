@@ -0,0 +1,108 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.access_log import access_log_stats
+from app.services.jobs import get_job_store
+from app.services.llm import get_breaker, get_interpret_cache, llm_pool_stats, single_flight_stats
+from app.services.metrics import REGISTRY, CallbackMetric
+from app.services.parse_cache import get_parse_cache
+from app.services.workers import get_parse_pool
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+BREAKER_STATES = ("closed", "half_open", "open")
+
+
+def _caches():
+    return {"parse": get_parse_cache(), "interpret": get_interpret_cache()}
+
+
+def _register_collectors() -> None:
+    # The same numbers /health/stats reports, read only when Prometheus scrapes
+    for metric in (
+        CallbackMetric(
+            "reportrx_parse_pool_pending",
+            "Parse jobs running or queued in the worker pool.",
+            lambda: {(): get_parse_pool().stats()["pending"]},
+        ),
+        CallbackMetric(
+            "reportrx_parse_pool_max_pending",
+            "Parse jobs the worker pool admits before answering 503.",
+            lambda: {(): get_parse_pool().max_pending},
+        ),
+        CallbackMetric(
+            "reportrx_llm_requests_in_flight",
+            "Upstream LLM requests currently open.",
+            lambda: {(): llm_pool_stats()["in_flight"]},
+        ),
+        CallbackMetric(
+            "reportrx_llm_connections",
+            "Pooled upstream connections by state.",
+            lambda: _connections(llm_pool_stats()),
+            ("state",),
+        ),
+        CallbackMetric(
+            "reportrx_interpret_single_flight_in_flight",
+            "Distinct interpretations currently being computed.",
+            lambda: {(): single_flight_stats()["in_flight"]},
+        ),
+        CallbackMetric(
+            "reportrx_llm_breaker_state",
+            "1 for the circuit breaker's current state, 0 for the others.",
+            lambda: {(s,): float(get_breaker().state == s) for s in BREAKER_STATES},
+            ("state",),
+        ),
+        CallbackMetric(
+            "reportrx_jobs",
+            "Background jobs by status, expired results excluded.",
+            lambda: {(status,): n for status, n in get_job_store().counts().items()},
+            ("status",),
+        ),
+        CallbackMetric(
+            "reportrx_cache_entries",
+            "Entries in the in-memory tier of each cache.",
+            lambda: {(name,): c.stats()["entries"] for name, c in _caches().items()},
+            ("cache",),
+        ),
+        CallbackMetric(
+            "reportrx_cache_lookups_total",
+            "Cache lookups by cache and result.",
+            lambda: {
+                (name, result): c.stats()[key]
+                for name, c in _caches().items()
+                for result, key in (("hit", "hits"), ("miss", "misses"))
+            },
+            ("cache", "result"),
+            kind="counter",
+        ),
+        CallbackMetric(
+            "reportrx_log_records_total",
+            "Access and app log records by outcome (written, dropped, sampled_out).",
+            lambda: {
+                (outcome,): access_log_stats()[outcome]
+                for outcome in ("written", "dropped", "sampled_out")
+            },
+            ("outcome",),
+            kind="counter",
+        ),
+        CallbackMetric(
+            "reportrx_log_queue_depth",
+            "Log records waiting for the writer thread.",
+            lambda: {(): access_log_stats()["queued"]},
+        ),
+    ):
+        REGISTRY.register(metric)
+
+
+def _connections(stats):
+    idle = stats["idle_connections"]
+    return {("active",): stats["connections"] - idle, ("idle",): idle}
+
+
+_register_collectors()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
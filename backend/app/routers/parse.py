@@ -1,13 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import csv
 import io
-from typing import Any, Dict, List
+import json
+import operator
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import fitz  # PyMuPDF
-from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.services.parser import parse_text
+from app.services.bulk import INPUT_COLUMNS, BulkInputError, bulk_engine, flag_columns
+from app.services.fastjson import FastJSONResponse, loads
+from app.services.metrics import observe_stage, timed_stage
+from app.services.parse_cache import lookup_parse, parse_cache_key, store_parse, text_cache_key
+from app.services.parser import ParsedRow, iter_parse_lines, parse_text
+from app.services.pdf import (
+    PageOptions,
+    ParsedPage,
+    PDFLimitError,
+    PDFReadError,
+    parse_page_ranges,
+    parse_pdf,
+    parse_pdf_pages,
+    select_pdf_pages,
+    server_page_limit,
+)
+from app.services.profiling import wrap_job
+from app.services.uploads import SpooledUpload, UploadTooLargeError, spool_upload
+from app.services.workers import PoolSaturatedError, get_parse_pool
 
 
 router = APIRouter()
@@ -17,53 +42,524 @@ class ParseRequest(BaseModel):
     text: str
 
 
-@router.post("/parse")
-#This is where the parsing begins. The endpoint is called by the frontend when the user uploads a PDF or a JSON file.
-async def parse_endpoint(request: Request, file: UploadFile | None = File(default=None)) -> Dict[str, Any]:
+# Failures a parse-pool job can raise, mapped to what the client sees
+POOL_ERRORS = (PoolSaturatedError, BrokenProcessPool, asyncio.TimeoutError, PDFReadError)
+
+
+def pool_http_error(e: Exception) -> HTTPException:
+    if isinstance(e, PoolSaturatedError):
+        return HTTPException(
+            status_code=503,
+            detail="Parser is busy. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after_s)},
+        )
+    if isinstance(e, BrokenProcessPool):
+        return HTTPException(
+            status_code=503, detail="Parser restarting. Please retry.", headers={"Retry-After": "1"}
+        )
+    if isinstance(e, asyncio.TimeoutError):
+        return HTTPException(status_code=504, detail="Timed out reading PDF.")
+    if isinstance(e, PDFLimitError):
+        return HTTPException(status_code=413, detail=str(e))
+    return HTTPException(status_code=400, detail=f"Failed to read PDF: {e}")
+
+
+async def _run_in_parse_pool(fn, *args):
+    try:
+        return await get_parse_pool().run(*wrap_job(fn, *args))
+    except POOL_ERRORS as e:
+        raise pool_http_error(e)
+
+
+async def _read_json_text(request: Request) -> str:
     content_type = request.headers.get("content-type", "").lower()
+    if "application/json" not in content_type:
+        raise HTTPException(status_code=400, detail="Send a PDF file or JSON {\"text\": \"...\"}.")
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON body.")
+    if not isinstance(payload, dict) or "text" not in payload:
+        raise HTTPException(status_code=400, detail="Body must include 'text'.")
+    return str(payload.get("text") or "")
+
+
+def check_pdf_upload(file: UploadFile) -> None:
+    if "pdf" not in (file.content_type or "application/octet-stream"):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF.")
+
+
+async def spool_pdf(file: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    try:
+        return await spool_upload(file, max_bytes)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=f"File exceeds {e.max_bytes} bytes.")
+
+
+def page_options(
+    pages: Optional[str] = Query(default=None, description="1-based ranges, e.g. 1-3,5,8-"),
+    max_pages: Optional[int] = Query(default=None, ge=1),
+    mode: str = Query(default="text", pattern=r"^(text|blocks|words)$"),
+    prefilter: bool = Query(default=False),
+) -> PageOptions:
+    # PDF-only knobs; ignored for JSON text
+    try:
+        ranges = parse_page_ranges(pages) if pages else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PageOptions(pages=ranges, max_pages=max_pages, mode=mode, prefilter=prefilter)
+
+
+def observe_pages(meta: Optional[Dict[str, Any]]) -> None:
+    # Stage latency for a whole document, summed from the worker's per-page timings
+    timings = (meta or {}).get("page_timings") or []
+    if timings:
+        observe_stage("pdf_extract", sum(t["ms"] for t in timings) / 1000)
+        observe_stage("parse_text", sum(t.get("parse_ms", 0.0) for t in timings) / 1000)
+
+
+ROW_FIELDS = (
+    "test_name",
+    "value",
+    "unit",
+    "reference_range",
+    "flag",
+    "confidence",
+    "test_code",
+    "unit_canonical",
+)
+_row_values = operator.attrgetter(*ROW_FIELDS)
+
+# format=rows (default): a list of row objects. format=columnar: one array per field, in
+# row order, which is much smaller for long reports since field names are not repeated.
+ResultFormat = Query(default="rows", alias="format", pattern=r"^(rows|columnar)$")
+
+
+def row_dict(r: ParsedRow) -> Dict[str, Any]:
+    return {
+        "test_name": r.test_name,
+        "value": r.value,
+        "unit": r.unit,
+        "reference_range": r.reference_range,
+        "flag": r.flag,
+        "confidence": r.confidence,
+        "test_code": r.test_code,
+        "unit_canonical": r.unit_canonical,
+    }
 
-    text_content: str | None = None
 
+@router.post("/parse")
+#This is where the parsing begins. The endpoint is called by the frontend when the user uploads a PDF or a JSON file.
+async def parse_endpoint(
+    request: Request,
+    file: UploadFile | None = File(default=None),
+    options: PageOptions = Depends(page_options),
+    fmt: str = ResultFormat,
+) -> FastJSONResponse:
+    rows: List[ParsedRow]
+    unparsed: List[str]
+    meta: Optional[Dict[str, Any]] = None
+
+    # Results are cached by content hash, so a re-upload skips extraction entirely
     if file is not None:
         # Multipart PDF path
-        if "pdf" not in (file.content_type or "application/octet-stream"):
-            raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF.")
-        data = await file.read()
-        # Use PyMuPDF to extract text from memory bytes
+        check_pdf_upload(file)
+        upload = await spool_pdf(file)
         try:
-            with fitz.open(stream=io.BytesIO(data), filetype="pdf") as doc:
-                parts: List[str] = []
-                for page in doc:
-                    parts.append(page.get_text("text"))
-                text_content = "\n".join(parts)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to read PDF: {e}")
+            key = parse_cache_key(f"pdf:{options.cache_tag()}", upload.sha256)
+            result = await lookup_parse(key, upload.size)
+            if result is None:
+                # Extraction and parsing are CPU-bound; run them in the worker pool.
+                # Large uploads reach the worker as a file path, not as pickled bytes.
+                rows, unparsed, meta = await _run_in_parse_pool(
+                    parse_pdf, upload.source, server_page_limit(), options
+                )
+                observe_pages(meta)
+        finally:
+            upload.close()
     else:
         # JSON path
-        if "application/json" not in content_type:
-            raise HTTPException(status_code=400, detail="Send a PDF file or JSON {\"text\": \"...\"}.")
-        try:
-            payload = await request.json()
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid JSON body.")
-        if not isinstance(payload, dict) or "text" not in payload:
-            raise HTTPException(status_code=400, detail="Body must include 'text'.")
-        text_content = str(payload.get("text") or "")
-
-    rows, unparsed = parse_text(text_content or "")
-    # Convert dataclasses to dicts
-    return {
-        "rows": [
-            {
-                "test_name": r.test_name,
-                "value": r.value,
-                "unit": r.unit,
-                "reference_range": r.reference_range,
-                "flag": r.flag,
-                "confidence": r.confidence,
-            }
-            for r in rows
-        ],
+        text = await _read_json_text(request)
+        key, size = text_cache_key(text)
+        result = await lookup_parse(key, size)
+        if result is None:
+            with timed_stage("parse_text"):
+                rows, unparsed = parse_text(text)
+
+    headers = {"X-Parse-Cache": "miss" if result is None else "hit"}
+    if result is None:
+        result = parse_result(rows, unparsed, meta)
+        await store_parse(key, result)
+    return FastJSONResponse(shape_result(result, fmt), headers=headers)
+
+
+def parse_result(
+    rows: List[ParsedRow], unparsed: List[str], meta: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    # Stored (and cached) column-wise; PDFs also report page counts and per-page timings
+    columns = list(zip(*map(_row_values, rows))) or [()] * len(ROW_FIELDS)
+    result: Dict[str, Any] = {
+        "columns": {name: list(values) for name, values in zip(ROW_FIELDS, columns)},
         "unparsed_lines": unparsed,
     }
+    if meta is not None:
+        result["meta"] = meta
+    return result
+
+
+def shape_result(result: Dict[str, Any], fmt: str) -> Dict[str, Any]:
+    # Response body for a stored result; per-document errors pass through untouched
+    if "columns" not in result:
+        return result
+    columns = result["columns"]
+    if fmt == "columnar":
+        shaped: Dict[str, Any] = {"columns": columns, "row_count": len(columns["test_name"])}
+    else:
+        rows = zip(*(columns[name] for name in ROW_FIELDS))
+        shaped = {"rows": [dict(zip(ROW_FIELDS, values)) for values in rows]}
+    shaped["unparsed_lines"] = result["unparsed_lines"]
+    if "meta" in result:
+        shaped["meta"] = result["meta"]
+    return shaped
+
+
+def _batch_max_docs() -> int:
+    return int(os.getenv("PARSE_BATCH_MAX_DOCS", "100"))
+
+
+def _batch_max_doc_bytes() -> int:
+    return int(os.getenv("PARSE_BATCH_MAX_DOC_BYTES", str(20 * 1024 * 1024)))
+
+
+def _batch_max_in_flight() -> int:
+    # Default to one document per worker so a single batch cannot fill the shared queue
+    default = max(1, get_parse_pool().workers)
+    return max(1, int(os.getenv("PARSE_BATCH_MAX_IN_FLIGHT", str(default))))
+
+
+def _unique_key(key: str, seen: Dict[str, int]) -> str:
+    seen[key] = seen.get(key, 0) + 1
+    return key if seen[key] == 1 else f"{key}#{seen[key]}"
+
+
+async def _read_batch_texts(request: Request) -> List[Tuple[str, str]]:
+    # Accepts ["text", ...], {"texts": [...]}, and items of the form {"id": ..., "text": ...}
+    content_type = request.headers.get("content-type", "").lower()
+    if "application/json" not in content_type:
+        raise HTTPException(status_code=400, detail="Send PDF files or a JSON array of texts.")
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON body.")
+    if isinstance(payload, dict):
+        payload = payload.get("texts")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Body must be an array of texts.")
+    docs: List[Tuple[str, str]] = []
+    seen: Dict[str, int] = {}
+    for i, item in enumerate(payload):
+        if isinstance(item, dict):
+            key = str(item.get("id") or i)
+            text = item.get("text")
+        else:
+            key, text = str(i), item
+        if not isinstance(text, str):
+            raise HTTPException(status_code=400, detail=f"Document {key} must be a string.")
+        docs.append((_unique_key(key, seen), text))
+    return docs
+
+
+async def _batch_error(detail: str, status: int) -> Dict[str, Any]:
+    return {"error": detail, "status": status}
+
+
+async def _parse_batch_doc(
+    sem: asyncio.Semaphore, key: str, size: int, fn, *args: Any
+) -> Dict[str, Any]:
+    cached = await lookup_parse(key, size)
+    if cached is not None:
+        return cached
+    async with sem:
+        try:
+            parsed = await get_parse_pool().run(*wrap_job(fn, *args))
+        except POOL_ERRORS as e:
+            err = pool_http_error(e)
+            return {"error": err.detail, "status": err.status_code}
+    result = parse_result(*parsed)
+    observe_pages(result.get("meta"))
+    await store_parse(key, result)
+    return result
+
+
+@router.post("/parse/batch")
+async def parse_batch_endpoint(
+    request: Request,
+    files: List[UploadFile] | None = File(default=None),
+    fmt: str = ResultFormat,
+) -> FastJSONResponse:
+    # Many documents per request. Each one is parsed in the worker pool independently,
+    # so one unreadable or oversized document does not fail the rest.
+    start = time.perf_counter()
+    max_docs = _batch_max_docs()
+    max_bytes = _batch_max_doc_bytes()
+    sem = asyncio.Semaphore(_batch_max_in_flight())
+
+    page_limit = server_page_limit()
+    options = PageOptions()
+
+    keys: List[str] = []
+    jobs = []
+    uploads: List[SpooledUpload] = []
+    if files:
+        if len(files) > max_docs:
+            raise HTTPException(status_code=413, detail=f"At most {max_docs} documents per batch.")
+        seen: Dict[str, int] = {}
+        for i, f in enumerate(files):
+            keys.append(_unique_key(f.filename or f"document-{i}", seen))
+            if "pdf" not in (f.content_type or "application/octet-stream"):
+                jobs.append(_batch_error("Unsupported file type. Please upload a PDF.", 400))
+                continue
+            try:
+                upload = await spool_upload(f, max_bytes)
+            except UploadTooLargeError:
+                jobs.append(_batch_error(f"Document exceeds {max_bytes} bytes.", 413))
+                continue
+            uploads.append(upload)
+            cache_key = parse_cache_key(f"pdf:{options.cache_tag()}", upload.sha256)
+            jobs.append(
+                _parse_batch_doc(
+                    sem, cache_key, upload.size, parse_pdf, upload.source, page_limit, options
+                )
+            )
+    else:
+        docs = await _read_batch_texts(request)
+        if len(docs) > max_docs:
+            raise HTTPException(status_code=413, detail=f"At most {max_docs} documents per batch.")
+        for key, text in docs:
+            keys.append(key)
+            cache_key, size = text_cache_key(text)
+            if size > max_bytes:
+                jobs.append(_batch_error(f"Document exceeds {max_bytes} bytes.", 413))
+            else:
+                jobs.append(_parse_batch_doc(sem, cache_key, size, parse_text, text))
+    if not jobs:
+        raise HTTPException(status_code=400, detail="No documents in batch.")
+
+    try:
+        results = await asyncio.gather(*jobs)
+    finally:
+        for upload in uploads:
+            upload.close()
+    failed = sum(1 for r in results if "error" in r)
+    elapsed = time.perf_counter() - start
+    return FastJSONResponse(
+        {
+            "results": {key: shape_result(r, fmt) for key, r in zip(keys, results)},
+            "meta": {
+                "documents": len(results),
+                "failed": failed,
+                "duration_ms": int(elapsed * 1000),
+                "docs_per_sec": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+            },
+        }
+    )
+
+
+def _bulk_max_bytes() -> int:
+    return int(os.getenv("BULK_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _bulk_max_rows() -> int:
+    return int(os.getenv("BULK_MAX_ROWS", "1000000"))
+
+
+# How many rejected row indexes a bulk response lists (the count is always given)
+BULK_REJECTED_LISTED = 100
+
+
+def _csv_columns(text: str) -> Dict[str, Any]:
+    # Header row names the columns; unknown columns are ignored
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return {}
+    header = [name.strip().lower() for name in rows[0]]
+    for i, row in enumerate(rows[1:], start=2):
+        if len(row) != len(header):
+            detail = f"CSV line {i} has {len(row)} fields, expected {len(header)}."
+            raise HTTPException(status_code=400, detail=detail)
+    columns = list(zip(*rows[1:])) or [()] * len(header)
+    return {name: list(col) for name, col in zip(header, columns) if name in INPUT_COLUMNS}
+
+
+def _ndjson_columns(body: bytes) -> Dict[str, Any]:
+    records = [loads(line) for line in body.splitlines() if line.strip()]
+    if not all(isinstance(r, dict) for r in records):
+        raise HTTPException(status_code=400, detail="Each NDJSON line must be an object.")
+    return {name: [r.get(name) for r in records] for name in INPUT_COLUMNS}
+
+
+async def _read_bulk_columns(request: Request) -> Dict[str, Any]:
+    # JSON {"columns": {"test_name": [...], "value": [...], ...}} (the format=columnar
+    # shape), CSV with a header row, or NDJSON with one object per result
+    content_type = request.headers.get("content-type", "").lower()
+    max_bytes = _bulk_max_bytes()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Body exceeds {max_bytes} bytes.")
+    try:
+        if "csv" in content_type:
+            return _csv_columns(body.decode("utf-8-sig"))
+        if "ndjson" in content_type or "jsonl" in content_type:
+            return _ndjson_columns(bytes(body))
+        if "application/json" in content_type:
+            payload = loads(bytes(body))
+            if not isinstance(payload, dict) or not isinstance(payload.get("columns"), dict):
+                raise HTTPException(status_code=400, detail="Body must include 'columns'.")
+            return payload["columns"]
+    except (UnicodeDecodeError, ValueError, csv.Error):
+        raise HTTPException(status_code=400, detail="Invalid body.")
+    raise HTTPException(
+        status_code=400, detail="Send JSON {\"columns\": {...}}, CSV or NDJSON results."
+    )
+
+
+@router.post("/parse/bulk")
+async def parse_bulk_endpoint(request: Request, fmt: str = ResultFormat) -> FastJSONResponse:
+    # Structured results (lab feed exports) instead of report text: each result already
+    # has a name, value, unit and bounds (low/high, le, ge), so only flags, confidence and
+    # normalization are computed, column-wise. Rows come back in the /parse shape.
+    start = time.perf_counter()
+    columns = await _read_bulk_columns(request)
+    max_rows = _bulk_max_rows()
+    if isinstance(columns.get("test_name"), list) and len(columns["test_name"]) > max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {max_rows} results per request.")
+    try:
+        with timed_stage("bulk_flag"):
+            out, rejected = await asyncio.to_thread(flag_columns, columns)
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = {
+        "columns": out,
+        "unparsed_lines": [],
+        "meta": {
+            "engine": bulk_engine(),
+            "results": len(out["test_name"]) + len(rejected),
+            "rejected": len(rejected),
+            "rejected_rows": rejected[:BULK_REJECTED_LISTED],
+            "duration_ms": int((time.perf_counter() - start) * 1000),
+        },
+    }
+    return FastJSONResponse(shape_result(result, fmt))
+
+
+def stream_frame(fmt: str, kind: str, payload: Dict[str, Any]) -> str:
+    if fmt == "sse":
+        return f"event: {kind}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    return json.dumps({"type": kind, **payload}, ensure_ascii=False) + "\n"
+
+
+def _stream_pages_per_job() -> int:
+    return max(1, int(os.getenv("PARSE_STREAM_PAGES_PER_JOB", "4")))
+
+
+def pool_error_frame(fmt: str, e: Exception) -> str:
+    # A pool failure after the response has started: same detail and status as /parse
+    error = pool_http_error(e)
+    return stream_frame(fmt, "error", {"detail": error.detail, "status": error.status_code})
+
+
+async def _pdf_pages(
+    upload: SpooledUpload, options: PageOptions, indexes: List[int]
+) -> AsyncIterator[ParsedPage]:
+    # Extraction and parsing go through the parse pool a few pages per job, so streamed
+    # parses share its admission bound and timeout with /parse. Owns the spooled upload:
+    # it is released when the stream finishes or the client goes away.
+    per_job = _stream_pages_per_job()
+    try:
+        for i in range(0, len(indexes), per_job):
+            batch = indexes[i : i + per_job]
+            for page in await get_parse_pool().run(
+                *wrap_job(parse_pdf_pages, upload.source, options, batch)
+            ):
+                yield page
+    finally:
+        upload.close()
+
+
+async def _text_page(text: str) -> AsyncIterator[ParsedPage]:
+    yield 1, await asyncio.to_thread(lambda: list(iter_parse_lines(text.splitlines()))), None
+
+
+async def open_pages(
+    request: Request, file: Optional[UploadFile], options: PageOptions
+) -> AsyncIterator[ParsedPage]:
+    # Parsed pages of an uploaded PDF, read lazily, or the JSON text as a single page.
+    # Limits are checked up front so they can still be answered with an HTTP error.
+    if file is None:
+        return _text_page(await _read_json_text(request))
+    check_pdf_upload(file)
+    upload = await spool_pdf(file)
+    try:
+        indexes = await _run_in_parse_pool(
+            select_pdf_pages, upload.source, server_page_limit(), options
+        )
+    except HTTPException:
+        upload.close()
+        raise
+    return _pdf_pages(upload, options, indexes)
+
+
+async def _stream_frames(pages: AsyncIterator[ParsedPage], fmt: str) -> AsyncIterator[str]:
+    start = time.perf_counter()
+    n_pages = n_rows = n_unparsed = 0
+    timings: List[Dict[str, Any]] = []
+    try:
+        async for page_no, items, timing in pages:
+            n_pages += 1
+            if timing is not None:
+                timings.append(timing)
+            for item in items:
+                if isinstance(item, str):
+                    n_unparsed += 1
+                    yield stream_frame(fmt, "unparsed", {"page": page_no, "line": item})
+                else:
+                    n_rows += 1
+                    yield stream_frame(fmt, "row", {"page": page_no, "row": row_dict(item)})
+    except POOL_ERRORS as e:
+        yield pool_error_frame(fmt, e)
+        return
+    finally:
+        await pages.aclose()
+    summary: Dict[str, Any] = {
+        "pages": n_pages,
+        "rows": n_rows,
+        "unparsed_lines": n_unparsed,
+        "duration_ms": int((time.perf_counter() - start) * 1000),
+    }
+    if timings:
+        summary["page_timings"] = timings
+        observe_pages(summary)
+    yield stream_frame(fmt, "summary", summary)
+
+
+@router.post("/parse/stream")
+async def parse_stream_endpoint(
+    request: Request,
+    file: UploadFile | None = File(default=None),
+    fmt: Optional[str] = Query(default=None, alias="format", pattern=r"^(ndjson|sse)$"),
+    options: PageOptions = Depends(page_options),
+) -> StreamingResponse:
+    # Same inputs as /parse, but rows are emitted page by page as they are found
+    if fmt is None:
+        fmt = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+
+    pages = await open_pages(request, file, options)
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_frames(pages, fmt),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
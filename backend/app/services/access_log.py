@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+from app.services.fastjson import dumps
+
+# Access and app log records as one JSON object per line, written by a background thread.
+# A request only builds a small dict and puts it on a bounded queue (about a microsecond,
+# where logger.info through a handler costs several); when the writer falls behind,
+# records are dropped and counted instead of blocking the event loop. Access records hold
+# fixed fields only: method, path (the template when it has parameters), status,
+# duration and request id. Never headers, query strings or bodies.
+
+REQUEST_ID_HEADER = b"x-request-id"
+# A client-supplied id is kept only when it looks like one, so it cannot carry free text
+REQUEST_ID = re.compile(rb"[A-Za-z0-9._:-]{1,64}")
+# Successful probes of these are logged one in LOG_HEALTH_SAMPLE_EVERY
+HEALTH_PATHS = frozenset({"/api/v1/health", "/api/v1/ready", "/metrics"})
+# Records written per stream write
+BATCH = 256
+
+_STOP = object()
+
+
+def request_id(headers: Dict[bytes, bytes]) -> str:
+    supplied = headers.get(REQUEST_ID_HEADER)
+    if supplied is not None and REQUEST_ID.fullmatch(supplied):
+        return supplied.decode("ascii")
+    return secrets.token_hex(8)
+
+
+def _plain(value: Any) -> Any:
+    return value if value is None or isinstance(value, (str, int, float)) else str(value)
+
+
+class AccessLog:
+    def __init__(self, max_queue: int, health_every: int, stream: Optional[TextIO] = None) -> None:
+        self._queue: queue.Queue = queue.Queue(max(1, max_queue))
+        self.health_every = health_every
+        # None writes to whatever sys.stderr is at the time
+        self._stream = stream
+        self._health_seen = 0
+        self._counts = {"written": 0, "dropped": 0, "sampled_out": 0}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        # Writes what is already queued, then ends the writer thread
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout_s)
+        except queue.Full:
+            return
+        thread.join(timeout_s)
+
+    def put(self, record: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._counts["dropped"] += 1
+
+    def http(
+        self, method: str, path: str, status: Optional[int], duration_ms: int, rid: str
+    ) -> None:
+        if path in HEALTH_PATHS and status is not None and 200 <= status < 300:
+            self._health_seen += 1
+            if self.health_every <= 0 or self._health_seen % self.health_every:
+                self._counts["sampled_out"] += 1
+                return
+        self.put(
+            {
+                "ts": round(time.time(), 3),
+                "level": "info",
+                "event": "http_request",
+                "request_id": rid,
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": duration_ms,
+            }
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), "max_queue": self._queue.maxsize, **self._counts}
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not _STOP]
+            if records:
+                self._write(records)
+            if len(records) < len(batch):
+                return
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        lines = []
+        for r in records:
+            try:
+                line = dumps(r)
+            except TypeError:
+                # A value JSON cannot encode (app records only): write its str() instead
+                line = dumps({k: _plain(v) for k, v in r.items()})
+            lines.append(line.decode("utf-8"))
+        stream = self._stream if self._stream is not None else sys.stderr
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except (OSError, ValueError):
+            self._counts["dropped"] += len(records)
+            return
+        self._counts["written"] += len(records)
+
+
+class AccessLogHandler(logging.Handler):
+    # Sends the app's own log records (warnings, errors) through the same queue and writer
+    def emit(self, record: logging.LogRecord) -> None:
+        fields = record.msg if isinstance(record.msg, dict) else {"message": record.getMessage()}
+        get_access_log().put(
+            {
+                "ts": round(record.created, 3),
+                "level": record.levelname.lower(),
+                "logger": record.name,
+                **fields,
+            }
+        )
+
+
+_access_log: Optional[AccessLog] = None
+
+
+def get_access_log() -> AccessLog:
+    global _access_log
+    if _access_log is None:
+        _access_log = AccessLog(
+            max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            health_every=int(os.getenv("LOG_HEALTH_SAMPLE_EVERY", "100")),
+        )
+        _access_log.start()
+    return _access_log
+
+
+def configure_logging() -> None:
+    # Replaces logging.basicConfig: records of the "reportrx" loggers go to the queue
+    logger = logging.getLogger("reportrx")
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+    if not any(isinstance(h, AccessLogHandler) for h in logger.handlers):
+        logger.addHandler(AccessLogHandler())
+
+
+def start_access_log() -> None:
+    get_access_log().start()
+
+
+def stop_access_log() -> None:
+    if _access_log is not None:
+        _access_log.stop()
+
+
+def access_log_stats() -> Dict[str, int]:
+    return get_access_log().stats()
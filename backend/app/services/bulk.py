@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import math
+import os
+from itertools import compress
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services.normalize import canonical_test, canonical_unit
+from app.services.parser import _compute_flag
+
+# Flags and confidence for structured results (lab feeds exporting CSV/JSONL), computed a
+# column at a time instead of one ParsedRow at a time. With numpy (`bulk` extra) the
+# range comparisons, reference-range labels and confidence are array operations; without
+# it one pure-Python pass produces the same columns. Either way a row comes out exactly
+# as the text parser would have produced it for the same name, value, unit and range.
+_np = importlib.import_module("numpy") if importlib.util.find_spec("numpy") else None
+
+INPUT_COLUMNS = ("test_name", "value", "unit", "low", "high", "le", "ge")
+BOUNDS = ("low", "high", "le", "ge")
+ENGINES = ("numpy", "python")
+
+# Flag codes used by the numpy engine, indexed into FLAGS
+FLAGS = (None, "low", "high", "normal", "abnormal")
+FLAG_CODES = {flag: code for code, flag in enumerate(FLAGS)}
+NO_RANGE, RANGE, AT_MOST, AT_LEAST = 0, 1, 2, 3
+
+BulkResult = Tuple[Dict[str, List[Any]], List[int]]
+
+_BAD = object()  # a bound that is present but not a number
+
+
+class BulkInputError(ValueError):
+    pass
+
+
+def numpy_available() -> bool:
+    return _np is not None
+
+
+def bulk_engine(engine: Optional[str] = None) -> str:
+    engine = engine or os.getenv("BULK_ENGINE") or ("numpy" if _np is not None else "python")
+    if engine not in ENGINES:
+        raise ValueError(f"unknown bulk engine: {engine!r}")
+    if engine == "numpy" and _np is None:
+        raise ValueError("bulk engine 'numpy' needs numpy installed")
+    return engine
+
+
+def _text(x: Any) -> Optional[str]:
+    if x is None:
+        return None
+    return (x if isinstance(x, str) else str(x)).strip() or None
+
+
+def _number(x: Any) -> Any:
+    # Bound: a finite float, None when empty or not finite, _BAD when unreadable
+    if x is None or x == "":
+        return None
+    if isinstance(x, (int, float, str)):
+        try:
+            v = float(x)
+        except ValueError:
+            return _BAD
+        return v if math.isfinite(v) else None
+    return _BAD
+
+
+def _value(x: Any) -> Any:
+    # Result: a float when numeric, otherwise the stripped text (qualitative results)
+    if isinstance(x, str):
+        text = x.strip()
+        try:
+            v = float(text)
+        except ValueError:
+            return text or None
+        return v if math.isfinite(v) else None
+    v = _number(x)
+    return None if v is _BAD else v
+
+
+def _range_label(kind: int, a: float, b: float) -> Optional[str]:
+    # Same strings _extract_range produces
+    if kind == RANGE:
+        return f"{a}-{b}"
+    if kind == AT_MOST:
+        return f"≤ {a}"
+    if kind == AT_LEAST:
+        return f"≥ {a}"
+    return None
+
+
+def _lookup(fn: Callable[[Any], Optional[str]], keys: List[Any]) -> List[Optional[str]]:
+    # Feeds repeat the same few hundred names and units, so look each one up once
+    memo = {key: fn(key) for key in set(keys)}
+    return [memo[key] for key in keys]
+
+
+def _check_columns(columns: Dict[str, Any]) -> Dict[str, Sequence[Any]]:
+    for name in ("test_name", "value"):
+        if name not in columns:
+            raise BulkInputError(f"Missing column '{name}'.")
+    if not isinstance(columns["test_name"], list):
+        raise BulkInputError("Column 'test_name' must be an array.")
+    n = len(columns["test_name"])
+    checked: Dict[str, Sequence[Any]] = {}
+    for name in INPUT_COLUMNS:
+        col = columns.get(name)
+        if col is None:
+            col = [None] * n
+        if not isinstance(col, list) or len(col) != n:
+            raise BulkInputError(f"Column '{name}' must be an array of {n} values.")
+        checked[name] = col
+    return checked
+
+
+def _python_columns(cols: Dict[str, Sequence[Any]]) -> Tuple[Dict[str, List[Any]], List[int]]:
+    # One pass over the rows: skips ParsedRow construction and caches range labels
+    out: Dict[str, List[Any]] = {
+        name: [] for name in ("test_name", "value", "unit", "reference_range", "flag", "confidence")
+    }
+    rejected: List[int] = []
+    labels: Dict[Tuple[int, float, float], Optional[str]] = {}
+    rows = zip(*(cols[name] for name in INPUT_COLUMNS))
+    for i, (raw_name, raw_value, raw_unit, *raw_bounds) in enumerate(rows):
+        name = _text(raw_name)
+        value = _value(raw_value)
+        low, high, le, ge = bounds = [_number(b) for b in raw_bounds]
+        if name is None or value is None or _BAD in bounds:
+            rejected.append(i)
+            continue
+        range_tuple = None
+        if low is not None and high is not None:
+            range_tuple, le, ge = (low, high), None, None
+            key = (RANGE, low, high)
+        else:
+            # A lone low or high bound reads as "≥ low" or "≤ high"
+            le = le if le is not None else (high if low is None else None)
+            ge = ge if ge is not None else (low if high is None else None)
+            if le is not None:
+                key, ge = (AT_MOST, le, 0.0), None
+            else:
+                key = (AT_LEAST, ge, 0.0) if ge is not None else (NO_RANGE, 0.0, 0.0)
+        if key not in labels:
+            labels[key] = _range_label(*key)
+        reference_range = labels[key]
+        unit = _text(raw_unit)
+        flag = _compute_flag(value, range_tuple, le, ge)
+        present = 2 + (unit is not None) + (reference_range is not None) + (flag is not None)
+        out["test_name"].append(name)
+        out["value"].append(value)
+        out["unit"].append(unit)
+        out["reference_range"].append(reference_range)
+        out["flag"].append(flag)
+        out["confidence"].append(present / 5)
+    return out, rejected
+
+
+def _texts(col: Sequence[Any]) -> List[Optional[str]]:
+    # Names and units repeat, so each distinct value is stripped once
+    try:
+        memo = {x: _text(x) for x in set(col)}
+    except TypeError:  # unhashable cells (arrays, objects)
+        return [_text(x) for x in col]
+    return [memo[x] for x in col]
+
+
+def _float_column(col: Sequence[Any], coerce: Callable[[Any], Any]) -> Tuple[Any, List[Any]]:
+    # (float array with NaN for missing or non-numeric, coerced values when the fast
+    # conversion failed). Non-finite numbers count as missing, as with _number.
+    np = _np
+    try:
+        arr = np.array(col, dtype=float)
+        if arr.ndim == 1:
+            arr[np.isinf(arr)] = np.nan
+            return arr, []
+    except (TypeError, ValueError):
+        pass
+    coerced = [x if type(x) is float or x is None else coerce(x) for x in col]
+    arr = np.array([v if type(v) is float else np.nan for v in coerced], dtype=float)
+    arr[np.isinf(arr)] = np.nan
+    return arr, coerced
+
+
+def _range_labels(kind: Any, a: Any, b: Any) -> List[Optional[str]]:
+    # One label per distinct (kind, a, b), spread back over the rows. Each float column
+    # is reduced to integer codes first: sorting three 1-D arrays is much cheaper than
+    # a row-wise unique over the stacked columns.
+    np = _np
+    unique_a, code_a = np.unique(a, return_inverse=True)
+    unique_b, code_b = np.unique(b, return_inverse=True)
+    key = (kind.astype(np.int64) * len(unique_a) + code_a.reshape(-1)) * len(unique_b)
+    _, first, inverse = np.unique(key + code_b.reshape(-1), return_index=True, return_inverse=True)
+    distinct = zip(kind[first].tolist(), a[first].tolist(), b[first].tolist())
+    labels = np.array([_range_label(*k) for k in distinct], dtype=object)
+    return labels[inverse.reshape(-1)].tolist()
+
+
+def _numpy_columns(cols: Dict[str, Sequence[Any]]) -> Tuple[Dict[str, List[Any]], List[int]]:
+    np = _np
+    names = _texts(cols["test_name"])
+    v, coerced = _float_column(cols["value"], _value)
+    is_text = np.array([type(x) is str for x in coerced], dtype=bool) if coerced else None
+    keep = ~np.isnan(v) if is_text is None else ~np.isnan(v) | is_text
+    keep &= np.array([name is not None for name in names], dtype=bool)
+    bounds = []
+    for name in BOUNDS:
+        arr, checked = _float_column(cols[name], _number)
+        if checked:
+            keep &= np.array([x is not _BAD for x in checked], dtype=bool)
+        bounds.append(arr)
+    rejected = np.flatnonzero(~keep).tolist()
+    kept = keep.tolist()
+
+    idx = np.flatnonzero(keep)
+    v = v[idx]
+    low, high, le, ge = (arr[idx] for arr in bounds)
+    # Same precedence as _compute_flag: a full range, then ≤, then ≥
+    has_range = ~np.isnan(low) & ~np.isnan(high)
+    le = np.where(np.isnan(le) & np.isnan(low), high, le)
+    ge = np.where(np.isnan(ge) & np.isnan(high), low, ge)
+    has_le = ~has_range & ~np.isnan(le)
+    has_ge = ~has_range & ~has_le & ~np.isnan(ge)
+
+    codes = np.select(
+        [
+            has_range & (v < low),
+            has_range & (v > high),
+            has_range,
+            has_le & (v <= le),
+            has_le,
+            has_ge & (v >= ge),
+            has_ge,
+        ],
+        [FLAG_CODES[f] for f in ("low", "high", "normal", "normal", "high", "normal", "low")],
+        FLAG_CODES[None],
+    ).astype(np.int8)
+    if coerced:
+        values = [coerced[i] for i in idx.tolist()]
+        # Qualitative results are few; flag them like the parser does
+        for i in np.flatnonzero(is_text[idx]).tolist():
+            codes[i] = FLAG_CODES[_compute_flag(values[i], None, None, None)]
+    else:
+        values = v.tolist()
+
+    kind = np.select([has_range, has_le, has_ge], [RANGE, AT_MOST, AT_LEAST], NO_RANGE)
+    a = np.select([has_range, has_le, has_ge], [low, le, ge], 0.0)
+    b = np.where(has_range, high, 0.0)
+    reference_ranges = _range_labels(kind, a, b)
+
+    units = _texts(list(compress(cols["unit"], kept)))
+    has_unit = np.array([u is not None for u in units], dtype=bool)
+    confidence = (2 + has_unit + (kind != NO_RANGE) + (codes != 0)) / 5
+    out = {
+        "test_name": list(compress(names, kept)),
+        "value": values,
+        "unit": units,
+        "reference_range": reference_ranges,
+        "flag": np.array(FLAGS, dtype=object)[codes].tolist(),
+        "confidence": confidence.tolist(),
+    }
+    return out, rejected
+
+
+def flag_columns(columns: Dict[str, Any], engine: Optional[str] = None) -> BulkResult:
+    # Output columns in input order, plus the indexes of rejected rows (no name, no value,
+    # or a bound that is not a number). Malformed columns raise BulkInputError.
+    cols = _check_columns(columns)
+    if bulk_engine(engine) == "numpy":
+        out, rejected = _numpy_columns(cols)
+    else:
+        out, rejected = _python_columns(cols)
+    out["test_code"] = _lookup(canonical_test, out["test_name"])
+    out["unit_canonical"] = _lookup(canonical_unit, out["unit"])
+    return out, rejected
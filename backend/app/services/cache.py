@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("reportrx.cache")
+
+
+class TTLCache:
+    # In-process LRU with a per-entry time-to-live
+    def __init__(self, max_entries: int, ttl_s: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._data: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_s, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    # Shared tier for several workers on one host. Keys are hashes; values are JSON text.
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, ttl_s: float) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl_s),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def derive_key(key: str, label: str) -> bytes:
+    # One-way derivation of a 32-byte key (AES key, row id) from a lookup key
+    return hashlib.sha256(f"{label}:{key}".encode()).digest()
+
+
+class SealedSQLiteCache(SQLiteCache):
+    # Disk tier for values derived from PHI. Each value is encrypted (AES-GCM) under a key
+    # derived from its cache key and stored under a second one-way derivation, so the file
+    # on its own reveals nothing: only a caller holding the content the cache key was hashed
+    # from can find or decrypt an entry. Needs the optional `cryptography` package.
+    def __init__(self, path: str, ttl_s: float) -> None:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        self._aesgcm = AESGCM
+        super().__init__(path, ttl_s)
+
+    _derive = staticmethod(derive_key)
+
+    def get(self, key: str) -> Optional[str]:
+        raw = super().get(self._derive(key, "id").hex())
+        if raw is None:
+            return None
+        blob = base64.b64decode(raw)
+        try:
+            plain = self._aesgcm(self._derive(key, "enc")).decrypt(blob[:12], blob[12:], None)
+        except Exception:
+            # Tampered or foreign row: treat as a miss
+            return None
+        return plain.decode("utf-8")
+
+    def set(self, key: str, value: str) -> None:
+        nonce = os.urandom(12)
+        sealed = self._aesgcm(self._derive(key, "enc")).encrypt(nonce, value.encode("utf-8"), None)
+        super().set(self._derive(key, "id").hex(), base64.b64encode(nonce + sealed).decode("ascii"))
+
+
+def sealed_cache_available() -> bool:
+    return importlib.util.find_spec("cryptography") is not None
+
+
+def sealed_disk_tier(setting: str, path: str, ttl_s: float) -> Optional[SealedSQLiteCache]:
+    # Disk tier for a cache of values derived from PHI: sealed or not at all. A path set
+    # without the `crypto` extra is refused loudly rather than stored in plaintext.
+    if not path:
+        return None
+    if not sealed_cache_available():
+        logger.warning(
+            {
+                "event": "cache_path_ignored",
+                "setting": setting,
+                "reason": "needs the crypto extra (cryptography); the cache stays in memory",
+            }
+        )
+        return None
+    return SealedSQLiteCache(path, ttl_s)
+
+
+class TieredCache:
+    # Memory first, then the optional disk tier (promoting hits back into memory).
+    # Disk access runs in a thread so the event loop never waits on SQLite.
+    def __init__(
+        self, memory: TTLCache, disk: Optional[SQLiteCache] = None, disk_ignored: bool = False
+    ) -> None:
+        self.memory = memory
+        self.disk = disk
+        # A disk path was configured but refused (see sealed_disk_tier)
+        self.disk_ignored = disk_ignored
+        self._counts = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._counts["hits"] += 1
+            self._counts["memory_hits"] += 1
+            return value
+        if self.disk is not None:
+            raw = await asyncio.to_thread(self.disk.get, key)
+            if raw is not None:
+                value = json.loads(raw)
+                self.memory.set(key, value)
+                self._counts["hits"] += 1
+                self._counts["disk_hits"] += 1
+                return value
+        self._counts["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        self._counts["sets"] += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, json.dumps(value, ensure_ascii=False))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counts["hits"] + self._counts["misses"]
+        return {
+            **self._counts,
+            "entries": len(self.memory),
+            "hit_ratio": round(self._counts["hits"] / lookups, 4) if lookups else 0.0,
+            "disk": self.disk is not None,
+            "disk_ignored": self.disk_ignored,
+        }
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+# orjson writes UTF-8 bytes straight from dicts, lists and dataclasses (several times
+# faster than json + FastAPI's jsonable_encoder). Optional: `pip install orjson`.
+_orjson = importlib.import_module("orjson") if importlib.util.find_spec("orjson") else None
+
+
+def orjson_available() -> bool:
+    return _orjson is not None
+
+
+def dumps(obj: Any) -> bytes:
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    # Return this from an endpoint to skip FastAPI's generic encoder. Content must already
+    # be plain JSON types.
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,690 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import importlib.util
+import io
+import json
+import logging
+import os
+import secrets
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from app.services.cache import derive_key
+from app.services.metrics import WORKER_JOBS
+from app.services.uploads import CHUNK_BYTES, SpooledUpload, spool_max_bytes
+
+# Background jobs: POST /api/v1/jobs stores the input and returns at once; stage workers
+# started in the app lifespan drain the queue. A job passes through one or more stages
+# ("extract", "interpret"), each with its own concurrency. State lives in SQLite, so a
+# restarted process (or another process sharing JOBS_DB_PATH) resumes unfinished jobs:
+# a running job holds a lease that its worker keeps renewing, and a job whose lease
+# lapsed is claimed again, up to JOBS_MAX_ATTEMPTS times.
+#
+# Payloads, results and uploaded files are sealed the way SealedSQLiteCache seals its
+# entries: AES-GCM under a key derived from the job id, with the row stored under a
+# one-way derivation of that id. Workers resuming a job do not know its id, so the key
+# also mixes in a secret kept outside the database (JOBS_KEY_PATH), and the id itself is
+# stored sealed. The database and input files on their own reveal nothing.
+
+STATUSES = ("queued", "running", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    handle TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    input_path TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (stage, status, created);
+"""
+
+COLUMNS = (
+    "handle, kind, stage, status, payload, input_path, result, error, attempts, created, updated"
+)
+# Sealed empty payload of a finished job: inputs are dropped, not just hidden
+DROPPED = "{}"
+# Fails a job and drops its input: params are error, updated, expires
+FAILED = (
+    "status = 'failed', error = ?, input_path = NULL,"
+    f" payload = '{DROPPED}', owner = NULL, updated = ?, expires = ?"
+)
+# Length prefix of each sealed chunk of an input file
+CHUNK_HEADER = struct.Struct(">I")
+
+logger = logging.getLogger("reportrx.jobs")
+
+
+class JobError(Exception):
+    # The job fails with this status and client-safe detail (never request content)
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class JobRetry(Exception):
+    # Transient: put the job back in the queue after `delay_s` without using an attempt
+    def __init__(self, delay_s: float) -> None:
+        super().__init__("retry")
+        self.delay_s = delay_s
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    stage: str
+    status: str
+    payload: Dict[str, Any]
+    input_path: Optional[str]  # sealed uploaded document; open with JobStore.open_input
+    result: Optional[Dict[str, Any]]
+    error: Optional[Dict[str, Any]]
+    attempts: int
+    created: float
+    updated: float
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+def sealed_jobs_available() -> bool:
+    # An on-disk queue holds report contents, so it is only enabled when it can be sealed
+    return importlib.util.find_spec("cryptography") is not None
+
+
+def _row_id(job_id: str) -> str:
+    return derive_key(job_id, "id").hex()
+
+
+def _load_secret(path: str) -> bytes:
+    # Created on first use (mode 0600) and shared by every process using the same file
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    fd, tmp = tempfile.mkstemp(prefix=".jobs-key-", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(32))
+        try:
+            os.link(tmp, path)  # atomic: a racing process keeps whichever key won
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class JobSealer:
+    # AES-GCM under a key derived from the store secret and the row id. With no secret
+    # (in-memory store without the `crypto` extra) values pass through unchanged.
+    def __init__(self, secret: Optional[bytes]) -> None:
+        self._aesgcm: Any = None
+        self._secret = secret.hex() if secret else ""
+        if secret is not None:
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+            self._aesgcm = AESGCM
+
+    @property
+    def sealed(self) -> bool:
+        return self._aesgcm is not None
+
+    def _cipher(self, row_id: str) -> Any:
+        return self._aesgcm(derive_key(f"{self._secret}:{row_id}", "enc"))
+
+    def seal(self, row_id: str, value: Any) -> str:
+        text = json.dumps(value, ensure_ascii=False)
+        if self._aesgcm is None:
+            return text
+        nonce = os.urandom(12)
+        sealed = self._cipher(row_id).encrypt(nonce, text.encode("utf-8"), row_id.encode())
+        return base64.b64encode(nonce + sealed).decode("ascii")
+
+    def open(self, row_id: str, raw: str) -> Any:
+        if self._aesgcm is None or raw == DROPPED:
+            return json.loads(raw)
+        blob = base64.b64decode(raw)
+        return json.loads(self._cipher(row_id).decrypt(blob[:12], blob[12:], row_id.encode()))
+
+    def seal_file(self, row_id: str, src: BinaryIO, dst: BinaryIO) -> None:
+        # Chunk by chunk, so memory stays bounded. Each chunk's index and a last-chunk flag
+        # are authenticated with it: chunks cannot be reordered, dropped or cut off.
+        if self._aesgcm is None:
+            shutil.copyfileobj(src, dst, CHUNK_BYTES)
+            return
+        cipher = self._cipher(row_id)
+        index, chunk = 0, src.read(CHUNK_BYTES)
+        while True:
+            following = src.read(CHUNK_BYTES) if chunk else b""
+            nonce = os.urandom(12)
+            sealed = cipher.encrypt(nonce, chunk, struct.pack(">Q?", index, not following))
+            dst.write(CHUNK_HEADER.pack(len(sealed)) + nonce + sealed)
+            if not following:
+                return
+            index, chunk = index + 1, following
+
+    def open_file(self, row_id: str, src: BinaryIO, dst: BinaryIO) -> None:
+        if self._aesgcm is None:
+            shutil.copyfileobj(src, dst, CHUNK_BYTES)
+            return
+        cipher = self._cipher(row_id)
+        index, header = 0, src.read(CHUNK_HEADER.size)
+        while True:
+            if len(header) < CHUNK_HEADER.size:
+                raise ValueError("sealed input is truncated")
+            (length,) = CHUNK_HEADER.unpack(header)
+            nonce, sealed = src.read(12), src.read(length)
+            header = src.read(CHUNK_HEADER.size)
+            dst.write(cipher.decrypt(nonce, sealed, struct.pack(">Q?", index, not header)))
+            if not header:
+                return
+            index += 1
+
+
+class JobStore:
+    # Job inputs are dropped as soon as a job finishes; results are kept for
+    # `retention_s` and then purged. With no path the store is in memory (nothing
+    # survives a restart) and uploaded files go to a temporary directory. With a path
+    # the store is sealed, which needs the `crypto` extra.
+    def __init__(
+        self,
+        path: str,
+        retention_s: float,
+        max_attempts: int,
+        key_path: Optional[str] = None,
+        files_dir: Optional[str] = None,
+    ) -> None:
+        self.path = path or ":memory:"
+        self.retention_s = retention_s
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        if path:
+            self._sealer = JobSealer(_load_secret(key_path or f"{path}.key"))
+            self.files_dir = files_dir or f"{path}.files"
+            os.makedirs(self.files_dir, mode=0o700, exist_ok=True)
+            self._temp_dir = False
+        else:
+            self._sealer = JobSealer(os.urandom(32) if sealed_jobs_available() else None)
+            self.files_dir = files_dir or tempfile.mkdtemp(
+                prefix="jobs-", dir=os.getenv("UPLOAD_TMP_DIR")
+            )
+            self._temp_dir = files_dir is None
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    @property
+    def sealed(self) -> bool:
+        return self._sealer.sealed
+
+    def _job(self, row: Tuple) -> Job:
+        handle, kind, stage, status, payload, input_path, result, error, *rest = row
+        job_id = self._sealer.open("", handle)
+        row_id = _row_id(job_id)
+        return Job(
+            job_id,
+            kind,
+            stage,
+            status,
+            self._sealer.open(row_id, payload),
+            input_path,
+            self._sealer.open(row_id, result) if result else None,
+            json.loads(error) if error else None,
+            *rest,
+        )
+
+    def create(
+        self,
+        kind: str,
+        stage: str,
+        payload: Dict[str, Any],
+        source: Optional[Union[bytes, str]] = None,
+    ) -> str:
+        # The id is unguessable: it is the only credential needed to read the result.
+        # `source` is an uploaded document (bytes or a spooled file's path), copied to a
+        # sealed file the job owns.
+        job_id = secrets.token_urlsafe(18)
+        row_id = _row_id(job_id)
+        input_path = None
+        if source is not None:
+            input_path = os.path.join(self.files_dir, row_id)
+            self._write_input(row_id, source, input_path)
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, handle, kind, stage, status, payload, input_path,"
+                    " created, updated) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (
+                        row_id,
+                        self._sealer.seal("", job_id),
+                        kind,
+                        stage,
+                        self._sealer.seal(row_id, payload),
+                        input_path,
+                        now,
+                        now,
+                    ),
+                )
+        except BaseException:
+            _remove_inputs([input_path])
+            raise
+        return job_id
+
+    def _write_input(self, row_id: str, source: Union[bytes, str], path: str) -> None:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as dst:
+                if isinstance(source, bytes):
+                    self._sealer.seal_file(row_id, io.BytesIO(source), dst)
+                else:
+                    with open(source, "rb") as src:
+                        self._sealer.seal_file(row_id, src, dst)
+        except BaseException:
+            _remove_inputs([path])
+            raise
+
+    def open_input(self, job: Job, size: int, sha256: str) -> SpooledUpload:
+        # The job's document as the worker pool should see it: bytes when small, else a
+        # temporary plaintext file that is deleted when the upload is closed
+        row_id = _row_id(job.id)
+        with open(job.input_path or "", "rb") as src:
+            if size <= spool_max_bytes():
+                buf = io.BytesIO()
+                self._sealer.open_file(row_id, src, buf)
+                return SpooledUpload(buf.getvalue(), None, size, sha256)
+            fd, path = tempfile.mkstemp(
+                prefix="upload-", suffix=".pdf", dir=os.getenv("UPLOAD_TMP_DIR")
+            )
+            try:
+                with os.fdopen(fd, "wb") as dst:
+                    self._sealer.open_file(row_id, src, dst)
+            except BaseException:
+                os.unlink(path)
+                raise
+        return SpooledUpload(None, path, size, sha256)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {COLUMNS} FROM jobs WHERE id = ? AND (expires IS NULL OR expires >= ?)",
+                (_row_id(job_id), time.time()),
+            ).fetchone()
+        return self._job(row) if row else None
+
+    def delete(self, job_id: str) -> bool:
+        row_id = _row_id(job_id)
+        with self._lock:
+            inputs = self._inputs("id = ?", (row_id,))
+            deleted = self._conn.execute("DELETE FROM jobs WHERE id = ?", (row_id,)).rowcount > 0
+        _remove_inputs(inputs)
+        return deleted
+
+    def _inputs(self, where: str, params: Tuple) -> List[Optional[str]]:
+        rows = self._conn.execute(f"SELECT input_path FROM jobs WHERE {where}", params)
+        return [path for (path,) in rows.fetchall()]
+
+    def claim(self, stage: str, owner: str, lease_s: float) -> Optional[Job]:
+        # Oldest queued job for the stage, or one whose worker stopped renewing its lease.
+        # BEGIN IMMEDIATE so two processes sharing the file never claim the same job.
+        now = time.time()
+        job = None
+        unreadable = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exhausted = "stage = ? AND status = 'running' AND lease_until < ? AND attempts >= ?"
+                dropped = self._inputs(exhausted, (stage, now, self.max_attempts))
+                self._conn.execute(
+                    f"UPDATE jobs SET {FAILED} WHERE {exhausted}",
+                    (
+                        json.dumps({"status": 500, "detail": "Job was interrupted too often."}),
+                        now,
+                        now + self.retention_s,
+                        stage,
+                        now,
+                        self.max_attempts,
+                    ),
+                )
+                while job is None:
+                    row = self._conn.execute(
+                        f"SELECT id, {COLUMNS} FROM jobs WHERE stage = ?"
+                        " AND (status = 'queued' OR (status = 'running' AND lease_until < ?))"
+                        " ORDER BY created LIMIT 1",
+                        (stage, now),
+                    ).fetchone()
+                    if row is None:
+                        break
+                    try:
+                        job = self._job(row[1:])
+                    except Exception:
+                        # Cannot be decoded (key file replaced, damaged row): every attempt
+                        # would fail the same way, so fail it now rather than lease it
+                        unreadable += 1
+                        dropped += self._inputs("id = ?", (row[0],))
+                        self._conn.execute(
+                            f"UPDATE jobs SET {FAILED} WHERE id = ?",
+                            (
+                                json.dumps({"status": 500, "detail": "Job could not be read."}),
+                                now,
+                                now + self.retention_s,
+                                row[0],
+                            ),
+                        )
+                        continue
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, owner = ?,"
+                        " lease_until = ?, updated = ? WHERE id = ?",
+                        (owner, now + lease_s, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        _remove_inputs(dropped)
+        if unreadable:
+            logger.warning({"event": "jobs_unreadable", "stage": stage, "failed": unreadable})
+        if job is None:
+            return None
+        job.status, job.attempts = "running", job.attempts + 1
+        return job
+
+    def renew(self, job_id: str, owner: str, lease_s: float) -> bool:
+        return self._update(job_id, owner, "lease_until = ?", (time.time() + lease_s,))
+
+    def advance(self, job_id: str, owner: str, stage: str, result: Dict[str, Any]) -> bool:
+        # On to the next stage, which starts with a fresh attempt count
+        return self._update(
+            job_id,
+            owner,
+            "stage = ?, status = 'queued', result = ?, attempts = 0, owner = NULL",
+            (stage, self._sealer.seal(_row_id(job_id), result)),
+        )
+
+    def release(self, job_id: str, owner: str) -> bool:
+        # Back in the queue without using up an attempt (shutdown, busy worker pool)
+        return self._update(
+            job_id, owner, "status = 'queued', attempts = attempts - 1, owner = NULL", ()
+        )
+
+    def finish(
+        self,
+        job_id: str,
+        owner: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        row_id = _row_id(job_id)
+        return self._update(
+            job_id,
+            owner,
+            "status = ?, result = ?, error = ?, input_path = NULL,"
+            f" payload = '{DROPPED}', owner = NULL, expires = ?",
+            (
+                "failed" if error else "done",
+                self._sealer.seal(row_id, result) if result is not None else None,
+                json.dumps(error) if error else None,
+                time.time() + self.retention_s,
+            ),
+            drop_input=True,
+        )
+
+    def _update(
+        self,
+        job_id: str,
+        owner: str,
+        assignments: str,
+        params: Tuple,
+        drop_input: bool = False,
+    ) -> bool:
+        # Only the current lease holder may change a running job: a worker that lost its
+        # lease (and whose job was claimed again) must not overwrite the new attempt
+        row_id = _row_id(job_id)
+        where = "id = ? AND owner = ? AND status = 'running'"
+        with self._lock:
+            inputs = self._inputs(where, (row_id, owner)) if drop_input else []
+            cur = self._conn.execute(
+                f"UPDATE jobs SET {assignments}, updated = ? WHERE {where}",
+                (*params, time.time(), row_id, owner),
+            )
+        if cur.rowcount == 0:
+            return False
+        _remove_inputs(inputs)
+        return True
+
+    def purge(self) -> int:
+        # Inputs are removed when a job finishes; this also catches any whose removal was
+        # interrupted
+        now = time.time()
+        with self._lock:
+            inputs = self._inputs("expires < ?", (now,))
+            purged = self._conn.execute("DELETE FROM jobs WHERE expires < ?", (now,)).rowcount
+        _remove_inputs(inputs)
+        return purged
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE expires IS NULL OR expires >= ?"
+                " GROUP BY status",
+                (time.time(),),
+            ).fetchall()
+        return {status: 0 for status in STATUSES} | dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        if self._temp_dir:
+            shutil.rmtree(self.files_dir, ignore_errors=True)
+
+
+def _remove_inputs(paths: List[Optional[str]]) -> None:
+    for path in paths:
+        if path is not None:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+# A stage handler gets the claimed job and returns (next stage or None, result). It
+# raises JobError to fail the job and JobRetry to requeue it.
+Handler = Callable[[Job], Awaitable[Tuple[Optional[str], Dict[str, Any]]]]
+
+_stages: Dict[str, Tuple[Handler, str, int]] = {}
+_store: Optional[JobStore] = None
+
+
+def register_stage(stage: str, handler: Handler, concurrency_env: str, default: int) -> None:
+    _stages[stage] = (handler, concurrency_env, default)
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        path = os.getenv("JOBS_DB_PATH", "").strip()
+        if path and not sealed_jobs_available():
+            logger.warning(
+                {
+                    "event": "jobs_db_path_ignored",
+                    "reason": "JOBS_DB_PATH needs the crypto extra; jobs are kept in memory",
+                }
+            )
+            path = ""
+        _store = JobStore(
+            path,
+            float(os.getenv("JOBS_RETENTION_S", "3600")),
+            int(os.getenv("JOBS_MAX_ATTEMPTS", "3")),
+            key_path=os.getenv("JOBS_KEY_PATH", "").strip() or None,
+            files_dir=os.getenv("JOBS_FILES_DIR", "").strip() or None,
+        )
+    return _store
+
+
+def _lease_s() -> float:
+    return float(os.getenv("JOBS_LEASE_S", "30"))
+
+
+def _poll_s() -> float:
+    # How often idle workers look for jobs enqueued by other processes
+    return float(os.getenv("JOBS_POLL_S", "1.0"))
+
+
+class JobRunner:
+    def __init__(self, store: JobStore) -> None:
+        self.store = store
+        self.owner = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and self._loop is asyncio.get_running_loop()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        for stage, (handler, env, default) in _stages.items():
+            self._wake[stage] = asyncio.Event()
+            for _ in range(max(1, int(os.getenv(env, str(default))))):
+                self._tasks.append(asyncio.create_task(self._work(stage, handler)))
+        self._tasks.append(asyncio.create_task(self._purge()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self, stage: str) -> None:
+        event = self._wake.get(stage)
+        if event is not None:
+            event.set()
+
+    async def _work(self, stage: str, handler: Handler) -> None:
+        # A failing store (a locked database, a disk error) must not end the worker: every
+        # later job of the stage would stay queued. Back off and keep going instead.
+        failures = 0
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, stage, self.owner, _lease_s())
+                if job is not None:
+                    await self._run(job, handler)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                logger.error(
+                    {"event": "jobs_worker_error", "stage": stage, "error": type(e).__name__}
+                )
+                await asyncio.sleep(min(30.0, _poll_s() * 2**failures))
+                continue
+            if job is None:
+                event = self._wake[stage]
+                try:
+                    await asyncio.wait_for(event.wait(), _poll_s())
+                except TimeoutError:
+                    pass
+                event.clear()
+
+    async def _run(self, job: Job, handler: Handler) -> None:
+        start = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        outcome = "ok"
+        try:
+            next_stage, result = await handler(job)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job straight back rather than waiting for the lease
+            self.store.release(job.id, self.owner)
+            raise
+        except JobRetry as e:
+            outcome = "retry"
+            await asyncio.sleep(e.delay_s)
+            await asyncio.to_thread(self.store.release, job.id, self.owner)
+            self.notify(job.stage)
+            return
+        except Exception as e:
+            outcome = "error"
+            error = (
+                {"status": e.status, "detail": e.detail}
+                if isinstance(e, JobError)
+                else {"status": 500, "detail": "Job failed."}
+            )
+            await asyncio.to_thread(self.store.finish, job.id, self.owner, None, error)
+            return
+        finally:
+            heartbeat.cancel()
+            WORKER_JOBS.observe(time.perf_counter() - start, f"jobs_{job.stage}", outcome)
+        if next_stage is None:
+            await asyncio.to_thread(self.store.finish, job.id, self.owner, result)
+        else:
+            await asyncio.to_thread(self.store.advance, job.id, self.owner, next_stage, result)
+            self.notify(next_stage)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        lease_s = _lease_s()
+        while True:
+            await asyncio.sleep(lease_s / 3)
+            await asyncio.to_thread(self.store.renew, job_id, self.owner, lease_s)
+
+    async def _purge(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.store.purge)
+            except Exception as e:
+                logger.error({"event": "jobs_purge_error", "error": type(e).__name__})
+            await asyncio.sleep(60)
+
+
+_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner(get_job_store())
+    return _runner
+
+
+async def start_job_runner() -> None:
+    runner = get_job_runner()
+    if not runner.running:
+        runner.start()
+
+
+async def stop_job_runner() -> None:
+    if _runner is not None:
+        await _runner.stop()
+
+
+def job_stats() -> Dict[str, Any]:
+    store = get_job_store()
+    return {
+        "stages": sorted(_stages),
+        "disk": store.path != ":memory:",
+        "sealed": store.sealed,
+        **store.counts(),
+    }
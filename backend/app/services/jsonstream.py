@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional, Tuple
+
+# (kind, key, value): kind is "field" when a top-level member of the object is complete,
+# or "item" when one element of a top-level array member is complete.
+StreamEvent = Tuple[str, str, Any]
+
+
+class JSONObjectStream:
+    # Incremental scanner for a single JSON object arriving in arbitrary chunks.
+    # It only tracks enough structure (strings, nesting, commas) to know when a
+    # top-level member or an element of a top-level array has closed; each such
+    # slice is then decoded with json.loads.
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_str = False
+        self._esc = False
+        self._str_start = 0
+        self._expect_key = True
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self.closed = False
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        self._text += chunk
+        events: List[StreamEvent] = []
+        text = self._text
+        stack = self._stack
+        for i in range(self._pos, len(text)):
+            if self.closed:
+                break
+            c = text[i]
+            depth = len(stack)
+            in_top_array = depth == 2 and stack[1] == "["
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+                    if depth == 1:
+                        if self._expect_key:
+                            self._key = _loads(text[self._str_start : i + 1])
+                        else:
+                            self._emit(events, "field", text[self._value_start : i + 1])
+                            self._value_start = None
+                    elif in_top_array and self._item_start == self._str_start:
+                        self._emit(events, "item", text[self._item_start : i + 1])
+                        self._item_start = None
+                continue
+            if c.isspace():
+                continue
+            if c == '"':
+                self._in_str = True
+                self._str_start = i
+                self._mark_value_start(i, depth, in_top_array)
+            elif c in "{[":
+                self._mark_value_start(i, depth, in_top_array)
+                stack.append(c)
+                if len(stack) == 1:
+                    self._expect_key = True
+            elif c in "}]":
+                if in_top_array and c == "]" and self._item_start is not None:
+                    # Trailing scalar element, e.g. the 3 in [1, 2, 3]
+                    self._emit(events, "item", text[self._item_start : i])
+                    self._item_start = None
+                if depth == 1 and self._value_start is not None:
+                    # Trailing scalar member of the top-level object
+                    self._emit(events, "field", text[self._value_start : i])
+                    self._value_start = None
+                if stack:
+                    stack.pop()
+                depth = len(stack)
+                if depth == 2 and stack[1] == "[" and self._item_start is not None:
+                    self._emit(events, "item", text[self._item_start : i + 1])
+                    self._item_start = None
+                elif depth == 1 and self._value_start is not None:
+                    self._emit(events, "field", text[self._value_start : i + 1])
+                    self._value_start = None
+                elif depth == 0:
+                    self.closed = True
+            elif c == ",":
+                if depth == 1:
+                    if self._value_start is not None:
+                        self._emit(events, "field", text[self._value_start : i])
+                        self._value_start = None
+                    self._expect_key = True
+                elif in_top_array and self._item_start is not None:
+                    self._emit(events, "item", text[self._item_start : i])
+                    self._item_start = None
+            elif c == ":":
+                if depth == 1:
+                    self._expect_key = False
+            else:
+                # Start of a number or literal
+                self._mark_value_start(i, depth, in_top_array)
+        self._pos = len(text)
+        return events
+
+    def _mark_value_start(self, i: int, depth: int, in_top_array: bool) -> None:
+        if depth == 1 and not self._expect_key and self._value_start is None:
+            self._value_start = i
+        elif in_top_array and self._item_start is None:
+            self._item_start = i
+
+    def _emit(self, events: List[StreamEvent], kind: str, raw: str) -> None:
+        if self._key is None:
+            return
+        try:
+            events.append((kind, self._key, json.loads(raw)))
+        except json.JSONDecodeError:
+            # Malformed fragment: skip it; the caller falls back for missing sections
+            pass
+
+
+def _loads(raw: str) -> Optional[str]:
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, str) else None
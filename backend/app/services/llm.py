@@ -1,13 +1,39 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import importlib.util
 import json
 import os
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import httpx
 from pydantic import BaseModel, Field, ValidationError
 
+from app.services.cache import TieredCache, TTLCache, sealed_disk_tier
+from app.services.jsonstream import JSONObjectStream
+from app.services.metrics import (
+    LLM_CALLS,
+    LLM_FALLBACKS,
+    LLM_REPAIRS,
+    LLM_TOKENS,
+    STAGE_LATENCY,
+    timed_stage,
+)
+from app.services.normalize import canonical_test, canonical_unit, display_name
+from app.services.prompt import (
+    COLUMNS_LINE,
+    ROW_FORMAT_NOTE,
+    EncodedRow,
+    dumps_rows,
+    encode_row,
+    estimate_tokens,
+    rows_token_budget,
+    select_rows,
+)
+from app.services.resilience import CircuitBreaker, LatencyTracker, backoff_s, retry_after_s
+
 
 class ParsedRowIn(BaseModel):
     test_name: str
@@ -43,31 +69,67 @@ SYS_PROMPT = (
 )
 
 
+# Bump whenever SYS_PROMPT, the instructions or the row encoding change, so cached
+# interpretations produced by an older prompt are not served.
+PROMPT_VERSION = "3"
+
+
+def encode_parsed_row(r: ParsedRowIn) -> EncodedRow:
+    # Names and units are canonicalised (names are looked up again: the user may have
+    # edited them), so "HGB" and "Haemoglobin" make the same prompt and cache entry
+    code = canonical_test(r.test_name)
+    return encode_row(
+        display_name(code) if code else r.test_name,
+        r.value,
+        canonical_unit(r.unit) or r.unit,
+        r.reference_range,
+        r.flag,
+    )
+
+
+def _trim_rows(
+    rows: List[ParsedRowIn], encoded: Optional[List[EncodedRow]] = None
+) -> List[EncodedRow]:
+    # Essential fields only, compactly encoded, and only as many rows as the token
+    # budget allows (abnormal rows first). Callers that encoded the rows as they
+    # arrived (see /analyze) pass them as `encoded`.
+    if encoded is None:
+        encoded = [encode_parsed_row(r) for r in rows]
+    return select_rows(encoded, rows_token_budget())[0]
+
+
+def _row_counts(rows: List[ParsedRowIn], trimmed: List[EncodedRow]) -> Dict[str, int]:
+    return {"included": len(trimmed), "elided": len(rows) - len(trimmed)}
+
+
 def _build_user_prompt(rows: List[ParsedRowIn]) -> str:
-    # Trim to essential fields and rows to keep payload small
-    MAX_ROWS = 30
-    trimmed = [
-        {
-            "test_name": r.test_name,
-            "value": r.value,
-            "unit": r.unit,
-            "reference_range": r.reference_range,
-            "flag": r.flag,
-        }
-        for r in rows[:MAX_ROWS]
-    ]
+    return _prompt_for_trimmed(_trim_rows(rows))
+
+
+def _prompt_for_trimmed(trimmed: List[EncodedRow]) -> str:
+    with timed_stage("prompt_build"):
+        return _render_prompt(trimmed)
+
+
+def _render_prompt(trimmed: List[EncodedRow]) -> str:
     instructions = (
         "Given the following parsed lab rows, produce a JSON object with keys: "
         "summary (<=120 words), per_test (array of {test_name, explanation}), "
         "flags (array of {test_name, severity, note}), next_steps (array of 4-6 strings), "
         "disclaimer (short). The first item of next_steps must be: \"Please schedule a visit with your doctor to review these results and your overall health.\" "
         "Keep total length around 200-300 words. Educational only. No diagnosis or treatment. "
-        "Return JSON only with double quotes."
+        "Return JSON only with double quotes. " + ROW_FORMAT_NOTE
     )
-    return instructions + "\n\nROWS:\n" + json.dumps(trimmed, ensure_ascii=False)
+    return instructions + "\n\n" + COLUMNS_LINE + "\nROWS:\n" + dumps_rows(trimmed)
 
 
 def _fallback_interpretation(rows: List[ParsedRowIn]) -> InterpretationOut:
+    LLM_FALLBACKS.inc()
+    with timed_stage("fallback"):
+        return _deterministic_interpretation(rows)
+
+
+def _deterministic_interpretation(rows: List[ParsedRowIn]) -> InterpretationOut:
     flagged: List[FlagItem] = []
     for r in rows:
         if r.flag in {"low", "high", "abnormal"}:
@@ -122,15 +184,103 @@ def _fallback_interpretation(rows: List[ParsedRowIn]) -> InterpretationOut:
     )
 
 
-async def _call_openai_chat(prompt: str, timeout_s: float) -> str:
+# One application-scoped client so interpretations reuse pooled keep-alive connections
+# instead of paying a TCP+TLS handshake per call. Created in the app lifespan hook, or
+# lazily on first use (e.g. under TestClient without a lifespan context).
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool_counters: Dict[str, int] = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "errors": 0}
+
+
+def _read_timeout_s() -> float:
+    return float(os.getenv("LLM_READ_TIMEOUT_S", "4.5"))
+
+
+def _llm_timeout(read_s: Optional[float] = None) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=float(os.getenv("LLM_CONNECT_TIMEOUT_S", "2.0")),
+        read=read_s if read_s is not None else _read_timeout_s(),
+        write=float(os.getenv("LLM_WRITE_TIMEOUT_S", "2.0")),
+        pool=float(os.getenv("LLM_POOL_TIMEOUT_S", "1.0")),
+    )
+
+
+def _http2_enabled() -> bool:
+    # HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+    if os.getenv("LLM_HTTP2", "0").lower() not in {"1", "true", "yes"}:
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY_S", "30")),
+    )
+    return httpx.AsyncClient(limits=limits, timeout=_llm_timeout(), http2=_http2_enabled())
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    # Pooled connections belong to the loop that opened them
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = create_http_client()
+        _http_client_loop = loop
+    return _http_client
+
+
+async def start_http_client() -> None:
+    get_http_client()
+
+
+async def warm_http_client() -> None:
+    # Opens one pooled connection (DNS, TCP, TLS) to the provider ahead of the first
+    # interpretation. Any HTTP status will do; the request carries no credentials.
+    client = get_http_client()
+    if not os.getenv("OPENAI_API_KEY", "").strip():
+        return
+    if os.getenv("LLM_PREWARM", "1").lower() in {"0", "false", "no"}:
+        return
+    url = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1/chat/completions")
+    await client.head(url, timeout=_llm_timeout(read_s=2.0))
+
+
+async def close_http_client() -> None:
+    global _http_client, _http_client_loop
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def llm_pool_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_pool_counters)
+    client = _http_client
+    stats["http2"] = _http2_enabled()
+    stats["connections"] = 0
+    stats["idle_connections"] = 0
+    if client is not None and not client.is_closed:
+        # httpcore does not expose pool usage publicly; read it defensively
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats["connections"] = len(connections)
+        stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+    return stats
+
+
+def _model_name() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+def _chat_request(prompt: str, stream: bool = False) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
     api_key = os.getenv("OPENAI_API_KEY", "").strip()
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY not configured")
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     url = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1/chat/completions")
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    payload = {
-        "model": model,
+    payload: Dict[str, Any] = {
+        "model": _model_name(),
         "messages": [
             {"role": "system", "content": SYS_PROMPT},
             {"role": "user", "content": prompt},
@@ -138,22 +288,366 @@ async def _call_openai_chat(prompt: str, timeout_s: float) -> str:
         "temperature": 0.2,
         "response_format": {"type": "json_object"},
     }
-    async with httpx.AsyncClient(timeout=timeout_s) as client:
-        r = await client.post(url, headers=headers, json=payload)
+    if stream:
+        payload["stream"] = True
+    return url, headers, payload
+
+
+def _track_request_start() -> None:
+    _pool_counters["requests"] += 1
+    _pool_counters["in_flight"] += 1
+    if _pool_counters["in_flight"] > _pool_counters["max_in_flight"]:
+        _pool_counters["max_in_flight"] = _pool_counters["in_flight"]
+
+
+def _count_tokens(usage: Any) -> None:
+    # OpenAI-style {"prompt_tokens", "completion_tokens"}; providers that omit it count nothing
+    if isinstance(usage, dict):
+        for kind in ("prompt", "completion"):
+            n = usage.get(f"{kind}_tokens")
+            if isinstance(n, int) and n > 0:
+                LLM_TOKENS.inc(kind, amount=n)
+
+
+async def _call_openai_chat(prompt: str, timeout_s: Optional[float] = None) -> str:
+    url, headers, payload = _chat_request(prompt)
+    client = get_http_client()
+    _track_request_start()
+    try:
+        r = await client.post(url, headers=headers, json=payload, timeout=_llm_timeout(timeout_s))
         r.raise_for_status()
         data = r.json()
+        _count_tokens(data.get("usage"))
         return data["choices"][0]["message"]["content"]
+    except Exception:
+        _pool_counters["errors"] += 1
+        raise
+    finally:
+        _pool_counters["in_flight"] -= 1
+
+
+async def _stream_openai_chat(prompt: str, timeout_s: Optional[float] = None) -> AsyncIterator[str]:
+    # Yields content deltas from an OpenAI-style SSE chat completion stream
+    url, headers, payload = _chat_request(prompt, stream=True)
+    client = get_http_client()
+    _track_request_start()
+    try:
+        timeout = _llm_timeout(timeout_s)
+        async with client.stream("POST", url, headers=headers, json=payload, timeout=timeout) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                except (ValueError, AttributeError, IndexError, KeyError) as e:
+                    # A garbled chunk says as much about the provider as a 5xx does
+                    raise httpx.DecodingError("malformed stream chunk", request=r.request) from e
+                if delta:
+                    yield delta
+    except Exception:
+        _pool_counters["errors"] += 1
+        raise
+    finally:
+        _pool_counters["in_flight"] -= 1
+
+
+def _cache_key(trimmed: List[EncodedRow]) -> str:
+    # Content address: only this digest is ever stored, never the rows themselves
+    canonical = json.dumps(
+        {"v": PROMPT_VERSION, "model": _model_name(), "rows": trimmed},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+_interpret_cache: Optional[TieredCache] = None
+
+
+def get_interpret_cache() -> TieredCache:
+    global _interpret_cache
+    if _interpret_cache is None:
+        ttl_s = float(os.getenv("INTERPRET_CACHE_TTL_S", "3600"))
+        memory = TTLCache(int(os.getenv("INTERPRET_CACHE_SIZE", "256")), ttl_s)
+        # Interpretations are derived from lab values: the disk tier is sealed under the
+        # prompt digest, like the parse cache's under the document hash
+        path = os.getenv("INTERPRET_CACHE_PATH", "").strip()
+        disk = sealed_disk_tier("INTERPRET_CACHE_PATH", path, ttl_s)
+        _interpret_cache = TieredCache(memory, disk, disk_ignored=bool(path) and disk is None)
+    return _interpret_cache
+
+
+# Meta keys clients may see. Never include PHI; meta only contains timings and opaque info
+META_KEYS = (
+    "duration_ms",
+    "llm",
+    "attempts",
+    "ok",
+    "cache",
+    "coalesced",
+    "breaker",
+    "hedged",
+    "attempt_timings",
+    "batch",
+    "rows",
+)
+
+
+def public_meta(meta: Dict[str, Any], extra: tuple = ()) -> Dict[str, Any]:
+    return {k: meta[k] for k in META_KEYS + extra if k in meta}
 
 
 async def interpret_rows(rows: List[ParsedRowIn]) -> Tuple[InterpretationOut, Dict[str, Any]]:
     start = time.perf_counter()
-    meta: Dict[str, Any] = {"llm": "none", "attempts": 0}
+    trimmed = _trim_rows(rows)
+    key = _cache_key(trimmed)
+    cache = get_interpret_cache()
+    cached = await cache.get(key)
+    if cached is not None:
+        meta: Dict[str, Any] = {"llm": "cache", "attempts": 0, "ok": True}
+        result = InterpretationOut.model_validate(cached)
+    else:
+        result, meta = await _interpret_single_flight(key, rows, trimmed)
+    stats = cache.stats()
+    meta["cache"] = {
+        "status": "hit" if cached is not None else "miss",
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+    }
+    meta["rows"] = _row_counts(rows, trimmed)
+    meta["duration_ms"] = int((time.perf_counter() - start) * 1000)
+    return result, meta
+
+
+# Single-flight: concurrent callers with the same canonical rows share one in-flight
+# interpretation (LLM call, repair attempt and fallback decision included).
+_inflight: Dict[str, asyncio.Task[Tuple[InterpretationOut, Dict[str, Any]]]] = {}
+_single_flight_counts: Dict[str, int] = {"leaders": 0, "coalesced": 0}
+
+
+def single_flight_stats() -> Dict[str, int]:
+    return {**_single_flight_counts, "in_flight": len(_inflight)}
+
+
+async def _interpret_and_store(
+    key: str, rows: List[ParsedRowIn], trimmed: List[EncodedRow]
+) -> Tuple[InterpretationOut, Dict[str, Any]]:
+    result, meta = await _interpret_uncached(rows, _prompt_for_trimmed(trimmed))
+    # Only real LLM answers are worth caching; the fallback is cheap to recompute
+    if meta.get("ok"):
+        await get_interpret_cache().set(key, result.model_dump())
+    return result, meta
+
+
+async def _interpret_single_flight(
+    key: str, rows: List[ParsedRowIn], trimmed: List[EncodedRow]
+) -> Tuple[InterpretationOut, Dict[str, Any]]:
+    task = _inflight.get(key)
+    coalesced = task is not None and task.get_loop() is asyncio.get_running_loop()
+    if coalesced:
+        _single_flight_counts["coalesced"] += 1
+    else:
+        _single_flight_counts["leaders"] += 1
+        # A separate task, so one caller disconnecting does not cancel the shared work
+        task = asyncio.ensure_future(_interpret_and_store(key, rows, trimmed))
+        _inflight[key] = task
+
+        def _forget(t: asyncio.Task) -> None:
+            if _inflight.get(key) is t:
+                del _inflight[key]
+
+        task.add_done_callback(_forget)
+    result, shared_meta = await asyncio.shield(task)
+    meta = dict(shared_meta)
+    meta["coalesced"] = coalesced
+    return result, meta
+
+
+REPAIR_PROMPT = (
+    "Return the same content as strict valid JSON only. Do not include any prose or code fences."
+)
+
+# Resilience: an overall per-request deadline, a hedged duplicate request after a
+# p95-based delay, a circuit breaker that short-circuits to the fallback while the
+# provider is failing, and backoff that honours 429/Retry-After.
+_breaker: Optional[CircuitBreaker] = None
+_latency = LatencyTracker()
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            window=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "10")),
+            error_rate=float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5")),
+            open_s=float(os.getenv("LLM_BREAKER_OPEN_S", "30")),
+        )
+    return _breaker
+
+
+def _deadline_s() -> float:
+    return float(os.getenv("LLM_DEADLINE_S", "8.0"))
+
+
+def _hedge_delay_s() -> Optional[float]:
+    if os.getenv("LLM_HEDGE", "1").lower() in {"0", "false", "no"}:
+        return None
+    lo = float(os.getenv("LLM_HEDGE_MIN_DELAY_S", "0.5"))
+    hi = float(os.getenv("LLM_HEDGE_MAX_DELAY_S", "3.0"))
+    # Until there are enough samples for a stable p95, hedge late rather than early
+    p95 = _latency.percentile(95) if len(_latency) >= 20 else None
+    return hi if p95 is None else min(hi, max(lo, p95))
+
+
+def llm_resilience_stats() -> Dict[str, Any]:
+    p50 = _latency.percentile(50)
+    p95 = _latency.percentile(95)
+    hedge = _hedge_delay_s()
+    return {
+        "breaker": get_breaker().snapshot(),
+        "latency_samples": len(_latency),
+        "latency_p50_ms": int(p50 * 1000) if p50 is not None else None,
+        "latency_p95_ms": int(p95 * 1000) if p95 is not None else None,
+        "hedge_delay_ms": int(hedge * 1000) if hedge is not None else None,
+    }
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+async def _timed_call(
+    prompt: str, timeout_s: float, kind: str, timings: List[Dict[str, Any]]
+) -> str:
+    # One upstream call; records an opaque timing entry and feeds the breaker
+    entry: Dict[str, Any] = {"kind": kind, "ms": 0, "outcome": "pending"}
+    timings.append(entry)
+    t0 = time.perf_counter()
+    try:
+        raw = await _call_openai_chat(prompt, timeout_s=timeout_s)
+    except asyncio.CancelledError:
+        entry["outcome"] = "cancelled"
+        raise
+    except httpx.HTTPStatusError as e:
+        entry["outcome"] = str(e.response.status_code)
+        get_breaker().record(False)
+        raise
+    except (TimeoutError, httpx.HTTPError):
+        entry["outcome"] = "error"
+        get_breaker().record(False)
+        raise
+    except Exception:
+        # e.g. not configured: says nothing about the provider's health
+        entry["outcome"] = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        entry["ms"] = int(elapsed * 1000)
+        STAGE_LATENCY.observe(elapsed, "llm_repair" if kind == "repair" else "llm_call")
+        if entry["outcome"] != "pending":
+            LLM_CALLS.inc(kind, entry["outcome"])
+    entry["outcome"] = "ok"
+    LLM_CALLS.inc(kind, "ok")
+    _latency.observe(time.perf_counter() - t0)
+    get_breaker().record(True)
+    return raw
+
+
+async def _race(
+    prompt: str,
+    budget_s: float,
+    meta: Dict[str, Any],
+    kind: str,
+    hedge: bool,
+    read_timeout_s: Optional[float] = None,
+) -> str:
+    # Primary call plus, if it is slower than the hedge delay, a duplicate; first success wins
+    timings = meta["attempt_timings"]
+    read_timeout_s = read_timeout_s or _read_timeout_s()
+    end = time.perf_counter() + budget_s
+    primary = _timed_call(prompt, min(read_timeout_s, budget_s), kind, timings)
+    pending = {asyncio.ensure_future(primary)}
     try:
-        prompt = _build_user_prompt(rows)
+        delay = _hedge_delay_s() if hedge else None
+        if delay is not None and delay < budget_s:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                meta["hedged"] = True
+                hedge_timeout = min(read_timeout_s, end - time.perf_counter())
+                hedged = _timed_call(prompt, hedge_timeout, "hedge", timings)
+                pending.add(asyncio.ensure_future(hedged))
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = max(0.0, end - time.perf_counter())
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                raise TimeoutError()
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _call_with_budget(
+    prompt: str,
+    deadline: float,
+    meta: Dict[str, Any],
+    kind: str,
+    hedge: bool,
+    read_timeout_s: Optional[float] = None,
+) -> str:
+    retries = 0
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError()
+        meta["attempts"] += 1
+        try:
+            return await _race(prompt, remaining, meta, kind, hedge, read_timeout_s)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_STATUS:
+                raise
+            if retries >= int(os.getenv("LLM_MAX_RETRIES", "2")):
+                raise
+            wait = retry_after_s(e)
+            if wait is None:
+                wait = backoff_s(retries, float(os.getenv("LLM_BACKOFF_BASE_S", "0.25")))
+            # If the provider asks us to wait past our deadline, fall back right away
+            if time.perf_counter() + wait >= deadline:
+                raise
+            retries += 1
+            kind = "retry"
+            await asyncio.sleep(wait)
+
+
+async def _interpret_uncached(
+    rows: List[ParsedRowIn], prompt: str
+) -> Tuple[InterpretationOut, Dict[str, Any]]:
+    start = time.perf_counter()
+    deadline = start + _deadline_s()
+    breaker = get_breaker()
+    meta: Dict[str, Any] = {"llm": "none", "attempts": 0, "attempt_timings": []}
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError()
         # First attempt
         meta["llm"] = "openai"
-        meta["attempts"] = 1
-        raw = await _call_openai_chat(prompt, timeout_s=4.5)
+        raw = await _call_with_budget(prompt, deadline, meta, "primary", hedge=True)
         try:
             obj = json.loads(raw)
             parsed = InterpretationOut.model_validate(obj)
@@ -161,11 +655,9 @@ async def interpret_rows(rows: List[ParsedRowIn]) -> Tuple[InterpretationOut, Di
             return parsed, meta
         except (json.JSONDecodeError, ValidationError):
             # One repair attempt: ask the model to return only valid JSON
-            meta["attempts"] = 2
-            repair_prompt = (
-                "Return the same content as strict valid JSON only. Do not include any prose or code fences."
-            )
-            raw2 = await _call_openai_chat(prompt + "\n\n" + repair_prompt, timeout_s=4.5)
+            LLM_REPAIRS.inc()
+            repair = prompt + "\n\n" + REPAIR_PROMPT
+            raw2 = await _call_with_budget(repair, deadline, meta, "repair", hedge=False)
             obj2 = json.loads(raw2)
             parsed2 = InterpretationOut.model_validate(obj2)
             meta["ok"] = True
@@ -175,9 +667,285 @@ async def interpret_rows(rows: List[ParsedRowIn]) -> Tuple[InterpretationOut, Di
         meta["ok"] = False
 
     finally:
+        meta["breaker"] = breaker.state
         meta["duration_ms"] = int((time.perf_counter() - start) * 1000)
 
     # Fallback path with deterministic JSON
     fb = _fallback_interpretation(rows)
     return fb, meta
 
+
+async def interpret_rows_stream(
+    rows: List[ParsedRowIn], encoded: Optional[List[EncodedRow]] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    # Streaming counterpart of interpret_rows. Yields (event, data) pairs: "summary",
+    # "per_test" and "flag" items, "next_steps", "disclaimer" as soon as each validates,
+    # then "done" with meta. Sections the model never completed come from the fallback.
+    start = time.perf_counter()
+    trimmed = _trim_rows(rows, encoded)
+    key = _cache_key(trimmed)
+    cache = get_interpret_cache()
+    counts = _row_counts(rows, trimmed)
+    meta: Dict[str, Any] = {"llm": "none", "attempts": 0, "ok": False, "rows": counts}
+    completed: Set[str] = set()
+    seen_tests: Set[str] = set()
+    seen_flags = 0
+    flag_items = 0
+
+    cached = await cache.get(key)
+    if cached is not None:
+        meta = {"llm": "cache", "attempts": 0, "ok": True, "rows": counts}
+        for event in _interpretation_events(InterpretationOut.model_validate(cached)):
+            yield event
+        meta["duration_ms"] = int((time.perf_counter() - start) * 1000)
+        yield "done", meta
+        return
+
+    parser = JSONObjectStream()
+    breaker = get_breaker()
+    # The read timeout only bounds each gap between chunks; the deadline bounds the whole
+    # stream, so a provider trickling tokens cannot hold the request open
+    deadline = start + _deadline_s()
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError()
+        prompt = _prompt_for_trimmed(trimmed)
+        meta["llm"], meta["attempts"] = "openai", 1
+        deltas = _stream_openai_chat(prompt, _read_timeout_s())
+        try:
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError()
+                try:
+                    delta = await asyncio.wait_for(anext(deltas), remaining)
+                except StopAsyncIteration:
+                    break
+                for kind, field, value in parser.feed(delta):
+                    if kind == "item" and field == "per_test":
+                        item = _validated(PerTestItem, value)
+                        if item is not None:
+                            seen_tests.add(_test_key(item.test_name))
+                            yield "per_test", item.model_dump()
+                    elif kind == "item" and field == "flags":
+                        flag_items += 1
+                        flag = _validated(FlagItem, value)
+                        if flag is not None:
+                            seen_flags += 1
+                            yield "flag", flag.model_dump()
+                    elif kind == "field":
+                        if field in {"summary", "disclaimer"} and isinstance(value, str):
+                            yield field, value
+                            completed.add(field)
+                        elif field == "next_steps" and isinstance(value, list):
+                            yield field, [str(v) for v in value]
+                            completed.add(field)
+                        elif field == "per_test" and seen_tests:
+                            completed.add(field)
+                        elif field == "flags" and (seen_flags or not flag_items):
+                            # An empty list is an answer; items that all failed are not
+                            completed.add(field)
+        except httpx.HTTPStatusError as e:
+            LLM_CALLS.inc("stream", str(e.response.status_code))
+            breaker.record(False)
+            raise
+        except (TimeoutError, httpx.HTTPError):
+            LLM_CALLS.inc("stream", "error")
+            breaker.record(False)
+            raise
+        finally:
+            await deltas.aclose()
+        LLM_CALLS.inc("stream", "ok")
+        breaker.record(True)
+        full = InterpretationOut.model_validate_json(parser.text)
+        meta["ok"] = True
+        await cache.set(key, full.model_dump())
+    except Exception:
+        # Broken stream, upstream error or invalid JSON: fill in what is missing below
+        pass
+    meta["breaker"] = breaker.state
+
+    sections = ("summary", "per_test", "flags", "next_steps", "disclaimer")
+    missing = [section for section in sections if section not in completed]
+    if missing:
+        fb = _fallback_interpretation(rows)
+        if "summary" in missing:
+            yield "summary", fb.summary
+        if "per_test" in missing:
+            for item in fb.per_test:
+                if _test_key(item.test_name) not in seen_tests:
+                    yield "per_test", item.model_dump()
+        if "flags" in missing and not seen_flags:
+            for flag in fb.flags:
+                yield "flag", flag.model_dump()
+        if "next_steps" in missing:
+            yield "next_steps", fb.next_steps
+        if "disclaimer" in missing:
+            yield "disclaimer", fb.disclaimer
+        meta["fallback_sections"] = missing
+    meta["duration_ms"] = int((time.perf_counter() - start) * 1000)
+    yield "done", meta
+
+
+def _test_key(name: str) -> str:
+    # The model echoes canonical display names while fallback items carry the report's
+    # own spelling: compare on the test code when the name has one
+    return canonical_test(name) or name.strip().casefold()
+
+
+def _validated(model: Any, value: Any) -> Any:
+    try:
+        return model.model_validate(value)
+    except ValidationError:
+        return None
+
+
+def _interpretation_events(result: InterpretationOut) -> List[Tuple[str, Any]]:
+    events: List[Tuple[str, Any]] = [("summary", result.summary)]
+    events += [("per_test", item.model_dump()) for item in result.per_test]
+    events += [("flag", flag.model_dump()) for flag in result.flags]
+    events += [("next_steps", result.next_steps), ("disclaimer", result.disclaimer)]
+    return events
+
+
+# Batch interpretation: many reports per request, packed several to a prompt so the
+# system prompt and instructions are paid once per pack instead of once per report.
+BATCH_INSTRUCTIONS = (
+    "You are given several independent lab reports, each with an integer id. For EACH report "
+    "produce the same JSON object you would for a single report, with keys: id, "
+    "summary (<=120 words), per_test (array of {test_name, explanation}), "
+    "flags (array of {test_name, severity, note}), next_steps (array of 4-6 strings), "
+    "disclaimer (short). The first item of next_steps must be: \"Please schedule a visit with "
+    "your doctor to review these results and your overall health.\" Educational only. No "
+    "diagnosis or treatment. Return JSON only, shaped as {\"results\": [...]}, one entry per id. "
+    + ROW_FORMAT_NOTE
+)
+
+
+def _pack_reports(
+    items: List[Tuple[int, List[EncodedRow]]], token_budget: int, max_per_prompt: int
+) -> List[List[int]]:
+    # Greedy, order-preserving packing under the token budget
+    base = estimate_tokens(SYS_PROMPT + BATCH_INSTRUCTIONS + COLUMNS_LINE)
+    packs: List[List[int]] = []
+    current: List[int] = []
+    used = base
+    for idx, trimmed in items:
+        cost = estimate_tokens(dumps_rows(trimmed)) + 4
+        if current and (used + cost > token_budget or len(current) >= max_per_prompt):
+            packs.append(current)
+            current, used = [], base
+        current.append(idx)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+async def _interpret_pack(
+    pack: List[int],
+    row_sets: List[List[ParsedRowIn]],
+    trimmed_sets: List[List[EncodedRow]],
+    keys: List[str],
+) -> Dict[int, Tuple[InterpretationOut, Dict[str, Any]]]:
+    start = time.perf_counter()
+    breaker = get_breaker()
+    meta: Dict[str, Any] = {"llm": "none", "attempts": 0, "attempt_timings": []}
+    answers: Dict[int, Any] = {}
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError()
+        meta["llm"] = "openai"
+        reports = [{"id": local_id, "rows": trimmed_sets[i]} for local_id, i in enumerate(pack)]
+        prompt = BATCH_INSTRUCTIONS + "\n\n" + COLUMNS_LINE + "\nREPORTS:\n" + dumps_rows(reports)
+        deadline = start + float(os.getenv("LLM_BATCH_DEADLINE_S", "30"))
+        read_timeout_s = float(os.getenv("LLM_BATCH_READ_TIMEOUT_S", "25"))
+        raw = await _call_with_budget(prompt, deadline, meta, "batch", False, read_timeout_s)
+        results = json.loads(raw).get("results")
+        if isinstance(results, list):
+            answers = {r.get("id"): r for r in results if isinstance(r, dict)}
+    except Exception:
+        # Whole pack failed: every report in it falls back individually below
+        pass
+    meta["breaker"] = breaker.state
+    meta["duration_ms"] = int((time.perf_counter() - start) * 1000)
+
+    out: Dict[int, Tuple[InterpretationOut, Dict[str, Any]]] = {}
+    for local_id, i in enumerate(pack):
+        item_meta = dict(meta, batch={"pack_size": len(pack)})
+        answer = answers.get(local_id)
+        parsed: Optional[InterpretationOut] = None
+        if answer is not None:
+            parsed = _validated(InterpretationOut, {k: v for k, v in answer.items() if k != "id"})
+        if parsed is not None:
+            item_meta["ok"] = True
+            await get_interpret_cache().set(keys[i], parsed.model_dump())
+        else:
+            item_meta["ok"] = False
+            parsed = _fallback_interpretation(row_sets[i])
+        out[i] = (parsed, item_meta)
+    return out
+
+
+async def interpret_rows_batch(
+    row_sets: List[List[ParsedRowIn]],
+    concurrency: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    max_per_prompt: Optional[int] = None,
+) -> Tuple[List[Tuple[InterpretationOut, Dict[str, Any]]], Dict[str, Any]]:
+    # Results come back in input order, one (interpretation, meta) pair per row set
+    start = time.perf_counter()
+    concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "4"))
+    token_budget = token_budget or int(os.getenv("BATCH_TOKEN_BUDGET", "3000"))
+    max_per_prompt = max_per_prompt or int(os.getenv("BATCH_MAX_REPORTS_PER_PROMPT", "8"))
+
+    trimmed_sets = [_trim_rows(rows) for rows in row_sets]
+    keys = [_cache_key(trimmed) for trimmed in trimmed_sets]
+    results: List[Optional[Tuple[InterpretationOut, Dict[str, Any]]]] = [None] * len(row_sets)
+
+    # Cache first; identical reports inside the batch are interpreted once
+    cache = get_interpret_cache()
+    first_by_key: Dict[str, int] = {}
+    cache_hits = 0
+    for i, key in enumerate(keys):
+        if key in first_by_key:
+            continue
+        first_by_key[key] = i
+        cached = await cache.get(key)
+        if cached is not None:
+            cache_hits += 1
+            meta = {"llm": "cache", "attempts": 0, "ok": True, "cache": {"status": "hit"}}
+            results[i] = (InterpretationOut.model_validate(cached), meta)
+
+    todo = [(i, trimmed_sets[i]) for i in first_by_key.values() if results[i] is None]
+    packs = _pack_reports(todo, token_budget, max_per_prompt)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_pack(pack: List[int]) -> None:
+        async with semaphore:
+            if len(pack) == 1:
+                # A lone report takes the regular path (single-flight, hedging, repair)
+                results[pack[0]] = await interpret_rows(row_sets[pack[0]])
+                return
+            for i, result in (await _interpret_pack(pack, row_sets, trimmed_sets, keys)).items():
+                results[i] = result
+
+    await asyncio.gather(*(run_pack(pack) for pack in packs))
+
+    for i, key in enumerate(keys):
+        shared = results[first_by_key[key]]
+        if results[i] is None and shared is not None:
+            results[i] = (shared[0], dict(shared[1]))
+        if results[i] is not None:
+            results[i][1]["rows"] = _row_counts(row_sets[i], trimmed_sets[i])
+
+    elapsed = time.perf_counter() - start
+    batch_meta = {
+        "count": len(row_sets),
+        "packs": len(packs),
+        "cache_hits": cache_hits,
+        "fallbacks": sum(1 for r in results if r is not None and not r[1].get("ok")),
+        "duration_ms": int(elapsed * 1000),
+        "reports_per_sec": round(len(row_sets) / elapsed, 2) if elapsed > 0 else None,
+    }
+    return [r for r in results if r is not None], batch_meta
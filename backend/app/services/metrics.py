@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Prometheus text exposition (format 0.0.4) without the client library. Label values must
+# come from fixed sets (route templates, stage names, status codes): never request data.
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [(self.name, self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            series[0][idx] += 1
+            series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[Sample]:
+        out: List[Sample] = []
+        with self._lock:
+            for key, (counts, total) in self._series.items():
+                labels = self._labels(key)
+                running = 0
+                for bound, n in zip(self.buckets + (math.inf,), counts):
+                    running += n
+                    out.append((f"{self.name}_bucket", {**labels, "le": _fmt(bound)}, running))
+                out.append((f"{self.name}_sum", labels, total[0]))
+                out.append((f"{self.name}_count", labels, running))
+        return out
+
+
+class CallbackMetric(_Metric):
+    # Read at scrape time from an existing stats function, so hot paths pay nothing
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self) -> List[Sample]:
+        try:
+            values = self.fn()
+        except Exception:
+            return []
+        return [(self.name, self._labels(k), float(v)) for k, v in values.items()]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        # Re-registering a name replaces it, so collectors can be set up idempotently
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{body}}} {_fmt(value)}")
+                else:
+                    lines.append(f"{name} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _register(metric):
+    REGISTRY.register(metric)
+    return metric
+
+
+HTTP_REQUESTS: Counter = _register(
+    Counter(
+        "reportrx_http_requests_total",
+        "HTTP requests by method, route template and status.",
+        ("method", "route", "status"),
+    )
+)
+HTTP_LATENCY: Histogram = _register(
+    Histogram(
+        "reportrx_http_request_duration_seconds",
+        "HTTP request latency by method and route template.",
+        ("method", "route"),
+    )
+)
+HTTP_IN_FLIGHT: Gauge = _register(
+    Gauge("reportrx_http_requests_in_flight", "HTTP requests currently being served.")
+)
+STAGE_LATENCY: Histogram = _register(
+    Histogram(
+        "reportrx_stage_duration_seconds",
+        "Time spent in each internal stage (upload_read, pdf_extract, parse_text, "
+        "bulk_flag, prompt_build, llm_call, llm_repair, fallback).",
+        ("stage",),
+    )
+)
+WORKER_JOBS: Histogram = _register(
+    Histogram(
+        "reportrx_worker_job_seconds",
+        "Worker pool job time, including queueing, by pool and outcome.",
+        ("pool", "outcome"),
+    )
+)
+LLM_CALLS: Counter = _register(
+    Counter(
+        "reportrx_llm_calls_total",
+        "Upstream LLM calls by kind (primary, hedge, retry, repair, batch) and outcome.",
+        ("kind", "outcome"),
+    )
+)
+LLM_REPAIRS: Counter = _register(
+    Counter("reportrx_llm_repairs_total", "JSON repair attempts after an invalid LLM answer.")
+)
+LLM_FALLBACKS: Counter = _register(
+    Counter("reportrx_llm_fallbacks_total", "Interpretations built by the deterministic fallback.")
+)
+LLM_TOKENS: Counter = _register(
+    Counter(
+        "reportrx_llm_tokens_total",
+        "Tokens reported by the LLM provider, by type (prompt, completion).",
+        ("type",),
+    )
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_LATENCY.observe(seconds, stage)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import re
+from types import MappingProxyType
+from typing import Callable, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+# Canonical lab test codes and unit spellings. Built once at import into read-only
+# mappings keyed by a folded form of the text (case-insensitive, punctuation and spaces
+# removed), so a lookup is one dict probe (two when a parenthetical must be dropped).
+
+NON_ALNUM = re.compile(r"[^0-9a-z%^*]+")
+# Units keep their slashes: "U/L" and "uL" (microlitre) must not fold to the same key
+NON_UNIT = re.compile(r"[^0-9a-z%^*/]+")
+PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+# code: (display name, canonical unit, "|"-separated aliases)
+TESTS: Dict[str, Tuple[str, Optional[str], str]] = {
+    "GLU": (
+        "Glucose",
+        "mg/dL",
+        "glucose|glu|blood glucose|fasting glucose|glucose fasting|fbg|fbs",
+    ),
+    "HGB": ("Hemoglobin", "g/dL", "hemoglobin|haemoglobin|hgb|hb"),
+    "HCT": ("Hematocrit", "%", "hematocrit|haematocrit|hct|pcv"),
+    "WBC": (
+        "White blood cells",
+        "10^9/L",
+        "wbc|white blood cells|white blood cell count|wbc count|leukocytes|total leukocyte count",
+    ),
+    "RBC": (
+        "Red blood cells",
+        "10^12/L",
+        "rbc|red blood cells|red blood cell count|rbc count|erythrocytes",
+    ),
+    "PLT": ("Platelets", "10^9/L", "platelets|platelet count|plt|thrombocytes"),
+    "MCV": ("Mean corpuscular volume", "fL", "mcv|mean corpuscular volume"),
+    "NA": ("Sodium", "mmol/L", "sodium|na|serum sodium"),
+    "K": ("Potassium", "mmol/L", "potassium|serum potassium"),
+    "CL": ("Chloride", "mmol/L", "chloride|cl"),
+    "HCO3": ("Bicarbonate", "mmol/L", "bicarbonate|hco3|co2|total co2"),
+    # Urea and urea nitrogen are different measurands (urea = BUN × 2.14 in mg/dL)
+    "BUN": ("Urea nitrogen", "mg/dL", "bun|urea nitrogen|blood urea nitrogen"),
+    "UREA": ("Urea", "mmol/L", "urea|serum urea|blood urea"),
+    "CREAT": ("Creatinine", "mg/dL", "creatinine|creat|serum creatinine"),
+    "EGFR": ("eGFR", "mL/min/1.73m2", "egfr|estimated gfr|gfr"),
+    "CA": ("Calcium", "mg/dL", "calcium|ca|total calcium"),
+    "CHOL": ("Total cholesterol", "mg/dL", "cholesterol|total cholesterol|chol|cholesterol total"),
+    "LDL": ("LDL cholesterol", "mg/dL", "ldl|ldl cholesterol|ldl-c|ldl calculated|cholesterol ldl"),
+    "HDL": ("HDL cholesterol", "mg/dL", "hdl|hdl cholesterol|hdl-c|cholesterol hdl"),
+    "TRIG": ("Triglycerides", "mg/dL", "triglycerides|triglyceride|trig|tg"),
+    "A1C": (
+        "HbA1c",
+        "%",
+        "hba1c|a1c|hemoglobin a1c|haemoglobin a1c|glycated hemoglobin|glycosylated hemoglobin",
+    ),
+    "TSH": ("TSH", "mIU/L", "tsh|thyroid stimulating hormone|thyrotropin"),
+    "FT4": ("Free T4", "ng/dL", "free t4|ft4|free thyroxine|t4 free"),
+    "ALT": ("ALT", "U/L", "alt|sgpt|alanine aminotransferase|alt sgpt"),
+    "AST": ("AST", "U/L", "ast|sgot|aspartate aminotransferase|ast sgot"),
+    "ALP": ("Alkaline phosphatase", "U/L", "alp|alkaline phosphatase|alk phos"),
+    "TBIL": ("Total bilirubin", "mg/dL", "bilirubin|total bilirubin|bilirubin total|tbil"),
+    "ALB": ("Albumin", "g/dL", "albumin|alb|serum albumin"),
+    "TP": ("Total protein", "g/dL", "total protein|protein total|tp"),
+    "FERR": ("Ferritin", "ng/mL", "ferritin|serum ferritin"),
+    "FE": ("Iron", "ug/dL", "iron|serum iron|fe"),
+    "B12": ("Vitamin B12", "pg/mL", "vitamin b12|b12|cobalamin|vit b12"),
+    "VITD": (
+        "Vitamin D",
+        "ng/mL",
+        "vitamin d|25-oh vitamin d|25 hydroxy vitamin d|vitamin d 25-oh|vit d|25(oh)d",
+    ),
+    "CRP": ("C-reactive protein", "mg/L", "crp|c-reactive protein|c reactive protein"),
+}
+
+# Never read as a test name on their own, although "K" is Potassium's code: a lone "K" or
+# "Cr" on a report is far more often a split unit ("K/uL") or a stray column than a result
+STRAY_TOKENS = frozenset({"k", "cr"})
+
+# canonical unit: "|"-separated spellings seen on reports
+UNITS: Dict[str, str] = {
+    "mg/dL": "mg/dl|mg/100ml|mg%",
+    "g/dL": "g/dl|gm/dl|gr/dl",
+    "g/L": "g/l|gm/l",
+    "mg/L": "mg/l",
+    "ug/dL": "ug/dl|mcg/dl",
+    "ug/L": "ug/l|mcg/l",
+    "ng/mL": "ng/ml",
+    "ng/dL": "ng/dl",
+    "pg/mL": "pg/ml",
+    "mmol/L": "mmol/l|mm/l",
+    "umol/L": "umol/l",
+    "nmol/L": "nmol/l",
+    "pmol/L": "pmol/l",
+    "mmol/mol": "mmol/mol",
+    "mEq/L": "meq/l",
+    "U/L": "u/l|iu/l",
+    "mIU/L": "miu/l|uiu/ml",
+    # A thousand times mIU/L (FSH, LH, hCG reports use both)
+    "mIU/mL": "miu/ml",
+    "10^9/L": "10^9/l|x10^9/l|10*9/l|k/ul|10^3/ul|x10^3/ul|thou/ul",
+    "10^12/L": "10^12/l|x10^12/l|10*12/l|m/ul|10^6/ul|x10^6/ul|mil/ul",
+    "fL": "fl",
+    "%": "%",
+    # Not normalised to body surface area: a clearance, not an eGFR
+    "mL/min": "ml/min",
+    "mL/min/1.73m2": "ml/min/1.73m2|ml/min/1.73m^2",
+}
+
+# (code, from canonical unit) -> factor into the test's canonical unit
+FACTORS: Dict[Tuple[str, str], float] = {
+    ("GLU", "mmol/L"): 18.016,
+    ("HGB", "g/L"): 0.1,
+    ("HGB", "mmol/L"): 1.611,
+    ("NA", "mEq/L"): 1.0,
+    ("K", "mEq/L"): 1.0,
+    ("CL", "mEq/L"): 1.0,
+    ("HCO3", "mEq/L"): 1.0,
+    ("BUN", "mmol/L"): 2.801,
+    ("UREA", "mg/dL"): 0.1665,
+    ("CREAT", "umol/L"): 0.01131,
+    ("CA", "mmol/L"): 4.008,
+    ("CHOL", "mmol/L"): 38.67,
+    ("LDL", "mmol/L"): 38.67,
+    ("HDL", "mmol/L"): 38.67,
+    ("TRIG", "mmol/L"): 88.57,
+    ("FT4", "pmol/L"): 0.0777,
+    ("TBIL", "umol/L"): 0.05848,
+    ("ALB", "g/L"): 0.1,
+    ("TP", "g/L"): 0.1,
+    ("FERR", "ug/L"): 1.0,
+    ("FE", "umol/L"): 5.585,
+    ("B12", "pmol/L"): 1.355,
+    ("VITD", "nmol/L"): 0.4006,
+    ("CRP", "mg/dL"): 10.0,
+}
+
+
+def _fold(text: str, drop: re.Pattern = NON_ALNUM) -> str:
+    # casefold() turns the micro sign into Greek mu; both are spelled "u" in the keys
+    return drop.sub("", text.casefold().replace("μ", "u"))
+
+
+def _fold_unit(text: str) -> str:
+    return _fold(text, NON_UNIT)
+
+
+def _index(
+    entries: Iterable[Tuple[str, str]],
+    skip: FrozenSet[str] = frozenset(),
+    fold: Callable[[str], str] = _fold,
+) -> Mapping[str, str]:
+    index: Dict[str, str] = {}
+    for canonical, aliases in entries:
+        for alias in (canonical, *aliases.split("|")):
+            key = fold(alias)
+            if key in skip:
+                continue
+            if index.setdefault(key, canonical) != canonical:
+                raise ValueError(f"alias {alias!r} maps to both {index[key]} and {canonical}")
+    return MappingProxyType(index)
+
+
+TEST_INDEX = _index(
+    ((code, f"{name}|{aliases}") for code, (name, _, aliases) in TESTS.items()), STRAY_TOKENS
+)
+UNIT_INDEX = _index(UNITS.items(), fold=_fold_unit)
+CONVERSIONS: Mapping[Tuple[str, str], float] = MappingProxyType(FACTORS)
+
+
+def canonical_test(name: str) -> Optional[str]:
+    # "HGB", "Haemoglobin", "Hemoglobin (Hb)" -> "HGB"; unknown names -> None
+    code = TEST_INDEX.get(_fold(name))
+    if code is None and "(" in name:
+        code = TEST_INDEX.get(_fold(PARENTHETICAL.sub("", name)))
+    return code
+
+
+def canonical_unit(unit: Optional[str]) -> Optional[str]:
+    return UNIT_INDEX.get(_fold_unit(unit)) if unit else None
+
+
+def display_name(code: str) -> str:
+    return TESTS[code][0]
+
+
+def to_canonical(
+    code: Optional[str], value: float, unit: Optional[str]
+) -> Optional[Tuple[float, str]]:
+    # (value, unit) in the test's canonical unit, or None when there is no known conversion
+    if code is None or unit is None:
+        return None
+    target = TESTS[code][1]
+    if unit == target:
+        return value, target
+    factor = CONVERSIONS.get((code, unit))
+    return (value * factor, target) if factor is not None and target else None
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.cache import TieredCache, TTLCache, sealed_disk_tier
+from app.services.parser import PARSER_VERSION
+
+_parse_cache: Optional[TieredCache] = None
+_counts = {"bytes_saved": 0}
+
+
+def parse_cache_key(kind: str, digest: str) -> str:
+    # kind is "pdf" or "text": the same bytes parse differently as a PDF and as text
+    return hashlib.sha256(f"{PARSER_VERSION}:{kind}:{digest}".encode()).hexdigest()
+
+
+def text_cache_key(text: str) -> Tuple[str, int]:
+    # (cache key, UTF-8 size) for a JSON text document
+    raw = text.encode("utf-8")
+    return parse_cache_key("text", hashlib.sha256(raw).hexdigest()), len(raw)
+
+
+def get_parse_cache() -> TieredCache:
+    global _parse_cache
+    if _parse_cache is None:
+        ttl_s = float(os.getenv("PARSE_CACHE_TTL_S", "3600"))
+        memory = TTLCache(int(os.getenv("PARSE_CACHE_SIZE", "128")), ttl_s)
+        # The disk tier holds parsed lab values, so it is only enabled when it can be sealed
+        path = os.getenv("PARSE_CACHE_PATH", "").strip()
+        disk = sealed_disk_tier("PARSE_CACHE_PATH", path, ttl_s)
+        _parse_cache = TieredCache(memory, disk, disk_ignored=bool(path) and disk is None)
+    return _parse_cache
+
+
+async def lookup_parse(key: str, source_bytes: int) -> Optional[Dict[str, Any]]:
+    # Cached result for this content, or None. Callers must not mutate it. Stored as
+    # routers.parse.parse_result builds it: {"columns": {field: [value per row]},
+    # "unparsed_lines", optional "meta"}; shape_result turns it into rows when asked.
+    result = await get_parse_cache().get(key)
+    if result is not None:
+        _counts["bytes_saved"] += source_bytes
+    return result
+
+
+async def store_parse(key: str, result: Dict[str, Any]) -> None:
+    await get_parse_cache().set(key, result)
+
+
+def parse_cache_stats() -> Dict[str, Any]:
+    return {**get_parse_cache().stats(), **_counts}
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import os
 import re
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
+from app.services.normalize import canonical_test, canonical_unit
+
+
+# Bump whenever parsing heuristics or the cached result shape change: cached parse
+# results are keyed by it
+PARSER_VERSION = "5"
 
 # Precompiled regexes for performance
 NUM = r"\d+(?:\.\d+)?"
@@ -36,14 +43,18 @@ FOOTNOTE_MARK = re.compile(r"\*+")
 WHITESPACE = re.compile(r"\s+")
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedRow:
+    # Slots: large reports produce thousands of these, so no per-instance __dict__
     test_name: str
     value: Union[float, str]
     unit: Optional[str]
     reference_range: Optional[str]
     flag: Optional[str]
     confidence: float
+    # Canonical code and unit from app.services.normalize; None when not recognised
+    test_code: Optional[str] = None
+    unit_canonical: Optional[str] = None
 
 
 def _clean_line(line: str) -> str:
@@ -78,13 +89,18 @@ def _extract_range(segment: str) -> Tuple[Optional[str], Optional[Tuple[float, f
     return None, None, None, None
 
 
+# Qualitative results and the flag they get
+POSITIVE_WORDS = frozenset({"positive", "reactive"})
+NEGATIVE_WORDS = frozenset({"negative", "non-reactive", "non reactive"})
+
+
 def _compute_flag(value: Union[float, str], range_tuple: Optional[Tuple[float, float]], le: Optional[float], ge: Optional[float]) -> Optional[str]:
     # Non-numeric interpretations
     if isinstance(value, str):
         val = value.lower()
-        if val in {"positive", "reactive"}:
+        if val in POSITIVE_WORDS:
             return "abnormal"
-        if val in {"negative", "non-reactive", "non reactive"}:
+        if val in NEGATIVE_WORDS:
             return "normal"
         return None
 
@@ -120,69 +136,168 @@ def _confidence(row: ParsedRow) -> float:
     return min(1.0, present / total)
 
 
-def parse_text(text: str) -> Tuple[List[ParsedRow], List[str]]:
-    rows: List[ParsedRow] = []
-    unparsed: List[str] = []
+def _parse_line(raw_line: str) -> Union[ParsedRow, str, None]:
+    # Returns a ParsedRow, the cleaned line if it could not be parsed, or None for noise
+    line = _clean_line(raw_line)
+    if not line:
+        return None
+    if NOISE.search(line):
+        return None
 
-    # Normalize newlines; split into lines
-    for raw_line in text.splitlines():
+    # Find first numeric group; if none, check for Positive/Negative rows with colon
+    first_num = FIRST_NUMBER_POS.search(line)
+    name: Optional[str] = None
+    value: Union[float, str, None] = None
+    unit: Optional[str] = None
+    reference_range: Optional[str] = None
+
+    # Range detection anywhere on line
+    range_str, range_tuple, le, ge = _extract_range(line)
+    reference_range = range_str
+
+    # Value + unit
+    vm = VALUE_WITH_UNIT.search(line)
+    if vm:
+        try:
+            value = float(vm.group("val"))
+        except Exception:
+            value = vm.group("val")
+        unit = vm.group("unit") or None
+
+    # Positive/Negative fallback if no number match
+    if value is None:
+        pm = POS_NEG.search(line)
+        if pm:
+            value = pm.group(1).capitalize()
+
+    if first_num:
+        # Test name is the left part before first number
+        name = line[: first_num.start()].strip(" -:\t")
+    else:
+        # No number: use part before colon as name if present
+        if ":" in line:
+            name = line.split(":", 1)[0].strip()
+
+    if name and value is not None:
+        flag = _compute_flag(value, range_tuple, le, ge)
+        row = ParsedRow(
+            test_name=name,
+            value=value,
+            unit=unit,
+            reference_range=reference_range,
+            flag=flag,
+            confidence=0.0,  # fill below
+        )
+        row.confidence = _confidence(row)
+        return row
+    # Keep unparsed lines for debugging/feedback to user
+    return line
+
+
+def _scan_line(raw_line: str) -> Union[ParsedRow, str, None]:
+    # Same contract and output as _parse_line, but each pattern only runs from an anchor
+    # found by one cheap pass over the line (first digit, hyphen, comparison operator)
+    # instead of every pattern rescanning the whole line.
+    if "[" in raw_line or "*" in raw_line:
         line = _clean_line(raw_line)
-        if not line:
-            continue
-        if NOISE.search(line):
-            continue
+    else:
+        # Nothing to strip: split/join collapses whitespace exactly like WHITESPACE.sub
+        line = " ".join(raw_line.split())
+    if not line or NOISE.match(line):
+        return None
 
-        # Find first numeric group; if none, check for Positive/Negative rows with colon
-        first_num = FIRST_NUMBER_POS.search(line)
-        name: Optional[str] = None
-        value: Union[float, str, None] = None
-        unit: Optional[str] = None
-        reference_range: Optional[str] = None
-
-        # Range detection anywhere on line
-        range_str, range_tuple, le, ge = _extract_range(line)
-        reference_range = range_str
-
-        # Value + unit
-        vm = VALUE_WITH_UNIT.search(line)
-        val_is_numeric = False
-        if vm:
-            try:
-                value = float(vm.group("val"))
-                val_is_numeric = True
-            except Exception:
-                value = vm.group("val")
-            unit = vm.group("unit") or None
-
-        # Positive/Negative fallback if no number match
-        if value is None:
-            pm = POS_NEG.search(line)
-            if pm:
-                value = pm.group(1).capitalize()
-
-        if first_num:
-            # Test name is the left part before first number
-            name = line[: first_num.start()].strip(" -:\t")
+    first_num = FIRST_NUMBER_POS.search(line)
+    if first_num is None:
+        # No digits, so no range can match; only "Name: Positive"-style rows remain
+        pm = POS_NEG.search(line)
+        if pm is None or ":" not in line:
+            return line
+        name = line.split(":", 1)[0].strip()
+        if not name:
+            return line
+        value: Union[float, str] = pm.group(1).capitalize()
+        flag = _compute_flag(value, None, None, None)
+        return ParsedRow(name, value, None, None, flag, (3 if flag else 2) / 5)
+
+    start = first_num.start()
+    name = line[:start].strip(" -:\t")
+    # No value match can start before the first digit
+    vm = VALUE_WITH_UNIT.match(line, start) or VALUE_WITH_UNIT.search(line, start + 1)
+    unit: Optional[str] = None
+    if vm is not None:
+        value = float(vm.group("val"))
+        unit = vm.group("unit") or None
+    else:
+        pm = POS_NEG.search(line)
+        if pm is None:
+            return line
+        value = pm.group(1).capitalize()
+    if not name:
+        return line
+
+    range_str: Optional[str] = None
+    range_tuple: Optional[Tuple[float, float]] = None
+    le: Optional[float] = None
+    ge: Optional[float] = None
+    # Every range pattern needs its hyphen or operator, so check for those first
+    m = None
+    if "-" in line or "–" in line:
+        m = REF_RANGE.search(line) or RANGE_X_Y.search(line, start)
+    if m is not None:
+        low = float(m.group("low"))
+        high = float(m.group("high"))
+        range_str, range_tuple = f"{low}-{high}", (low, high)
+    else:
+        m = RANGE_LE.search(line) if "≤" in line or "<=" in line else None
+        if m is not None:
+            le = float(m.group("le"))
+            range_str = f"≤ {le}"
         else:
-            # No number: use part before colon as name if present
-            if ":" in line:
-                name = line.split(":", 1)[0].strip()
-
-        if name and value is not None:
-            flag = _compute_flag(value, range_tuple, le, ge)
-            row = ParsedRow(
-                test_name=name,
-                value=value,
-                unit=unit,
-                reference_range=reference_range,
-                flag=flag,
-                confidence=0.0,  # fill below
-            )
-            row.confidence = _confidence(row)
-            rows.append(row)
+            m = RANGE_GE.search(line) if "≥" in line or ">=" in line else None
+            if m is not None:
+                ge = float(m.group("ge"))
+                range_str = f"≥ {ge}"
+
+    flag = _compute_flag(value, range_tuple, le, ge)
+    present = 2 + (unit is not None) + (range_str is not None) + (flag is not None)
+    return ParsedRow(name, value, unit, range_str, flag, present / 5)
+
+
+ENGINES = {"regex": _parse_line, "scan": _scan_line}
+
+
+def _line_parser(engine: Optional[str]):
+    engine = engine or os.getenv("PARSER_ENGINE", "regex")
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"unknown parser engine: {engine!r}") from None
+
+
+def iter_parse_lines(
+    lines: Iterable[str], engine: Optional[str] = None
+) -> Iterator[Union[ParsedRow, str]]:
+    # Generator form of parse_text: yields each row or unparsed line as soon as it is seen
+    parse_line = _line_parser(engine)
+    for raw_line in lines:
+        item = parse_line(raw_line)
+        if item is None:
+            continue
+        if not isinstance(item, str):
+            item.test_code = canonical_test(item.test_name)
+            item.unit_canonical = canonical_unit(item.unit)
+        yield item
+
+
+def parse_text(text: str, engine: Optional[str] = None) -> Tuple[List[ParsedRow], List[str]]:
+    rows: List[ParsedRow] = []
+    unparsed: List[str] = []
+
+    # Normalize newlines; split into lines
+    for item in iter_parse_lines(text.splitlines(), engine):
+        if isinstance(item, str):
+            unparsed.append(item)
         else:
-            # Keep unparsed lines for debugging/feedback to user
-            unparsed.append(line)
+            rows.append(item)
 
     return rows, unparsed
-
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.services.parser import POS_NEG, ParsedRow, iter_parse_lines
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
+PDFSource = Union[bytes, str]
+# (1-based page number, parsed rows and unparsed lines in line order, timing)
+ParsedPage = Tuple[int, List[Union[ParsedRow, str]], Optional[Dict[str, Any]]]
+
+
+class PDFReadError(Exception):
+    pass
+
+
+class PDFLimitError(PDFReadError):
+    pass
+
+
+MODES = ("text", "blocks", "words")
+PAGE_RANGE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d*)\s*)?$")
+DIGIT = re.compile(r"\d")
+
+
+@dataclass(frozen=True)
+class PageOptions:
+    # Which pages to read and how. Frozen and picklable: it travels to worker processes
+    # and is part of the parse cache key.
+    pages: Optional[Tuple[Tuple[int, Optional[int]], ...]] = None  # 1-based, inclusive
+    max_pages: Optional[int] = None
+    mode: str = "text"
+    prefilter: bool = False
+
+    def cache_tag(self) -> str:
+        return f"{self.pages}|{self.max_pages}|{self.mode}|{int(self.prefilter)}"
+
+
+def server_page_limit() -> int:
+    return int(os.getenv("PARSE_MAX_PAGES", "300"))
+
+
+def parse_page_ranges(spec: str) -> Tuple[Tuple[int, Optional[int]], ...]:
+    # "1-3,5,8-" -> ((1, 3), (5, 5), (8, None)); raises ValueError on anything else
+    ranges: List[Tuple[int, Optional[int]]] = []
+    for part in spec.split(","):
+        m = PAGE_RANGE.match(part)
+        if not m:
+            raise ValueError(f"invalid page range: {part.strip()!r}")
+        first = int(m.group(1))
+        if m.group(2) is None:
+            last: Optional[int] = first
+        else:
+            last = int(m.group(2)) if m.group(2) else None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"invalid page range: {part.strip()!r}")
+        ranges.append((first, last))
+    return tuple(ranges)
+
+
+def select_pages(page_count: int, options: PageOptions) -> List[int]:
+    # 0-based page indexes to read, in document order, capped at options.max_pages
+    if options.pages is None:
+        selected = list(range(page_count))
+    else:
+        wanted = set()
+        for first, last in options.pages:
+            wanted.update(range(first - 1, min(page_count, last or page_count)))
+        selected = sorted(wanted)
+    if options.max_pages is not None:
+        selected = selected[: max(0, options.max_pages)]
+    return selected
+
+
+def load_pdf_engine() -> Any:
+    # PyMuPDF takes ~100 ms to import, so it is loaded on first use (or by the warm-up
+    # task) rather than when the app starts
+    import fitz
+
+    return fitz
+
+
+def open_pdf(source: PDFSource) -> fitz.Document:
+    # A path lets PyMuPDF read pages from disk on demand instead of holding the whole file
+    fitz = load_pdf_engine()
+    try:
+        if isinstance(source, str):
+            return fitz.open(source, filetype="pdf")
+        return fitz.open(stream=source, filetype="pdf")
+    except Exception as e:
+        raise PDFReadError(str(e)) from None
+
+
+def check_page_limit(
+    doc: fitz.Document, limit: Optional[int], selected: Optional[int] = None
+) -> None:
+    # Page count comes from the xref table, so this rejects before any text is extracted.
+    # Only pages that will actually be read count against the limit.
+    count = doc.page_count if selected is None else selected
+    if limit is not None and count > limit:
+        raise PDFLimitError(f"PDF has {count} pages to read; the limit is {limit}.")
+
+
+def _rows_from_boxes(boxes: Sequence[Tuple[float, float, float, str]]) -> str:
+    # boxes are (x0, y0, y1, text). Boxes whose vertical centre falls inside the current
+    # row's band are one visual line; joining them left to right keeps table columns
+    # (name, value, unit, range) on the same line.
+    lines: List[str] = []
+    row: List[Tuple[float, str]] = []
+    top = bottom = 0.0
+    for x0, y0, y1, text in sorted(boxes, key=lambda b: (b[1] + b[2]) / 2):
+        centre = (y0 + y1) / 2
+        if row and not (top <= centre <= bottom):
+            lines.append(" ".join(t for _, t in sorted(row)))
+            row = []
+        if not row:
+            top, bottom = y0, y1
+        row.append((x0, text))
+    if row:
+        lines.append(" ".join(t for _, t in sorted(row)))
+    return "\n".join(lines)
+
+
+def page_text(page: fitz.Page, mode: str = "text") -> str:
+    if mode == "words":
+        words = page.get_text("words")
+        return _rows_from_boxes([(w[0], w[1], w[3], w[4]) for w in words])
+    if mode == "blocks":
+        # Text blocks only (type 0); lines inside a block are joined into one
+        blocks = page.get_text("blocks")
+        return _rows_from_boxes(
+            [(b[0], b[1], b[3], " ".join(b[4].split())) for b in blocks if b[6] == 0]
+        )
+    return page.get_text("text")
+
+
+def _skip_reason(page: fitz.Page, text: Optional[str]) -> Optional[str]:
+    # Pre-pass: an image-only page has no fonts, so it is dropped without extracting text
+    if text is None:
+        return None if page.get_fonts() else "no_text_layer"
+    # Nothing the parser could turn into a row: no digits and no positive/negative result
+    if not DIGIT.search(text) and not POS_NEG.search(text):
+        return "no_values"
+    return None
+
+
+def iter_pages(
+    doc: fitz.Document, options: PageOptions, indexes: Optional[Sequence[int]] = None
+) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    # (1-based page number, text, timing) for each selected page, or for the given 0-based
+    # indexes. Skipped pages yield empty text so callers still see their timing.
+    if indexes is None:
+        indexes = select_pages(doc.page_count, options)
+    for index in indexes:
+        start = time.perf_counter()
+        timing: Dict[str, Any] = {"page": index + 1}
+        try:
+            page = doc[index]
+            reason = _skip_reason(page, None) if options.prefilter else None
+            text = "" if reason else page_text(page, options.mode)
+            if options.prefilter and not reason:
+                reason = _skip_reason(page, text)
+                if reason:
+                    text = ""
+        except Exception as e:
+            raise PDFReadError(str(e)) from None
+        if reason:
+            timing["skipped"] = reason
+        timing["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        yield index + 1, text, timing
+
+
+def iter_page_texts(doc: fitz.Document) -> Iterator[str]:
+    # One page at a time, so callers can start parsing before the document is done
+    for page in doc:
+        try:
+            yield page.get_text("text")
+        except Exception as e:
+            raise PDFReadError(str(e)) from None
+
+
+def extract_pdf_text(source: PDFSource) -> str:
+    # Use PyMuPDF to extract text from memory bytes or a file path
+    with open_pdf(source) as doc:
+        parts: List[str] = list(iter_page_texts(doc))
+    return "\n".join(parts)
+
+
+def parse_pdf(
+    source: PDFSource, page_limit: Optional[int] = None, options: Optional[PageOptions] = None
+) -> Tuple[List[ParsedRow], List[str], Dict[str, Any]]:
+    # Runs inside a worker process: keep it a plain top-level function so it pickles.
+    # Pages are parsed as they are extracted, so only one page of text is alive at a time;
+    # with default options the rows equal parse_text(extract_pdf_text(source)).
+    options = options or PageOptions()
+    rows: List[ParsedRow] = []
+    unparsed: List[str] = []
+    timings: List[Dict[str, Any]] = []
+    with open_pdf(source) as doc:
+        page_count = doc.page_count
+        check_page_limit(doc, page_limit, len(select_pages(page_count, options)))
+        for _, text, timing in iter_pages(doc, options):
+            parse_start = time.perf_counter()
+            for item in iter_parse_lines(text.splitlines()):
+                if isinstance(item, str):
+                    unparsed.append(item)
+                else:
+                    rows.append(item)
+            timing["parse_ms"] = round((time.perf_counter() - parse_start) * 1000, 3)
+            timings.append(timing)
+    meta = {
+        "pages": page_count,
+        "pages_read": sum(1 for t in timings if "skipped" not in t),
+        "mode": options.mode,
+        "page_timings": timings,
+    }
+    return rows, unparsed, meta
+
+
+def select_pdf_pages(
+    source: PDFSource, page_limit: Optional[int], options: PageOptions
+) -> List[int]:
+    # Worker job for streamed parses: checks the page limit and returns the 0-based
+    # indexes to read, so the request can still be refused with an HTTP error
+    with open_pdf(source) as doc:
+        selected = select_pages(doc.page_count, options)
+        check_page_limit(doc, page_limit, len(selected))
+    return selected
+
+
+def parse_pdf_pages(
+    source: PDFSource, options: PageOptions, indexes: Sequence[int]
+) -> List[ParsedPage]:
+    # Worker job for streamed parses: extracts and parses a few pages. The document is
+    # reopened per job, which only reads the xref table.
+    parsed: List[ParsedPage] = []
+    with open_pdf(source) as doc:
+        for page_no, text, timing in iter_pages(doc, options, indexes):
+            parse_start = time.perf_counter()
+            items = list(iter_parse_lines(text.splitlines()))
+            timing["parse_ms"] = round((time.perf_counter() - parse_start) * 1000, 3)
+            parsed.append((page_no, items, timing))
+    return parsed
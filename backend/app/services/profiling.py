@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import tempfile
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Operator-only request profiling. Nothing happens unless PROFILE_SECRET is set; then a
+# request is profiled when it carries `X-Profile: <secret>`, or when it is the Nth since
+# the last sample (PROFILE_SAMPLE_EVERY). Artifacts are cProfile stats: function names,
+# files, line numbers and timings. Arguments, headers and bodies are never recorded, and
+# artifact names carry a random id rather than anything from the request.
+#
+# cProfile follows a thread, not an asyncio task: the profile covers everything the event
+# loop ran while the request was in flight, including other requests served concurrently.
+# Profile on an otherwise idle worker when one request's own cost matters.
+
+PROFILE_HEADER = b"x-profile"
+SUMMARY_LINES = 40
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+_sample_counter = itertools.count(1)
+# cProfile hooks the interpreter, so only one in-process profile runs at a time;
+# requests that arrive meanwhile are simply not profiled
+_active = threading.Lock()
+
+
+def profile_dir() -> str:
+    return os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "reportrx-profiles")
+
+
+def _secret() -> str:
+    return os.getenv("PROFILE_SECRET", "")
+
+
+def should_profile(headers: Dict[bytes, bytes]) -> bool:
+    secret = _secret()
+    if not secret:
+        return False
+    supplied = headers.get(PROFILE_HEADER)
+    if supplied is not None:
+        return hmac.compare_digest(supplied, secret.encode("utf-8"))
+    every = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+    return every > 0 and next(_sample_counter) % every == 0
+
+
+class RequestProfile:
+    def __init__(self, directory: str) -> None:
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.directory = directory
+        self._profiler = cProfile.Profile()
+        self._jobs = itertools.count(1)
+
+    def artifact(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.id}{suffix}")
+
+    def worker_artifact(self) -> str:
+        return self.artifact(f".worker{next(self._jobs)}.pstats")
+
+    def write(self, details: Dict[str, Any]) -> None:
+        # details are fixed-vocabulary values only (method, route template, status, ms)
+        os.makedirs(self.directory, exist_ok=True)
+        self._profiler.dump_stats(self.artifact(".pstats"))
+        _write_summary(self._profiler, self.artifact(".txt"), details)
+
+
+def _write_summary(profiler: cProfile.Profile, path: str, details: Dict[str, Any]) -> None:
+    out = io.StringIO()
+    for key, value in details.items():
+        out.write(f"{key}: {value}\n")
+    out.write("scope: event loop thread (includes requests served concurrently)\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(SUMMARY_LINES)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(out.getvalue())
+
+
+def start_profile(headers: Dict[bytes, bytes]) -> Optional[RequestProfile]:
+    if not should_profile(headers) or not _active.acquire(blocking=False):
+        return None
+    enabled = False
+    try:
+        profile = RequestProfile(profile_dir())
+        profile._profiler.enable()
+        enabled = True
+    except ValueError:
+        # Another profiler already owns this interpreter (3.12+): skip this request
+        return None
+    finally:
+        if not enabled:
+            _active.release()
+    _current.set(profile)
+    return profile
+
+
+def stop_profile(profile: RequestProfile) -> None:
+    profile._profiler.disable()
+    _current.set(None)
+    _active.release()
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+def profiled_call(path: str, fn: Callable[..., Any], *args: Any) -> Any:
+    # Runs inside a worker: profiles one job and writes its stats next to the request's.
+    # Top-level so it pickles for the process pool.
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler already owns this interpreter (thread-pool mode on 3.12+)
+        return fn(*args)
+    try:
+        return fn(*args)
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+
+
+def wrap_job(fn: Callable[..., Any], *args: Any) -> Tuple[Any, ...]:
+    # (fn, *args) for WorkerPool.run. Jobs of a profiled request are profiled in the
+    # worker too, since the request's own profiler only sees the event loop thread.
+    profile = current_profile()
+    if profile is None:
+        return (fn, *args)
+    return (profiled_call, profile.worker_artifact(), fn, *args)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Any, List, Optional, Tuple
+
+# Compact row encoding for LLM prompts: the column names are sent once, then each row
+# is a JSON array in that order with trailing empty fields dropped. Compared with one
+# JSON object per row this is about half the tokens for a typical report.
+ROW_COLUMNS = ("test_name", "value", "unit", "reference_range", "flag")
+COLUMNS_LINE = "COLUMNS: " + json.dumps(ROW_COLUMNS)
+ROW_FORMAT_NOTE = "Each row is a JSON array in COLUMNS order; trailing empty fields are omitted."
+
+ABNORMAL_FLAGS = frozenset({"low", "high", "abnormal"})
+
+# Local token estimate, no tokenizer download or network call. BPE vocabularies keep
+# most short English words whole, split digit runs into groups of up to three and
+# give most punctuation its own token; counting those pieces tracks real tokenizers
+# closely for this kind of text and errs on the high side.
+TOKEN_PIECES = re.compile(r"[A-Za-z]{1,8}|\d{1,3}|[^\sA-Za-z\d]")
+
+EncodedRow = List[Any]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(TOKEN_PIECES.findall(text)) + 1
+
+
+def rows_token_budget() -> int:
+    # Tokens allowed for the rows section of one prompt
+    return int(os.getenv("PROMPT_TOKEN_BUDGET", "800"))
+
+
+def encode_row(
+    test_name: str,
+    value: Any,
+    unit: Optional[str],
+    reference_range: Optional[str],
+    flag: Optional[str],
+) -> EncodedRow:
+    row = [test_name, value, unit, reference_range, flag]
+    while row and row[-1] is None:
+        row.pop()
+    return row
+
+
+def dumps_rows(rows: Any) -> str:
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+
+
+def _is_abnormal(row: EncodedRow) -> bool:
+    return len(row) > 4 and row[4] in ABNORMAL_FLAGS
+
+
+def select_rows(rows: List[EncodedRow], budget: int) -> Tuple[List[EncodedRow], int]:
+    # Rows that fit the budget, abnormal ones considered first, returned in report
+    # order; also the number left out. A row that does not fit is skipped rather than
+    # ending the selection, so shorter rows after it can still be included.
+    order = sorted(range(len(rows)), key=lambda i: not _is_abnormal(rows[i]))
+    keep = [False] * len(rows)
+    used = 0
+    for i in order:
+        cost = estimate_tokens(dumps_rows(rows[i]))
+        if used + cost <= budget:
+            keep[i] = True
+            used += cost
+    selected = [row for row, kept in zip(rows, keep) if kept]
+    return selected, len(rows) - len(selected)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+
+class CircuitBreaker:
+    # Rolling-window breaker. While open, callers skip the upstream entirely; after
+    # `open_s` a single probe is let through (half-open) to decide whether to close.
+    def __init__(self, window: int, min_calls: int, error_rate: float, open_s: float) -> None:
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_s = open_s
+        self.state = "closed"
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.opened_total = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.open_s:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            # A probe that never reported back (cancelled, deadline) must not wedge the breaker
+            probe_stale = now - self._probe_started >= self.open_s
+            if self.state == "half_open" and (not self._probe_in_flight or probe_stale):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            return False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+                if success:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+            self._outcomes.append(success)
+            if self.state == "closed" and self._current_error_rate() >= self.error_rate:
+                self._trip()
+
+    def _current_error_rate(self) -> float:
+        if len(self._outcomes) < self.min_calls:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _trip(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self.opened_total += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "error_rate": round(self._current_error_rate(), 4),
+                "calls": len(self._outcomes),
+                "opened_total": self.opened_total,
+            }
+
+
+class LatencyTracker:
+    # Recent successful upstream latencies, used to pick the hedge delay
+    def __init__(self, size: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+def retry_after_s(exc: BaseException) -> Optional[float]:
+    # Seconds the upstream asked us to wait (Retry-After as delta-seconds or HTTP date)
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    value = exc.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_s(retry: int, base_s: float, cap_s: float = 4.0) -> float:
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(cap_s, base_s * (2**retry)))
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Optional, Union
+
+from fastapi import UploadFile
+from starlette.formparsers import MultiPartParser
+
+from app.services.metrics import timed_stage
+
+CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def upload_max_bytes() -> int:
+    return int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def spool_max_bytes() -> int:
+    return int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(1024 * 1024)))
+
+
+def configure_multipart() -> None:
+    # Starlette buffers each multipart file in a SpooledTemporaryFile; keep its in-memory
+    # threshold in step with ours so large bodies go to disk while being received.
+    MultiPartParser.spool_max_size = spool_max_bytes()
+
+
+class SpooledUpload:
+    # An uploaded document as the worker pool should see it: small uploads stay as bytes,
+    # larger ones are a named file on disk that a worker process can open by path.
+    # `sha256` is the hex digest of the content, computed while spooling.
+    def __init__(self, data: Optional[bytes], path: Optional[str], size: int, sha256: str) -> None:
+        self.data = data
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.path if self.path is not None else (self.data or b"")
+
+    def close(self) -> None:
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+def _spool(src: BinaryIO, max_bytes: int, threshold: int) -> SpooledUpload:
+    src.seek(0)
+    head = src.read(threshold + 1)
+    if len(head) > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+    digest = hashlib.sha256(head)
+    if len(head) <= threshold:
+        return SpooledUpload(head, None, len(head), digest.hexdigest())
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".pdf", dir=os.getenv("UPLOAD_TMP_DIR"))
+    size = len(head)
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            dst.write(head)
+            del head
+            while True:
+                chunk = src.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                digest.update(chunk)
+                dst.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return SpooledUpload(None, path, size, digest.hexdigest())
+
+
+async def spool_upload(
+    file: UploadFile, max_bytes: Optional[int] = None, threshold: Optional[int] = None
+) -> SpooledUpload:
+    # Copies the upload in fixed-size chunks, so memory stays bounded whatever its size.
+    # Runs in a thread: both sides may be disk files.
+    max_bytes = upload_max_bytes() if max_bytes is None else max_bytes
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+    threshold = spool_max_bytes() if threshold is None else threshold
+    with timed_stage("upload_read"):
+        return await asyncio.to_thread(_spool, file.file, max_bytes, threshold)
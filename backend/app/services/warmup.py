@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.llm import warm_http_client
+from app.services.parser import parse_text
+from app.services.pdf import load_pdf_engine
+from app.services.workers import get_parse_pool
+
+# Started from the app lifespan without blocking it: the server answers /health at once,
+# while /ready turns 200 only after the work a first real request would otherwise pay
+# for is done. Each step records its duration; a failed step is reported but does not
+# block readiness (the request path loads everything lazily anyway).
+
+SAMPLE_REPORT = "Hemoglobin 13.2 g/dL 12.0-15.5\nGlucose 130 mg/dL 70-99 H\nHIV Ab: Negative"
+
+_steps: Dict[str, Dict[str, Any]] = {}
+_task: Optional[asyncio.Task] = None
+
+
+def _warm_parser() -> None:
+    # Exercises every compiled pattern and the normalization tables once
+    for engine in ("regex", "scan"):
+        parse_text(SAMPLE_REPORT, engine)
+
+
+def _warm_worker() -> None:
+    # Runs in each parse worker process: the import a first PDF would pay for
+    load_pdf_engine()
+
+
+async def _warm_parse_pool() -> None:
+    # One job per worker, submitted together, so every worker process gets started
+    pool = get_parse_pool()
+    await asyncio.gather(*(pool.run(_warm_worker) for _ in range(max(1, pool.workers))))
+
+
+STEPS: List[Tuple[str, Callable[[], Awaitable[Any]]]] = [
+    ("parser", lambda: asyncio.to_thread(_warm_parser)),
+    ("pdf_engine", lambda: asyncio.to_thread(load_pdf_engine)),
+    ("parse_pool", _warm_parse_pool),
+    ("llm_pool", warm_http_client),
+]
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[Any]]) -> None:
+    start = time.perf_counter()
+    _steps[name] = {"ready": False}
+    try:
+        await step()
+        _steps[name] = {"ready": True}
+    except Exception as e:
+        _steps[name] = {"ready": True, "error": type(e).__name__}
+    _steps[name]["ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def warm_up() -> None:
+    await asyncio.gather(*(_run_step(name, step) for name, step in STEPS))
+
+
+def _enabled() -> bool:
+    return os.getenv("WARMUP", "1").lower() not in {"0", "false", "no"}
+
+
+def start_warm_up() -> None:
+    global _task
+    _steps.clear()
+    if _enabled():
+        _task = asyncio.create_task(warm_up())
+
+
+async def stop_warm_up() -> None:
+    global _task
+    task, _task = _task, None
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def readiness() -> Dict[str, Any]:
+    if not _enabled():
+        return {"ready": True, "steps": {}}
+    steps = {name: dict(_steps.get(name, {"ready": False})) for name, _ in STEPS}
+    return {"ready": all(s["ready"] for s in steps.values()), "steps": steps}
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.services.metrics import WORKER_JOBS
+
+
+class PoolSaturatedError(Exception):
+    def __init__(self, retry_after_s: int) -> None:
+        super().__init__("worker pool saturated")
+        self.retry_after_s = retry_after_s
+
+
+class WorkerPool:
+    # CPU-bound jobs run in worker processes so the event loop keeps serving.
+    # At most `workers + queue_size` jobs are admitted; the rest are rejected
+    # with PoolSaturatedError so callers can answer 503 instead of piling up.
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        queue_size: int,
+        timeout_s: float,
+        start_method: str = "spawn",
+    ) -> None:
+        self.name = name
+        self.workers = max(0, workers)
+        self.max_pending = max(1, self.workers) + max(0, queue_size)
+        self.timeout_s = timeout_s
+        self.start_method = start_method
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._avg_job_s = 0.0
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers == 0:
+                    # Dev/test mode: keep work in-process but off the event loop
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+                else:
+                    ctx = multiprocessing.get_context(self.start_method)
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+            return self._executor
+
+    def _retry_after_s(self) -> int:
+        per_job = self._avg_job_s or 1.0
+        return max(1, math.ceil(per_job * self._pending / max(1, self.workers)))
+
+    def _release(self, started: float, cf: Future, slot: Dict[str, bool]) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if not slot["held"]:
+                return  # already released when the job timed out
+            slot["held"] = False
+            self._pending -= 1
+            if cf.cancelled():
+                return
+            if cf.exception() is None:
+                self._counts["completed"] += 1
+            else:
+                self._counts["failed"] += 1
+            WORKER_JOBS.observe(elapsed, self.name, "ok" if cf.exception() is None else "error")
+            # Exponentially weighted so Retry-After tracks the current workload
+            prev = self._avg_job_s
+            self._avg_job_s = elapsed if not prev else 0.8 * prev + 0.2 * elapsed
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counts["rejected"] += 1
+                raise PoolSaturatedError(self._retry_after_s())
+            self._pending += 1
+            self._counts["submitted"] += 1
+
+        started = time.perf_counter()
+        slot = {"held": True}
+        executor = self._get_executor()
+        try:
+            cf = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            with self._lock:
+                self._pending -= 1
+            raise
+        # Slots are released when the job really finishes, or when it times out and its
+        # worker is killed, so a job that is still running keeps counting against the bound
+        cf.add_done_callback(lambda f: self._release(started, f, slot))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cf), timeout=self.timeout_s)
+        except TimeoutError:
+            if not cf.cancel():
+                self._recycle(executor)
+            with self._lock:
+                self._counts["timed_out"] += 1
+                if slot["held"]:
+                    slot["held"] = False
+                    self._pending -= 1
+            raise
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def _recycle(self, executor: Executor) -> None:
+        # A running job cannot be cancelled, and a hung one would hold its worker for good.
+        # Kill the executor's processes; jobs running or queued beside it fail with
+        # BrokenProcessPool (callers answer 503 with Retry-After; cancelling them instead
+        # would surface as a CancelledError nothing maps) and the next job starts a fresh
+        # executor. A thread cannot be killed: in-process mode abandons the thread instead.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = getattr(executor, "_processes", None) or {}
+        for process in list(processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False)
+
+    def _reset(self, executor: Executor) -> None:
+        # A crashed worker poisons the whole ProcessPoolExecutor; start a fresh one lazily.
+        # Only the executor the job ran on: by the time its failure arrives another job may
+        # already have started a fresh one, and shutting that down would cancel its work.
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "avg_job_ms": int(self._avg_job_s * 1000),
+                **self._counts,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_parse_pool: Optional[WorkerPool] = None
+
+
+def get_parse_pool() -> WorkerPool:
+    global _parse_pool
+    if _parse_pool is None:
+        workers = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+        _parse_pool = WorkerPool(
+            "parse",
+            workers=workers,
+            queue_size=int(os.getenv("PARSE_QUEUE_SIZE", str(max(1, workers) * 2))),
+            timeout_s=float(os.getenv("PARSE_JOB_TIMEOUT_S", "30")),
+            start_method=os.getenv("PARSE_POOL_START_METHOD", "spawn"),
+        )
+    return _parse_pool
+
+
+def shutdown_pools() -> None:
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown()
+        _parse_pool = None
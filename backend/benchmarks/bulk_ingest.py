@@ -0,0 +1,90 @@
+"""Bulk flagging of structured results against the per-row parser functions.
+
+    python -m benchmarks.bulk_ingest --rows 200000
+
+The baseline builds a ParsedRow per result and runs _compute_flag and _confidence on
+it, which is what a loop over the parser's helpers costs. Every engine's output is
+checked against it before timing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.bulk import ENGINES, _number, _text, _value, flag_columns, numpy_available
+from app.services.normalize import canonical_test, canonical_unit
+from app.services.parser import ParsedRow, _compute_flag, _confidence
+from benchmarks.corpus import FEED_COLUMNS, make_feed
+
+
+def per_row_columns(columns: Dict[str, List[Any]]) -> Tuple[Dict[str, List[Any]], List[int]]:
+    # Reference implementation: same inputs and output as flag_columns, one row at a time
+    n = len(columns["test_name"])
+    rows: List[ParsedRow] = []
+    rejected: List[int] = []
+    for i in range(n):
+        raw = {k: (columns.get(k) or [None] * n)[i] for k in FEED_COLUMNS}
+        name, value, unit = _text(raw["test_name"]), _value(raw["value"]), _text(raw["unit"])
+        bounds = {k: _number(raw[k]) for k in ("low", "high", "le", "ge")}
+        unreadable = any(b is not None and not isinstance(b, float) for b in bounds.values())
+        if name is None or value is None or unreadable:
+            rejected.append(i)
+            continue
+        low, high = bounds["low"], bounds["high"]
+        le = bounds["le"] if bounds["le"] is not None else (high if low is None else None)
+        ge = bounds["ge"] if bounds["ge"] is not None else (low if high is None else None)
+        range_tuple: Optional[Tuple[float, float]] = None
+        if low is not None and high is not None:
+            range_tuple, reference_range = (low, high), f"{low}-{high}"
+        elif le is not None:
+            reference_range = f"≤ {le}"
+        elif ge is not None:
+            reference_range = f"≥ {ge}"
+        else:
+            reference_range = None
+        row = ParsedRow(name, value, unit, reference_range, None, 0.0)
+        row.flag = _compute_flag(value, range_tuple, le, ge)
+        row.confidence = _confidence(row)
+        row.test_code = canonical_test(row.test_name)
+        row.unit_canonical = canonical_unit(row.unit)
+        rows.append(row)
+    fields = ParsedRow.__slots__
+    return {f: [getattr(r, f) for r in rows] for f in fields}, rejected
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    columns = make_feed(args.rows)
+    results = {"per_row": _best(lambda: per_row_columns(columns), args.repeat)}
+    reference = per_row_columns(columns)
+    for engine in ENGINES:
+        if engine == "numpy" and not numpy_available():
+            continue
+        if flag_columns(columns, engine) != reference:
+            raise SystemExit(f"engine {engine!r} output differs from the per-row baseline")
+        results[engine] = _best(lambda: flag_columns(columns, engine), args.repeat)
+    base = results["per_row"]["seconds"]
+    for r in results.values():
+        r["rows_per_sec"] = int(args.rows / r["seconds"])
+        r["speedup"] = round(base / r["seconds"], 2)
+    print(json.dumps({"rows": args.rows, "engines": results}, indent=2))
+
+
+def _best(fn, repeat: int) -> Dict[str, Any]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"seconds": round(min(times), 4)}
+
+
+if __name__ == "__main__":
+    main()
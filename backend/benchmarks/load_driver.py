@@ -0,0 +1,236 @@
+"""Open-loop load against the API: mixed parse/interpret traffic at a target RPS.
+
+    # in-process app, mock LLM in a background thread
+    python -m benchmarks.load_driver --rps 20 --duration 30 --mock-llm --mock-malformed 0.05
+    # a running server (point its OPENAI_API_BASE at benchmarks.mock_llm)
+    python -m benchmarks.load_driver --url http://127.0.0.1:8000 --rps 50
+
+Requests are sent on a fixed schedule whether or not earlier ones finished, and
+latency is measured from the scheduled time, so a stalled server shows up as
+latency rather than as a lower request rate. Every interpret request carries
+different rows, so the interpretation cache does not hide the LLM. Event-loop lag
+is sampled in this process: with the in-process app that is the app's own loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.services.parser import parse_text
+from benchmarks.corpus import make_documents, make_pdf, make_report
+from benchmarks.mock_llm import add_mock_arguments, config_from_args, create_app
+from benchmarks.parser_suite import percentile
+
+KINDS = ("parse", "parse_pdf", "interpret", "interpret_stream")
+LAG_INTERVAL_S = 0.05
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    # "parse=0.4,interpret=0.6" -> normalised weights
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in KINDS:
+            raise ValueError(f"unknown request kind: {kind.strip()!r}")
+        weights[kind.strip()] = float(weight or 1)
+    total = sum(weights.values())
+    return {k: w / total for k, w in weights.items()}
+
+
+def _rows(seed: int) -> List[Dict[str, Any]]:
+    rows, _ = parse_text(make_report(25, seed))
+    return [asdict(r) for r in rows] or [{"test_name": "Glucose", "value": 90, "confidence": 0.6}]
+
+
+def build_requests(n: int, mix: Dict[str, float], seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    # (kind, httpx request kwargs) for each scheduled request
+    rng = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+    texts = make_documents(32, 40, seed)
+    pdfs = [make_pdf(t) for t in texts[:8]] if "parse_pdf" in mix else []
+    out: List[Tuple[str, Dict[str, Any]]] = []
+    for i in range(n):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "parse":
+            req = {"url": "/api/v1/parse", "json": {"text": texts[i % len(texts)]}}
+        elif kind == "parse_pdf":
+            files = {"file": ("report.pdf", pdfs[i % len(pdfs)], "application/pdf")}
+            req = {"url": "/api/v1/parse", "files": files}
+        else:
+            path = "/api/v1/interpret" if kind == "interpret" else "/api/v1/interpret/stream"
+            req = {"url": path, "json": {"rows": _rows(seed * 1_000_003 + i)}}
+        out.append((kind, req))
+    return out
+
+
+def _fell_back(kind: str, resp: httpx.Response) -> Optional[bool]:
+    if kind == "interpret" and resp.status_code == 200:
+        return not resp.json().get("meta", {}).get("ok", False)
+    if kind == "interpret_stream" and resp.status_code == 200:
+        _, _, done = resp.text.rpartition("event: done\ndata: ")
+        return not json.loads(done.split("\n", 1)[0]).get("ok", False) if done else True
+    return None
+
+
+async def _send(
+    client: httpx.AsyncClient, kind: str, req: Dict[str, Any], scheduled: float, results: List
+) -> None:
+    delay = scheduled - time.perf_counter()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    try:
+        resp = await client.post(**req)
+        status: Any = resp.status_code
+        fell_back = _fell_back(kind, resp)
+    except httpx.HTTPError as e:
+        status, fell_back = type(e).__name__, None
+    results.append((kind, status, time.perf_counter() - scheduled, fell_back))
+
+
+async def _sample_lag(samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL_S)
+        samples.append(max(0.0, time.perf_counter() - start - LAG_INTERVAL_S))
+
+
+def _ms(values: List[float], pct: float) -> Optional[float]:
+    return round(percentile(values, pct) * 1000, 1) if values else None
+
+
+def summarize(results: List, lag: List[float], elapsed: float) -> Dict[str, Any]:
+    by_kind: Dict[str, List] = defaultdict(list)
+    for item in results:
+        by_kind[item[0]].append(item)
+    kinds: Dict[str, Any] = {}
+    for kind, items in sorted(by_kind.items()):
+        latencies = [i[2] for i in items]
+        statuses: Dict[str, int] = defaultdict(int)
+        for i in items:
+            statuses[str(i[1])] += 1
+        entry: Dict[str, Any] = {
+            "requests": len(items),
+            "statuses": dict(statuses),
+            "p50_ms": _ms(latencies, 50),
+            "p90_ms": _ms(latencies, 90),
+            "p99_ms": _ms(latencies, 99),
+            "max_ms": round(max(latencies) * 1000, 1),
+        }
+        fallbacks = [i[3] for i in items if i[3] is not None]
+        if fallbacks:
+            entry["fallback_rate"] = round(sum(fallbacks) / len(fallbacks), 4)
+        kinds[kind] = entry
+    ok = sum(1 for r in results if isinstance(r[1], int) and r[1] < 400)
+    return {
+        "requests": len(results),
+        "ok": ok,
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(ok / elapsed, 2) if elapsed > 0 else None,
+        "kinds": kinds,
+        "loop_lag_ms": {"p50": _ms(lag, 50), "p99": _ms(lag, 99), "max": _ms(lag, 100)},
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient, requests: List[Tuple[str, Dict[str, Any]]], rps: float
+) -> Dict[str, Any]:
+    results: List = []
+    lag: List[float] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_lag(lag, stop))
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(_send(client, kind, req, start + i / rps, results))
+        for i, (kind, req) in enumerate(requests)
+    ]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+    return summarize(results, lag, elapsed)
+
+
+def _start_mock(args: argparse.Namespace) -> str:
+    # Runs in its own thread and event loop so it does not add to the measured loop lag
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(config_from_args(args, "mock-")),
+            host="127.0.0.1",
+            port=args.mock_port,
+            log_level="warning",
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{args.mock_port}/v1/chat/completions"
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    requests = build_requests(int(args.rps * args.duration), parse_mix(args.mix), args.seed)
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.max_connections)
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits)
+        else:
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            client = httpx.AsyncClient(transport=transport, base_url="http://app", timeout=timeout)
+        await stack.enter_async_context(client)
+        report = await run_load(client, requests, args.rps)
+    report["target_rps"] = args.rps
+    report["mix"] = args.mix
+    report["target"] = args.url or "in-process"
+    report["parse_workers"] = os.getenv("PARSE_WORKERS", "default")
+    return report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", help="base URL of a running server; default runs the app in-process")
+    ap.add_argument("--rps", type=float, default=10.0)
+    ap.add_argument("--duration", type=float, default=30.0)
+    ap.add_argument("--mix", default="parse=0.4,parse_pdf=0.1,interpret=0.4,interpret_stream=0.1")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--max-connections", type=int, default=200)
+    ap.add_argument("--out", help="write the report JSON here")
+    ap.add_argument("--mock-llm", action="store_true", help="serve a mock LLM for the app")
+    ap.add_argument("--mock-port", type=int, default=9100)
+    add_mock_arguments(ap, "mock-")
+    args = ap.parse_args()
+
+    # Keep stdout for the report: per-request access logs would drown it
+    for name in ("reportrx.backend", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    if args.mock_llm:
+        os.environ["OPENAI_API_BASE"] = _start_mock(args)
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+    report = asyncio.run(_main(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
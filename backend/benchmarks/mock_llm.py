@@ -0,0 +1,202 @@
+"""A local stand-in for the OpenAI chat-completions endpoint, for load tests.
+
+    python -m benchmarks.mock_llm --port 9100 --latency lognormal:400:0.6 --malformed 0.05
+    OPENAI_API_BASE=http://127.0.0.1:9100/v1/chat/completions OPENAI_API_KEY=mock make run
+
+Answers are valid interpretations shaped by the prompt (one per report for batch
+prompts), delayed by a latency distribution, with configurable rates of malformed
+JSON (exercises the repair path) and 429/5xx responses (retries, breaker,
+fallback). `"stream": true` requests get SSE deltas. GET /stats returns counts.
+
+Latency specs, in milliseconds:
+    fixed:200   uniform:100:800   lognormal:<median>:<sigma>
+    bimodal:<fast>:<slow>:<slow_fraction>   (a slow tail, for hedging)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+NEXT_STEPS = [
+    "Please schedule a visit with your doctor to review these results and your overall health.",
+    "Ask which results matter most for you.",
+    "Bring a list of your medications.",
+    "Ask about follow-up testing.",
+]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    # Returns a sampler of seconds
+    kind, *params = spec.split(":")
+    try:
+        p = [float(x) for x in params]
+        if kind == "fixed":
+            return lambda rng: p[0] / 1000
+        if kind == "uniform":
+            return lambda rng: rng.uniform(p[0], p[1]) / 1000
+        if kind == "lognormal":
+            return lambda rng: rng.lognormvariate(math.log(p[0]), p[1]) / 1000
+        if kind == "bimodal":
+            return lambda rng: (p[1] if rng.random() < p[2] else p[0]) / 1000
+    except (IndexError, ValueError):
+        pass
+    raise ValueError(f"invalid latency spec: {spec!r}")
+
+
+@dataclass
+class MockConfig:
+    latency: str = "lognormal:400:0.5"
+    malformed: float = 0.0
+    error_429: float = 0.0
+    error_5xx: float = 0.0
+    stream_chunk_chars: int = 24
+    seed: int = 0
+    counts: Counter = field(default_factory=Counter)
+
+
+def _test_names(rows: Any) -> List[str]:
+    if not isinstance(rows, list):
+        return ["Result"]
+    # Rows are [test_name, value, ...] arrays (see COLUMNS in the prompt); objects also work
+    names = [
+        r.get("test_name") if isinstance(r, dict) else r[0]
+        for r in rows
+        if isinstance(r, (dict, list)) and r
+    ]
+    return [str(n) for n in names if n] or ["Result"]
+
+
+def _interpretation(names: List[str]) -> Dict[str, Any]:
+    return {
+        "summary": f"Reviewed {len(names)} results. Most values are within the reported ranges.",
+        "per_test": [
+            {"test_name": n, "explanation": f"{n} is reported with its reference range."}
+            for n in names[:10]
+        ],
+        "flags": [],
+        "next_steps": NEXT_STEPS,
+        "disclaimer": "Educational information only; not a diagnosis.",
+    }
+
+
+def _answer(prompt: str) -> Dict[str, Any]:
+    # Mirrors the two prompt shapes the backend sends; anything else gets a generic answer
+    _, sep, body = prompt.rpartition("REPORTS:\n")
+    if sep:
+        try:
+            reports = json.loads(body)
+            return {
+                "results": [
+                    {"id": r.get("id"), **_interpretation(_test_names(r.get("rows")))}
+                    for r in reports
+                ]
+            }
+        except (ValueError, AttributeError):
+            pass
+    _, sep, body = prompt.rpartition("ROWS:\n")
+    try:
+        rows = json.loads(body) if sep else None
+    except ValueError:
+        rows = None
+    return _interpretation(_test_names(rows))
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    app = FastAPI(title="Mock LLM")
+    rng = random.Random(config.seed)
+    sample_latency = parse_latency(config.latency)
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, int]:
+        return dict(config.counts)
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request) -> Response:
+        payload = await request.json()
+        prompt = payload["messages"][-1]["content"]
+        delay = sample_latency(rng)
+        roll = rng.random()
+        if roll < config.error_429:
+            config.counts["429"] += 1
+            await asyncio.sleep(delay / 4)
+            return JSONResponse({"error": "rate limited"}, 429, headers={"Retry-After": "0.2"})
+        if roll < config.error_429 + config.error_5xx:
+            config.counts["5xx"] += 1
+            await asyncio.sleep(delay / 2)
+            return JSONResponse({"error": "upstream failed"}, rng.choice((500, 502, 503)))
+
+        content = json.dumps(_answer(prompt))
+        if rng.random() < config.malformed:
+            config.counts["malformed"] += 1
+            content = "Sure! Here is the JSON you asked for:\n" + content[: len(content) // 2]
+        else:
+            config.counts["ok"] += 1
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+
+        if payload.get("stream"):
+            return StreamingResponse(
+                _stream(content, delay, config.stream_chunk_chars), media_type="text/event-stream"
+            )
+        await asyncio.sleep(delay)
+        return JSONResponse(
+            {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": usage}
+        )
+
+    return app
+
+
+async def _stream(content: str, delay: float, chunk_chars: int) -> AsyncIterator[str]:
+    # A third of the latency before the first token, the rest spread across the chunks
+    chunks = [content[i : i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+    await asyncio.sleep(delay / 3)
+    per_chunk = (delay * 2 / 3) / max(1, len(chunks))
+    for chunk in chunks:
+        yield f"data: {json.dumps({'choices': [{'delta': {'content': chunk}}]})}\n\n"
+        await asyncio.sleep(per_chunk)
+    yield "data: [DONE]\n\n"
+
+
+def add_mock_arguments(ap: argparse.ArgumentParser, prefix: str = "") -> None:
+    ap.add_argument(f"--{prefix}latency", default="lognormal:400:0.5")
+    ap.add_argument(f"--{prefix}malformed", type=float, default=0.0)
+    ap.add_argument(f"--{prefix}error-429", type=float, default=0.0)
+    ap.add_argument(f"--{prefix}error-5xx", type=float, default=0.0)
+    ap.add_argument(f"--{prefix}seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace, prefix: str = "") -> MockConfig:
+    attr = prefix.replace("-", "_")
+    return MockConfig(
+        latency=getattr(args, f"{attr}latency"),
+        malformed=getattr(args, f"{attr}malformed"),
+        error_429=getattr(args, f"{attr}error_429"),
+        error_5xx=getattr(args, f"{attr}error_5xx"),
+        seed=getattr(args, f"{attr}seed"),
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    add_mock_arguments(ap)
+    args = ap.parse_args()
+    parse_latency(args.latency)
+    app = create_app(config_from_args(args))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare the parse_text engines on a synthetic report.
+
+python -m benchmarks.parser_engines --lines 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.services.parser import ENGINES, parse_text
+from benchmarks.corpus import make_report
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    text = make_report(args.lines)
+    reference = parse_text(text, engine="regex")
+    results = {}
+    for engine in ENGINES:
+        if parse_text(text, engine=engine) != reference:
+            raise SystemExit(f"engine {engine!r} output differs from 'regex'")
+        best = min(_timed(text, engine) for _ in range(args.repeat))
+        results[engine] = {
+            "seconds": round(best, 4),
+            "us_per_line": round(best / args.lines * 1e6, 3),
+            "lines_per_sec": int(args.lines / best),
+        }
+    base = results["regex"]["seconds"]
+    for r in results.values():
+        r["speedup"] = round(base / r["seconds"], 2)
+    print(json.dumps({"lines": args.lines, "engines": results}, indent=2))
+
+
+def _timed(text: str, engine: str) -> float:
+    start = time.perf_counter()
+    parse_text(text, engine=engine)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
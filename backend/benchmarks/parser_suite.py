@@ -0,0 +1,183 @@
+"""Parser throughput on a synthetic corpus, with an optional baseline check.
+
+    python -m benchmarks.parser_suite --out bench.json
+    python -m benchmarks.parser_suite --baseline bench.json --threshold 0.15
+
+Text documents go through parse_text and PDFs (generated locally) through
+parse_pdf, in this process. Timings and memory are measured in separate passes,
+since tracemalloc slows everything it watches; peak_kib is the Python heap only
+(MuPDF's own allocations are not traced). Exits 1 when a metric is worse
+than the baseline by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.services.parser import parse_text
+from app.services.pdf import parse_pdf
+from benchmarks.corpus import LINES_PER_PAGE, make_documents, make_pdf
+
+# metric -> True when higher is better
+METRICS = {
+    "lines_per_sec": True,
+    "pages_per_sec": True,
+    "docs_per_sec": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_kib": False,
+}
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    # Nearest rank
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _peak_kib(fn: Callable[[Any], Any], docs: Sequence[Any]) -> int:
+    tracemalloc.start()
+    try:
+        for doc in docs:
+            fn(doc)
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn: Callable[[Any], Any], docs: Sequence[Any], repeat: int) -> Dict[str, Any]:
+    # Best of `repeat` runs for totals; per-document latencies pooled over all runs
+    latencies: List[float] = []
+    best = math.inf
+    for _ in range(repeat):
+        run_start = time.perf_counter()
+        for doc in docs:
+            start = time.perf_counter()
+            fn(doc)
+            latencies.append(time.perf_counter() - start)
+        best = min(best, time.perf_counter() - run_start)
+    return {
+        "seconds": round(best, 4),
+        "docs_per_sec": round(len(docs) / best, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_kib": _peak_kib(fn, docs),
+    }
+
+
+def run_suite(
+    docs: int = 200,
+    lines_per_doc: int = 60,
+    pdf_docs: int = 20,
+    pages_per_pdf: int = 5,
+    repeat: int = 3,
+    seed: int = 0,
+    engine: Optional[str] = None,
+) -> Dict[str, Any]:
+    texts = make_documents(docs, lines_per_doc, seed)
+    n_lines = sum(len(t.splitlines()) for t in texts)
+    text_result = measure(lambda t: parse_text(t, engine=engine), texts, repeat)
+    text_result["lines_per_sec"] = int(n_lines / text_result["seconds"])
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "engine": engine or "default",
+            "seed": seed,
+            "docs": docs,
+            "lines_per_doc": lines_per_doc,
+            "pdf_docs": pdf_docs,
+            "pages_per_pdf": pages_per_pdf,
+        },
+        "text": text_result,
+    }
+    if pdf_docs:
+        sources = make_documents(pdf_docs, pages_per_pdf * LINES_PER_PAGE, seed + 1)
+        pdfs = [make_pdf(t) for t in sources]
+        n_pages = sum(parse_pdf(p)[2]["pages"] for p in pdfs)
+        pdf_result = measure(parse_pdf, pdfs, repeat)
+        pdf_result["pages_per_sec"] = round(n_pages / pdf_result["seconds"], 2)
+        report["pdf"] = pdf_result
+    return report
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    # One entry per metric present in both runs; "regressed" when worse by > threshold
+    rows: List[Dict[str, Any]] = []
+    for section in ("text", "pdf"):
+        for metric, higher_is_better in METRICS.items():
+            now = current.get(section, {}).get(metric)
+            then = baseline.get(section, {}).get(metric)
+            if now is None or not then:
+                continue
+            change = (now - then) / then
+            worse = -change if higher_is_better else change
+            rows.append(
+                {
+                    "metric": f"{section}.{metric}",
+                    "baseline": then,
+                    "current": now,
+                    "change": round(change, 4),
+                    "regressed": worse > threshold,
+                }
+            )
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=200)
+    ap.add_argument("--lines-per-doc", type=int, default=60)
+    ap.add_argument("--pdf-docs", type=int, default=20)
+    ap.add_argument("--pages-per-pdf", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--engine", default=None)
+    ap.add_argument("--out", help="write the results JSON here")
+    ap.add_argument("--baseline", help="results JSON from an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.10)
+    args = ap.parse_args()
+
+    report = run_suite(
+        docs=args.docs,
+        lines_per_doc=args.lines_per_doc,
+        pdf_docs=args.pdf_docs,
+        pages_per_pdf=args.pages_per_pdf,
+        repeat=args.repeat,
+        seed=args.seed,
+        engine=args.engine,
+    )
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            rows = compare(report, json.load(f), args.threshold)
+        report["comparison"] = {
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+            "metrics": rows,
+        }
+        regressed = any(r["regressed"] for r in rows)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    if regressed:
+        names = ", ".join(r["metric"] for r in report["comparison"]["metrics"] if r["regressed"])
+        print(f"regression beyond {args.threshold:.0%}: {names}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Cold-start cost: import time per module and time until the server answers.
+
+    python -m benchmarks.startup              # import table + a uvicorn start
+    python -m benchmarks.startup --no-serve --top 30 --out bench-startup.json
+
+Imports are measured with `python -X importtime` in a fresh interpreter, so nothing is
+cached from this process. "self" is the module's own import time, "cumulative" includes
+everything it imported first. The serve step starts uvicorn in a subprocess and polls
+/api/v1/health (accepting traffic) and /api/v1/ready (warm-up finished).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+IMPORT_TARGET = "app.main"
+
+
+def import_costs(target: str = IMPORT_TARGET) -> List[Dict[str, Any]]:
+    # One entry per imported module, in import order, times in milliseconds
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return modules
+
+
+def summarize_imports(modules: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    total = next((m["cumulative_ms"] for m in modules if m["module"] == IMPORT_TARGET), None)
+    own = [m for m in modules if m["module"].split(".")[0] in ("app", "benchmarks")]
+    packages: Dict[str, float] = {}
+    for m in modules:
+        root = m["module"].split(".")[0]
+        packages[root] = packages.get(root, 0.0) + m["self_ms"]
+    return {
+        "total_ms": total,
+        "app_modules": sorted(own, key=lambda m: -m["cumulative_ms"])[:top],
+        "packages": dict(sorted(packages.items(), key=lambda kv: -kv[1])[:top]),
+    }
+
+
+def _wait_for(client: httpx.Client, url: str, deadline: float) -> Optional[float]:
+    # perf_counter() time of the first 200 from url, or None at the deadline
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def serve_timings(port: int, timeout_s: float) -> Dict[str, Any]:
+    # Seconds from process start until /health, then /ready, first answer 200
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd + ["--log-level", "warning"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}/api/v1"
+    steps = None
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            health = _wait_for(client, f"{base}/health", start + timeout_s)
+            ready = _wait_for(client, f"{base}/ready", start + timeout_s) if health else None
+            if ready is not None:
+                steps = client.get(f"{base}/ready").json().get("steps")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {
+        "health_s": None if health is None else round(health - start, 3),
+        "ready_s": None if ready is None else round(ready - start, 3),
+        "warmup_steps": steps,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--no-serve", action="store_true", help="only measure imports")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--out", help="write the report JSON here")
+    args = ap.parse_args()
+
+    report: Dict[str, Any] = {"imports": summarize_imports(import_costs(), args.top)}
+    if not args.no_serve:
+        report["serve"] = serve_timings(args.port, args.timeout)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
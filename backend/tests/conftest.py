@@ -0,0 +1,10 @@
+import pytest
+
+from app.services import parse_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_parse_cache(monkeypatch):
+    # Parse results are cached by content; tests re-post the same documents
+    monkeypatch.setattr(parse_cache, "_parse_cache", None)
+    monkeypatch.setattr(parse_cache, "_counts", {"bytes_saved": 0})
@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import access_log
+from app.services.access_log import AccessLog
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    stream = io.StringIO()
+    log = AccessLog(max_queue=100, health_every=3, stream=stream)
+    log.start()
+    monkeypatch.setattr(access_log, "_access_log", log)
+    yield log, stream
+    log.stop()
+
+
+def test_requests_are_logged_as_json_with_a_request_id(logged):
+    log, stream = logged
+    client = TestClient(app)
+    body = {"text": "Glucose 130 mg/dL 70-99"}
+    resp = client.post("/api/v1/parse", json=body, headers={"X-Request-ID": "abc-1"})
+    assert resp.headers["x-request-id"] == "abc-1"
+    generated = client.get("/api/v1/jobs/secret-job-id", headers={"X-Request-ID": "no spaces"})
+    assert len(generated.headers["x-request-id"]) == 16
+    log.stop()
+
+    first, second = lines(stream)
+    assert first == {
+        "ts": first["ts"],
+        "level": "info",
+        "event": "http_request",
+        "request_id": "abc-1",
+        "method": "POST",
+        "path": "/api/v1/parse",
+        "status": 200,
+        "duration_ms": first["duration_ms"],
+    }
+    # The job id stays out of the log, and nothing of the body gets in
+    assert second["path"] == "/api/v1/jobs/{job_id}" and second["status"] == 404
+    assert second["request_id"] == generated.headers["x-request-id"]
+    assert "Glucose" not in stream.getvalue() and "secret" not in stream.getvalue()
+
+
+def test_successful_health_checks_are_sampled(logged):
+    log, stream = logged
+    client = TestClient(app)
+    for _ in range(6):
+        client.get("/api/v1/health")
+    client.get("/api/v1/ready")  # 503 without the lifespan: always logged
+    log.stop()
+    assert [r["path"] for r in lines(stream)] == ["/api/v1/health"] * 2 + ["/api/v1/ready"]
+    assert log.stats()["sampled_out"] == 4
+
+
+def test_full_queue_drops_and_counts():
+    stream = io.StringIO()
+    log = AccessLog(max_queue=2, health_every=1, stream=stream)
+    for i in range(5):
+        log.http("GET", "/x", 200, i, "r")
+    assert log.stats() == {
+        "queued": 2,
+        "max_queue": 2,
+        "written": 0,
+        "dropped": 3,
+        "sampled_out": 0,
+    }
+    log.start()
+    log.stop()
+    assert [r["duration_ms"] for r in lines(stream)] == [0, 1]
+    assert log.stats()["written"] == 2
+
+
+def test_app_warnings_go_through_the_same_writer(logged):
+    log, stream = logged
+    logging.getLogger("reportrx.backend").warning({"event": "profile_write_failed", "error": "E"})
+    logging.getLogger("reportrx.backend").info("plain %s", "text")
+    log.stop()
+    warning, info = lines(stream)
+    assert warning["level"] == "warning" and warning["event"] == "profile_write_failed"
+    assert info["message"] == "plain text" and info["logger"] == "reportrx.backend"
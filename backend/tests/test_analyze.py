@@ -0,0 +1,114 @@
+import json
+
+from fastapi.testclient import TestClient
+from test_interpret_cache import GOOD
+from test_interpret_stream import fake_stream, read_events
+
+from app.main import app
+from app.routers import parse
+from app.services import llm as llm_module
+from app.services import workers
+from app.services.cache import TieredCache, TTLCache
+from app.services.workers import PoolSaturatedError, WorkerPool
+from benchmarks.corpus import make_pdf
+
+TEXT = "Haemoglobin 13.2 g/dl 12.0-15.5\nGlucose 130 mg/dL 70-99 H\nnoise"
+
+
+def frames(resp):
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_analyze_sends_rows_then_interpretation(monkeypatch):
+    prompts = []
+
+    def capture(text):
+        stream = fake_stream(text)
+
+        def wrapped(prompt, timeout_s=None):
+            prompts.append(prompt)
+            return stream(prompt, timeout_s)
+
+        return wrapped
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_stream_openai_chat", capture(json.dumps(GOOD)))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    resp = TestClient(app).post("/api/v1/analyze", json={"text": TEXT})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    out = frames(resp)
+    assert [f["type"] for f in out] == [
+        "rows",
+        "parsed",
+        "summary",
+        "per_test",
+        "next_steps",
+        "disclaimer",
+        "done",
+    ]
+    assert [r["test_code"] for r in out[0]["rows"]] == ["HGB", "GLU"]
+    assert out[0]["unparsed"] == ["noise"]
+    assert out[1]["rows"] == 2
+    assert out[2]["summary"] == GOOD["summary"]
+    assert out[-1]["ok"] is True and out[-1]["rows"] == {"included": 2, "elided": 0}
+    # Rows went into the prompt without a JSON round trip, canonicalised as usual
+    assert '["Hemoglobin",13.2,"g/dL","12.0-15.5","normal"]' in prompts[0]
+
+
+def test_analyze_pdf_streams_each_page(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    lines = [f"Sodium {130 + i} mmol/L 135-145" for i in range(120)]
+    pdf = make_pdf("\n".join(lines), lines_per_page=50)
+    files = {"file": ("report.pdf", pdf, "application/pdf")}
+    resp = TestClient(app).post("/api/v1/analyze?format=sse", files=files)
+    events = read_events(resp)
+    pages = [data for name, data in events if name == "rows"]
+    assert [p["page"] for p in pages] == [1, 2, 3]
+    assert sum(len(p["rows"]) for p in pages) == 120
+    parsed = next(data for name, data in events if name == "parsed")
+    assert parsed["pages"] == 3 and len(parsed["page_timings"]) == 3
+    assert events[-1][0] == "done" and events[-1][1]["ok"] is False  # fallback, no key
+
+
+def test_analyze_without_rows_skips_interpretation():
+    out = frames(TestClient(app).post("/api/v1/analyze", json={"text": "nothing here"}))
+    assert [f["type"] for f in out] == ["rows", "parsed", "done"]
+    assert out[-1]["ok"] is False
+
+
+def test_analyze_pdf_pages_go_through_the_parse_pool(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    pool = WorkerPool("parse", workers=0, queue_size=2, timeout_s=5)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    monkeypatch.setenv("PARSE_STREAM_PAGES_PER_JOB", "2")
+    lines = [f"Sodium {130 + i} mmol/L 135-145" for i in range(120)]
+    files = {
+        "file": ("report.pdf", make_pdf("\n".join(lines), lines_per_page=50), "application/pdf")
+    }
+    out = frames(TestClient(app).post("/api/v1/analyze", files=files))
+    assert [f["type"] for f in out[:4]] == ["rows", "rows", "rows", "parsed"]
+    # One job to select pages, then pages 1-2 and 3
+    assert pool.stats()["completed"] == 3
+    pool.shutdown()
+
+    pool = WorkerPool("parse", workers=1, queue_size=0, timeout_s=5)
+    pool._pending = pool.max_pending  # simulate a full queue
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    files = {"file": ("report.pdf", make_pdf("Sodium 140 mmol/L 135-145"), "application/pdf")}
+    resp = TestClient(app).post("/api/v1/analyze", files=files)
+    assert resp.status_code == 503 and int(resp.headers["retry-after"]) >= 1
+
+
+def test_analyze_stops_when_a_page_job_is_refused(monkeypatch):
+    def refused(source, options, indexes):
+        raise PoolSaturatedError(2)
+
+    pool = WorkerPool("parse", workers=0, queue_size=1, timeout_s=5)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    monkeypatch.setattr(parse, "parse_pdf_pages", refused)
+    files = {"file": ("report.pdf", make_pdf("Sodium 140 mmol/L 135-145"), "application/pdf")}
+    out = frames(TestClient(app).post("/api/v1/analyze", files=files))
+    assert out == [
+        {"type": "error", "detail": "Parser is busy. Please retry shortly.", "status": 503}
+    ]
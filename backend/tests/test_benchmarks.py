@@ -0,0 +1,47 @@
+from app.services.pdf import parse_pdf
+from benchmarks.corpus import make_documents, make_pdf
+from benchmarks.parser_suite import compare, percentile, run_suite
+from benchmarks.startup import import_costs, summarize_imports
+
+
+def test_corpus_is_deterministic_and_covers_formats():
+    docs = make_documents(3, 200, seed=7)
+    assert docs == make_documents(3, 200, seed=7)
+    assert docs != make_documents(3, 200, seed=8)
+    text = "\n".join(docs)
+    for marker in ("≤", ">=", "Positive", "[repeat]", "*", "Page ", "Patient:"):
+        assert marker in text
+
+
+def test_make_pdf_splits_into_pages():
+    data = make_pdf(make_documents(1, 120)[0], lines_per_page=50)
+    assert parse_pdf(data)[2]["pages"] == 3
+
+
+def test_run_suite_reports_throughput_and_latency():
+    report = run_suite(docs=3, lines_per_doc=20, pdf_docs=1, pages_per_pdf=1, repeat=1)
+    for section in ("text", "pdf"):
+        assert report[section]["p50_ms"] <= report[section]["p99_ms"]
+        assert report[section]["peak_kib"] >= 0
+    assert report["text"]["lines_per_sec"] > 0
+    assert report["pdf"]["pages_per_sec"] > 0
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"text": {"lines_per_sec": 1000, "p99_ms": 10.0}}
+    current = {"text": {"lines_per_sec": 850, "p99_ms": 10.5}}
+    rows = {r["metric"]: r for r in compare(current, baseline, threshold=0.10)}
+    assert rows["text.lines_per_sec"]["regressed"]
+    assert not rows["text.p99_ms"]["regressed"]
+    faster = {"text": {"lines_per_sec": 2000, "p99_ms": 5.0}}
+    assert not any(r["regressed"] for r in compare(faster, baseline, threshold=0.10))
+    assert percentile([3, 1, 2, 4], 50) == 2
+
+
+def test_startup_import_summary():
+    modules = import_costs()
+    summary = summarize_imports(modules, top=5)
+    assert summary["total_ms"] > 0
+    assert summary["app_modules"][0]["module"] == "app.main"
+    assert len(summary["packages"]) == 5
+    assert "fitz" not in {m["module"] for m in modules}
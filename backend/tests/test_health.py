@@ -1,5 +1,11 @@
+import subprocess
+import sys
+import time
+
 from fastapi.testclient import TestClient
+
 from app.main import app
+from app.services import warmup
 
 
 def test_health_ok():
@@ -8,3 +14,31 @@ def test_health_ok():
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
 
+
+def test_ready_waits_for_warm_up(monkeypatch):
+    monkeypatch.setenv("PARSE_WORKERS", "0")
+    monkeypatch.setattr(warmup, "_steps", {})
+    resp = TestClient(app).get("/api/v1/ready")  # no lifespan: warm-up never ran
+    assert resp.status_code == 503 and resp.json()["status"] == "warming"
+
+    with TestClient(app) as client:
+        for _ in range(200):
+            resp = client.get("/api/v1/ready")
+            if resp.status_code == 200:
+                break
+            time.sleep(0.02)
+        assert resp.status_code == 200
+        steps = resp.json()["steps"]
+        assert set(steps) == {"parser", "pdf_engine", "parse_pool", "llm_pool"}
+        assert all(s["ready"] and s["ms"] >= 0 for s in steps.values())
+
+
+def test_ready_without_warm_up(monkeypatch):
+    monkeypatch.setenv("WARMUP", "0")
+    assert TestClient(app).get("/api/v1/ready").json() == {"status": "ready", "steps": {}}
+
+
+def test_importing_the_app_defers_pymupdf():
+    code = "import sys, app.main; print('fitz' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
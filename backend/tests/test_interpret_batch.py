@@ -0,0 +1,70 @@
+import json
+
+from fastapi.testclient import TestClient
+from test_interpret import sample_rows, validate_interpretation_payload
+from test_interpret_cache import GOOD
+
+from app.main import app
+from app.services import llm as llm_module
+from app.services.cache import TieredCache, TTLCache
+from app.services.resilience import LatencyTracker
+
+
+def report(name, value):
+    return {"rows": [{"test_name": name, "value": value, "unit": "mg/dL", "confidence": 0.6}]}
+
+
+def test_interpret_batch_packs_reports_and_keeps_order(monkeypatch):
+    prompts = []
+
+    async def batch_call(prompt, timeout_s):
+        prompts.append(prompt)
+        reports = json.loads(prompt.split("REPORTS:\n", 1)[1])
+        # Answer every report except the last one, which must fall back on its own
+        results = [{"id": r["id"], **GOOD, "summary": r["rows"][0][0]} for r in reports]
+        return json.dumps({"results": results[:-1]})
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setenv("BATCH_MAX_REPORTS_PER_PROMPT", "3")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", batch_call)
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(64, 60)))
+    monkeypatch.setattr(llm_module, "_breaker", None)
+    monkeypatch.setattr(llm_module, "_latency", LatencyTracker())
+
+    reports = [report(f"Test{i}", i) for i in range(6)] + [{"rows": []}]
+    client = TestClient(app)
+    resp = client.post("/api/v1/interpret/batch", json={"reports": reports})
+    assert resp.status_code == 200
+    data = resp.json()
+
+    assert len(prompts) == 2  # six reports, three per prompt
+    assert data["meta"]["count"] == 6 and data["meta"]["packs"] == 2
+    assert data["meta"]["reports_per_sec"] > 0
+    results = data["results"]
+    assert [r["interpretation"]["summary"] for r in results[:2]] == ["Test0", "Test1"]
+    assert results[2]["meta"]["ok"] is False  # missing from the model's answer
+    validate_interpretation_payload(results[2])
+    assert results[2]["meta"]["batch"] == {"pack_size": 3}
+    assert results[6] == {"error": "rows must be a non-empty array"}
+
+
+def test_interpret_batch_uses_cache_and_dedupes(monkeypatch):
+    calls = []
+
+    async def single_call(prompt, timeout_s):
+        calls.append(prompt)
+        return json.dumps(GOOD)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", single_call)
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(64, 60)))
+
+    client = TestClient(app)
+    body = {"reports": [{"rows": sample_rows()}, {"rows": sample_rows()}]}
+    first = client.post("/api/v1/interpret/batch", json=body).json()
+    second = client.post("/api/v1/interpret/batch", json=body).json()
+
+    assert len(calls) == 1
+    assert first["results"][0]["interpretation"] == first["results"][1]["interpretation"]
+    assert second["meta"]["cache_hits"] == 1
+    assert all(r["meta"]["llm"] == "cache" for r in second["results"])
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from test_interpret import sample_rows, validate_interpretation_payload
+
+from app.main import app
+from app.services import cache as cache_module
+from app.services import llm as llm_module
+from app.services.cache import SealedSQLiteCache, TieredCache, TTLCache
+
+GOOD = {
+    "summary": "Mostly within range.",
+    "per_test": [{"test_name": "Hemoglobin", "explanation": "Normal."}],
+    "flags": [],
+    "next_steps": ["Please schedule a visit with your doctor to review these results."],
+    "disclaimer": "Educational only.",
+}
+
+
+def _counting_call(calls):
+    async def good_call(prompt: str, timeout_s: float) -> str:
+        calls.append(prompt)
+        return json.dumps(GOOD)
+
+    return good_call
+
+
+def test_interpret_cache_hit_skips_llm(monkeypatch):
+    calls = []
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", _counting_call(calls))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    client = TestClient(app)
+    first = client.post("/api/v1/interpret", json={"rows": sample_rows()}).json()
+    second = client.post("/api/v1/interpret", json={"rows": sample_rows()}).json()
+
+    assert len(calls) == 1
+    validate_interpretation_payload(second)
+    assert first["meta"]["cache"]["status"] == "miss"
+    assert second["meta"]["cache"] == {"status": "hit", "hits": 1, "misses": 1}
+    assert second["interpretation"] == first["interpretation"]
+
+
+def test_interpret_cache_disk_tier_is_sealed(monkeypatch, tmp_path):
+    pytest.importorskip("cryptography")
+    calls = []
+    path = str(tmp_path / "interpret.sqlite")
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", _counting_call(calls))
+    monkeypatch.setenv("INTERPRET_CACHE_PATH", path)
+    monkeypatch.setattr(llm_module, "_interpret_cache", None)
+
+    client = TestClient(app)
+    client.post("/api/v1/interpret", json={"rows": sample_rows()})
+    # A second worker: empty memory tier, same disk tier
+    monkeypatch.setattr(llm_module, "_interpret_cache", None)
+    resp = client.post("/api/v1/interpret", json={"rows": sample_rows()}).json()
+
+    assert len(calls) == 1
+    assert resp["meta"]["cache"]["status"] == "hit"
+    assert isinstance(llm_module.get_interpret_cache().disk, SealedSQLiteCache)
+    stored = sqlite3.connect(path).execute("SELECT key, value FROM cache").fetchall()
+    assert len(stored) == 1 and len(stored[0][0]) == 64
+    assert "Hemoglobin" not in stored[0][1] and GOOD["summary"] not in stored[0][1]
+
+
+def test_interpret_cache_path_without_cryptography_is_refused(monkeypatch, tmp_path, caplog):
+    path = tmp_path / "interpret.sqlite"
+    monkeypatch.setattr(cache_module, "sealed_cache_available", lambda: False)
+    monkeypatch.setenv("INTERPRET_CACHE_PATH", str(path))
+    monkeypatch.setattr(llm_module, "_interpret_cache", None)
+    with caplog.at_level("WARNING", logger="reportrx.cache"):
+        assert llm_module.get_interpret_cache().stats()["disk"] is False
+    assert caplog.records[0].msg["setting"] == "INTERPRET_CACHE_PATH"
+    assert not path.exists()
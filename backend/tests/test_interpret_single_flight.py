@@ -0,0 +1,37 @@
+import asyncio
+import json
+
+from test_interpret import sample_rows
+from test_interpret_cache import GOOD
+
+from app.services import llm as llm_module
+from app.services.cache import TieredCache, TTLCache
+from app.services.llm import ParsedRowIn, interpret_rows
+
+
+def test_concurrent_identical_requests_share_one_call(monkeypatch):
+    calls = []
+
+    async def slow_call(prompt: str, timeout_s: float) -> str:
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return json.dumps(GOOD)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", slow_call)
+    # Cache disabled so only coalescing can explain a single call
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(0, 60)))
+    rows = [ParsedRowIn(**r) for r in sample_rows()]
+    before = llm_module.single_flight_stats()
+
+    async def scenario():
+        return await asyncio.gather(*(interpret_rows(rows) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    after = llm_module.single_flight_stats()
+
+    assert len(calls) == 1
+    assert sorted(meta["coalesced"] for _, meta in results) == [False] + [True] * 4
+    assert all(meta["ok"] for _, meta in results)
+    assert after["coalesced"] - before["coalesced"] == 4
+    assert after["in_flight"] == 0
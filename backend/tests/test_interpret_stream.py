@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+from test_interpret import sample_rows
+from test_interpret_cache import GOOD
+
+from app.main import app
+from app.services import llm as llm_module
+from app.services.cache import TieredCache, TTLCache
+from app.services.jsonstream import JSONObjectStream
+from app.services.metrics import LLM_CALLS
+from app.services.resilience import CircuitBreaker
+
+
+def read_events(resp):
+    events = []
+    for block in resp.text.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def fake_stream(text, fail_after=None):
+    async def stream(prompt, timeout_s=None):
+        for i in range(0, len(text), 7):
+            if fail_after is not None and i >= fail_after:
+                raise RuntimeError("connection reset")
+            yield text[i : i + 7]
+
+    return stream
+
+
+def slow_stream(text, delay_s):
+    async def stream(prompt, timeout_s=None):
+        for i in range(0, len(text), 7):
+            await asyncio.sleep(delay_s)
+            yield text[i : i + 7]
+
+    return stream
+
+
+def test_json_object_stream_emits_items_as_they_close():
+    parser = JSONObjectStream()
+    events = []
+    for ch in json.dumps(GOOD, indent=1):
+        events += parser.feed(ch)
+    assert events[0] == ("field", "summary", GOOD["summary"])
+    assert ("item", "per_test", GOOD["per_test"][0]) in events
+    assert events[-1] == ("field", "disclaimer", GOOD["disclaimer"])
+    assert parser.closed
+
+
+def test_interpret_stream_forwards_sections(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_stream_openai_chat", fake_stream(json.dumps(GOOD)))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    client = TestClient(app)
+    resp = client.post("/api/v1/interpret/stream", json={"rows": sample_rows()})
+    assert resp.status_code == 200
+    events = read_events(resp)
+    assert [e for e, _ in events] == ["summary", "per_test", "next_steps", "disclaimer", "done"]
+    assert events[1][1] == GOOD["per_test"][0]
+    assert events[-1][1]["ok"] is True and "fallback_sections" not in events[-1][1]
+
+
+def test_interpret_stream_falls_back_for_missing_sections(monkeypatch):
+    text = json.dumps(GOOD)
+    cut = text.index('"flags"')
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_stream_openai_chat", fake_stream(text, fail_after=cut))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    client = TestClient(app)
+    events = read_events(client.post("/api/v1/interpret/stream", json={"rows": sample_rows()}))
+    names = [e for e, _ in events]
+    assert names.count("summary") == 1 and events[0][1] == GOOD["summary"]
+    assert "flag" in names  # the LDL row is flagged high by the fallback
+    assert events[-1][0] == "done"
+    assert events[-1][1]["ok"] is False
+    assert set(events[-1][1]["fallback_sections"]) == {"flags", "next_steps", "disclaimer"}
+    next_steps = next(data for e, data in events if e == "next_steps")
+    assert next_steps[0].startswith("Please schedule a visit with your doctor")
+
+
+def test_interpret_stream_meta_without_a_call(monkeypatch):
+    breaker = CircuitBreaker(window=2, min_calls=1, error_rate=0.5, open_s=60)
+    breaker.record(False)
+    monkeypatch.setattr(llm_module, "_breaker", breaker)
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    client = TestClient(app)
+    events = read_events(client.post("/api/v1/interpret/stream", json={"rows": sample_rows()}))
+    done = events[-1][1]
+    assert (done["llm"], done["attempts"], done["breaker"]) == ("none", 0, "open")
+
+
+def test_interpret_stream_fallback_skips_tests_the_model_covered(monkeypatch):
+    # The model answers with canonical names; the report said "Hb"
+    rows = sample_rows()
+    rows[0]["test_name"] = "Hb"
+    text = json.dumps(GOOD)
+    cut = text.index("]", text.index('"per_test"'))  # the stream ends inside per_test
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_breaker", None)
+    monkeypatch.setattr(llm_module, "_stream_openai_chat", fake_stream(text[:cut]))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    client = TestClient(app)
+    events = read_events(client.post("/api/v1/interpret/stream", json={"rows": rows}))
+    per_test = [data["test_name"] for e, data in events if e == "per_test"]
+    assert per_test == ["Hemoglobin", "LDL Cholesterol"]
+    assert events[-1][1]["llm"] == "openai" and events[-1][1]["attempts"] == 1
+
+
+def test_interpret_stream_deadline_bounds_a_trickling_upstream(monkeypatch):
+    # Every chunk arrives well inside the read timeout, the whole answer would not
+    breaker = CircuitBreaker(window=2, min_calls=1, error_rate=0.5, open_s=60)
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setenv("LLM_DEADLINE_S", "0.3")
+    monkeypatch.setattr(llm_module, "_breaker", breaker)
+    monkeypatch.setattr(llm_module, "_stream_openai_chat", slow_stream(json.dumps(GOOD), 0.05))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+    errors = LLM_CALLS.value("stream", "error")
+
+    client = TestClient(app)
+    events = read_events(client.post("/api/v1/interpret/stream", json={"rows": sample_rows()}))
+    done = events[-1][1]
+    assert done["ok"] is False and "disclaimer" in done["fallback_sections"]
+    assert done["duration_ms"] < 1500
+    assert [e for e, _ in events].count("disclaimer") == 1
+    assert LLM_CALLS.value("stream", "error") == errors + 1
+    assert breaker.snapshot()["calls"] == 1 and breaker.snapshot()["error_rate"] == 1.0
+
+
+def test_malformed_upstream_chunk_counts_against_the_provider(monkeypatch):
+    body = 'data: {"choices": [{"delta": {"content": "{\\"summary"}}]}\n\ndata: {not json\n\n'
+
+    def handler(request):
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    breaker = CircuitBreaker(window=2, min_calls=1, error_rate=0.5, open_s=60)
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_breaker", breaker)
+    monkeypatch.setattr(
+        llm_module,
+        "create_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+    errors = LLM_CALLS.value("stream", "error")
+
+    client = TestClient(app)
+    events = read_events(client.post("/api/v1/interpret/stream", json={"rows": sample_rows()}))
+    assert events[-1][1]["ok"] is False and events[0][0] == "summary"
+    assert LLM_CALLS.value("stream", "error") == errors + 1
+    assert breaker.snapshot()["error_rate"] == 1.0
+
+
+def test_interpret_stream_falls_back_when_no_flag_validates(monkeypatch):
+    answer = dict(GOOD, flags=[{"test_name": "LDL Cholesterol"}, {"severity": "high"}])
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_breaker", None)
+    monkeypatch.setattr(llm_module, "_stream_openai_chat", fake_stream(json.dumps(answer)))
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(16, 60)))
+
+    client = TestClient(app)
+    events = read_events(client.post("/api/v1/interpret/stream", json={"rows": sample_rows()}))
+    flags = [data for e, data in events if e == "flag"]
+    fallback = llm_module._fallback_interpretation(
+        [llm_module.ParsedRowIn(**r) for r in sample_rows()]
+    )
+    assert flags and flags == [f.model_dump() for f in fallback.flags]
+    assert events[-1][1]["fallback_sections"] == ["flags"]
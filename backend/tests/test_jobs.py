@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import jobs
+from app.services.jobs import JobStore, sealed_jobs_available
+from benchmarks.corpus import make_pdf
+
+TEXT = "Hemoglobin 13.2 g/dL 12.0-15.5\nGlucose 130 mg/dL 70-99 H\nnoise"
+
+# An on-disk store is always sealed, which needs the crypto extra
+sealed = pytest.mark.skipif(not sealed_jobs_available(), reason="cryptography missing")
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setenv("PARSE_WORKERS", "0")
+    monkeypatch.setattr(jobs, "_store", None)
+    monkeypatch.setattr(jobs, "_runner", None)
+    with TestClient(app) as c:
+        yield c
+
+
+def _wait(client, url, **params):
+    for _ in range(200):
+        job = client.get(url, params=params).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job did not finish: {job}")
+
+
+def test_analyze_job_parses_then_interprets(client):
+    resp = client.post("/api/v1/jobs", json={"text": TEXT})
+    assert resp.status_code == 202
+    url = resp.headers["Location"]
+    assert url == resp.json()["url"] == f"/api/v1/jobs/{resp.json()['id']}"
+
+    job = _wait(client, url)
+    assert job["status"] == "done" and job["stage"] == "interpret"
+    result = job["result"]
+    assert [r["test_name"] for r in result["parse"]["rows"]] == ["Hemoglobin", "Glucose"]
+    assert result["parse"]["unparsed_lines"] == ["noise"]
+    assert result["interpretation"]["disclaimer"]
+    assert result["meta"]["ok"] is False  # no API key: deterministic fallback
+
+    columnar = client.get(url, params={"format": "columnar"}).json()
+    assert columnar["result"]["parse"]["row_count"] == 2
+
+
+def test_parse_and_interpret_jobs(client):
+    resp = client.post("/api/v1/jobs?kind=parse", json={"text": TEXT})
+    parse = _wait(client, resp.headers["Location"])
+    assert "interpretation" not in parse["result"]
+
+    rows = [{"test_name": "Sodium", "value": 140, "unit": "mmol/L", "confidence": 0.8}]
+    resp = client.post("/api/v1/jobs?kind=interpret", json={"rows": rows})
+    job = _wait(client, resp.headers["Location"])
+    assert job["result"]["interpretation"]["per_test"][0]["test_name"] == "Sodium"
+
+    assert client.post("/api/v1/jobs?kind=interpret", json={"rows": []}).status_code == 400
+    assert client.post("/api/v1/jobs?kind=other", json={"text": TEXT}).status_code == 422
+
+
+def test_job_events_stream_until_done(client):
+    url = client.post("/api/v1/jobs?kind=parse", json={"text": TEXT}).headers["Location"]
+    body = client.get(f"{url}/events").text
+    events = [line[len("event: ") :] for line in body.splitlines() if line.startswith("event: ")]
+    assert events[-1] == "done"
+    done = json.loads(body.rsplit("data: ", 1)[1])
+    assert done["status"] == "done" and done["result"]["parse"]["rows"]
+
+
+def test_unknown_and_deleted_jobs(client):
+    assert client.get("/api/v1/jobs/nope").status_code == 404
+    url = client.post("/api/v1/jobs?kind=parse", json={"text": TEXT}).headers["Location"]
+    _wait(client, url)
+    assert client.delete(url).status_code == 204
+    assert client.get(url).status_code == 404
+    assert client.get("/api/v1/health/stats").json()["jobs"]["done"] == 0
+
+
+def test_pdf_job_reads_its_sealed_input(client, monkeypatch):
+    # Small chunks and spool threshold: the input is sealed in many chunks and reopened
+    # into a temporary file, as a large upload would be
+    monkeypatch.setattr(jobs, "CHUNK_BYTES", 256)
+    monkeypatch.setenv("UPLOAD_SPOOL_MAX_BYTES", "512")
+    pdf = make_pdf("Glucose 130 mg/dL 70-99 H\nSodium 140 mmol/L 135-145")
+    files = {"file": ("report.pdf", pdf, "application/pdf")}
+    job = _wait(client, client.post("/api/v1/jobs?kind=parse", files=files).headers["Location"])
+    assert [r["test_name"] for r in job["result"]["parse"]["rows"]] == ["Glucose", "Sodium"]
+    files_dir = jobs.get_job_store().files_dir
+    assert os.listdir(files_dir) == []  # dropped once the job finished
+
+
+@sealed
+def test_store_file_reveals_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "CHUNK_BYTES", 64)
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path, retention_s=60, max_attempts=3)
+    pdf = make_pdf("Glucose 130 mg/dL 70-99 H")
+    job_id = store.create("parse", "extract", {"text": TEXT, "sha256": "x", "size": len(pdf)}, pdf)
+    job = JobStore(path, retention_s=60, max_attempts=3).claim("extract", "w", lease_s=30)
+    assert job.id == job_id and job.payload["text"] == TEXT
+    with open(job.input_path, "rb") as f:
+        sealed_input = f.read()
+    assert b"Glucose" not in sealed_input and b"%PDF" not in sealed_input
+    assert store.open_input(job, len(pdf), "x").data == pdf
+    assert store.advance(job_id, "w", "interpret", {"parse": {"rows": ["Glucose"]}})
+    store.close()
+    with open(path, "rb") as f:
+        db = f.read()
+    for secret in (b"Glucose", b"Hemoglobin", job_id.encode()):
+        assert secret not in db
+
+
+@sealed
+def test_sealed_input_must_be_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "CHUNK_BYTES", 64)
+    store = JobStore(str(tmp_path / "jobs.db"), retention_s=60, max_attempts=3)
+    data = bytes(range(256)) * 2
+    job = store.get(store.create("parse", "extract", {}, data))
+    with open(job.input_path, "rb") as f:
+        sealed_input = f.read()
+    with open(job.input_path, "wb") as f:
+        f.write(sealed_input[: len(sealed_input) // 2])
+    with pytest.raises(Exception):
+        store.open_input(job, len(data), "x")
+
+
+def test_db_path_without_cryptography_stays_in_memory(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(jobs, "sealed_jobs_available", lambda: False)
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(jobs, "_store", None)
+    with caplog.at_level("WARNING", logger="reportrx.jobs"):
+        stats = jobs.job_stats()
+    assert stats["disk"] is False and stats["sealed"] is False
+    assert caplog.records[0].msg["event"] == "jobs_db_path_ignored"
+    assert not (tmp_path / "jobs.db").exists()
+    jobs.get_job_store().close()
+
+
+def test_failing_claim_does_not_stop_the_stage(client, monkeypatch, caplog):
+    monkeypatch.setenv("JOBS_POLL_S", "0.01")
+    store = jobs.get_job_store()
+    claim = store.claim
+    failed = []
+
+    def flaky(stage, *args):
+        # Once per extract worker (JOBS_EXTRACT_CONCURRENCY defaults to 2)
+        if stage == "extract" and len(failed) < 2:
+            failed.append(stage)
+            raise sqlite3.OperationalError("database is locked")
+        return claim(stage, *args)
+
+    monkeypatch.setattr(store, "claim", flaky)
+    jobs.get_job_runner().notify("extract")
+    with caplog.at_level("ERROR", logger="reportrx.jobs"):
+        url = client.post("/api/v1/jobs?kind=parse", json={"text": TEXT}).headers["Location"]
+        assert _wait(client, url)["status"] == "done"
+    assert caplog.records[0].msg == {
+        "event": "jobs_worker_error",
+        "stage": "extract",
+        "error": "OperationalError",
+    }
+
+
+def test_unreadable_job_is_failed_not_leased(caplog):
+    store = JobStore("", retention_s=60, max_attempts=3)
+    damaged = store.create("parse", "extract", {"text": TEXT}, b"%PDF")
+    job_id = store.create("parse", "extract", {"text": TEXT}, None)
+    input_path = store._conn.execute("SELECT input_path FROM jobs WHERE input_path IS NOT NULL")
+    input_path = input_path.fetchone()[0]
+    store._conn.execute(
+        "UPDATE jobs SET payload = 'damaged' WHERE id = ?", (jobs._row_id(damaged),)
+    )
+
+    with caplog.at_level("WARNING", logger="reportrx.jobs"):
+        assert store.claim("extract", "w", lease_s=30).id == job_id
+    row = store._conn.execute(
+        "SELECT status, owner, error, input_path FROM jobs WHERE id = ?", (jobs._row_id(damaged),)
+    ).fetchone()
+    assert row[:2] == ("failed", None) and json.loads(row[2])["status"] == 500
+    assert row[3] is None and not os.path.exists(input_path)
+    assert caplog.records[0].msg["event"] == "jobs_unreadable"
+    assert store.claim("extract", "w", lease_s=30) is None
+    store.close()
+
+
+@sealed
+def test_lapsed_lease_is_resumed_by_another_process(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    crashed = JobStore(path, retention_s=60, max_attempts=2)
+    job_id = crashed.create("parse", "extract", {"text": TEXT}, None)
+    assert crashed.claim("extract", "worker-a", lease_s=-1).attempts == 1
+
+    # A second process sharing the file picks the job up once the lease has lapsed
+    other = JobStore(path, retention_s=60, max_attempts=2)
+    job = other.claim("extract", "worker-b", lease_s=-1)
+    assert (job.id, job.attempts, job.payload) == (job_id, 2, {"text": TEXT})
+    # The first worker lost its lease and may no longer write the job
+    assert not crashed.finish(job_id, "worker-a", {"parse": {}})
+
+    # Out of attempts: the next claim fails it instead of running it again
+    assert other.claim("extract", "worker-c", lease_s=30) is None
+    failed = other.get(job_id)
+    assert failed.status == "failed" and failed.payload == {}
+
+
+@sealed
+def test_finished_jobs_expire_and_drop_their_input(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"), retention_s=0, max_attempts=3)
+    job_id = store.create("parse", "extract", {"text": TEXT}, b"%PDF")
+    input_path = store.claim("extract", "w", lease_s=30).input_path
+    assert store.finish(job_id, "w", {"parse": {}})
+    row = store._conn.execute("SELECT payload, input_path FROM jobs").fetchone()
+    assert row == ("{}", None) and not os.path.exists(input_path)
+    time.sleep(0.01)
+    assert store.get(job_id) is None
+    assert store.purge() == 1
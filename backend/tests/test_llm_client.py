@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import httpx
+
+from app.services import llm as llm_module
+
+
+def test_call_openai_chat_reuses_shared_client(monkeypatch):
+    created = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = {"choices": [{"message": {"content": json.dumps({"ok": True})}}]}
+        return httpx.Response(200, json=body)
+
+    def fake_client() -> httpx.AsyncClient:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        created.append(client)
+        return client
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "create_http_client", fake_client)
+
+    async def scenario():
+        await llm_module.start_http_client()
+        try:
+            for _ in range(3):
+                assert json.loads(await llm_module._call_openai_chat("hi", timeout_s=1.0))["ok"]
+            return llm_module.llm_pool_stats()
+        finally:
+            await llm_module.close_http_client()
+
+    before = llm_module.llm_pool_stats()["requests"]
+    stats = asyncio.run(scenario())
+    assert len(created) == 1
+    assert stats["requests"] - before == 3
+    assert stats["in_flight"] == 0
+    assert created[0].is_closed
+
+
+def test_llm_timeout_split(monkeypatch):
+    monkeypatch.setenv("LLM_CONNECT_TIMEOUT_S", "0.5")
+    monkeypatch.setenv("LLM_POOL_TIMEOUT_S", "0.25")
+    timeout = llm_module._llm_timeout(3.0)
+    assert (timeout.connect, timeout.read, timeout.pool) == (0.5, 3.0, 0.25)
+
+
+def test_stream_openai_chat_yields_deltas(monkeypatch):
+    chunks = ['{"summ', 'ary": "ok"}']
+    body = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': c}}]})}\n\n" for c in chunks
+    )
+    body += "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(
+        llm_module,
+        "create_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def scenario():
+        try:
+            return [d async for d in llm_module._stream_openai_chat("hi", timeout_s=1.0)]
+        finally:
+            await llm_module.close_http_client()
+
+    assert asyncio.run(scenario()) == chunks
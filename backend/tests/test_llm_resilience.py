@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from test_interpret import sample_rows
+from test_interpret_cache import GOOD
+
+from app.services import llm as llm_module
+from app.services.cache import TieredCache, TTLCache
+from app.services.llm import ParsedRowIn, interpret_rows
+from app.services.resilience import CircuitBreaker, LatencyTracker, retry_after_s
+
+
+@pytest.fixture
+def fresh_llm_state(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(0, 60)))
+    monkeypatch.setattr(llm_module, "_breaker", None)
+    monkeypatch.setattr(llm_module, "_latency", LatencyTracker())
+
+
+def http_error(status, headers=None):
+    request = httpx.Request("POST", "https://llm.test/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("upstream", request=request, response=response)
+
+
+def run(rows=None):
+    rows = rows or [ParsedRowIn(**r) for r in sample_rows()]
+    return asyncio.run(interpret_rows(rows))
+
+
+def test_breaker_opens_and_short_circuits(monkeypatch, fresh_llm_state):
+    calls = []
+
+    async def failing_call(prompt, timeout_s):
+        calls.append(prompt)
+        raise httpx.ConnectError("down")
+
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "2")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", failing_call)
+    run()
+    run()
+    _, meta = run()
+    assert len(calls) == 2
+    assert meta["breaker"] == "open" and meta["ok"] is False and meta["attempts"] == 0
+
+
+def test_hedged_request_wins_when_primary_is_slow(monkeypatch, fresh_llm_state):
+    calls = []
+
+    async def call(prompt, timeout_s):
+        calls.append(prompt)
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return json.dumps(GOOD)
+
+    monkeypatch.setenv("LLM_HEDGE_MAX_DELAY_S", "0.05")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", call)
+    started = time.perf_counter()
+    _, meta = run()
+    assert time.perf_counter() - started < 0.5
+    assert meta["ok"] and meta["hedged"]
+    assert {t["kind"]: t["outcome"] for t in meta["attempt_timings"]} == {
+        "primary": "cancelled",
+        "hedge": "ok",
+    }
+
+
+def test_429_retry_after_is_honoured(monkeypatch, fresh_llm_state):
+    calls = []
+
+    async def call(prompt, timeout_s):
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise http_error(429, {"Retry-After": "0"})
+        return json.dumps(GOOD)
+
+    monkeypatch.setattr(llm_module, "_call_openai_chat", call)
+    _, meta = run()
+    assert meta["ok"] and meta["attempts"] == 2
+    assert [t["outcome"] for t in meta["attempt_timings"]] == ["429", "ok"]
+
+
+def test_deadline_bounds_latency(monkeypatch, fresh_llm_state):
+    async def hanging_call(prompt, timeout_s):
+        await asyncio.sleep(5)
+
+    monkeypatch.setenv("LLM_DEADLINE_S", "0.1")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", hanging_call)
+    started = time.perf_counter()
+    result, meta = run()
+    assert time.perf_counter() - started < 1.0
+    assert meta["ok"] is False
+    assert result.next_steps[0].startswith("Please schedule a visit with your doctor")
+
+
+def test_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(window=4, min_calls=2, error_rate=0.5, open_s=0.0)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert breaker.allow() and breaker.state == "half_open"
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+def test_retry_after_parsing():
+    assert retry_after_s(http_error(429, {"Retry-After": "3"})) == 3.0
+    assert retry_after_s(http_error(429)) is None
+    assert retry_after_s(ValueError()) is None
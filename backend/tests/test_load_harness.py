@@ -0,0 +1,83 @@
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.llm import InterpretationOut
+from benchmarks.load_driver import build_requests, parse_mix, run_load
+from benchmarks.mock_llm import MockConfig, create_app, parse_latency
+
+
+def _chat(prompt: str, stream: bool = False):
+    return {"messages": [{"role": "user", "content": prompt}], "stream": stream}
+
+
+def test_mock_answers_valid_interpretations():
+    client = TestClient(create_app(MockConfig(latency="fixed:0")))
+    rows = [{"test_name": "Glucose"}, {"test_name": "Sodium"}]
+    resp = client.post("/v1/chat/completions", json=_chat("ROWS:\n" + json.dumps(rows)))
+    assert resp.status_code == 200
+    content = resp.json()["choices"][0]["message"]["content"]
+    parsed = InterpretationOut.model_validate_json(content)
+    assert [t.test_name for t in parsed.per_test] == ["Glucose", "Sodium"]
+    assert resp.json()["usage"]["prompt_tokens"] > 0
+
+    reports = [{"id": 0, "rows": rows}, {"id": 1, "rows": rows[:1]}]
+    resp = client.post("/v1/chat/completions", json=_chat("REPORTS:\n" + json.dumps(reports)))
+    results = json.loads(resp.json()["choices"][0]["message"]["content"])["results"]
+    assert [r["id"] for r in results] == [0, 1]
+
+
+def test_mock_injects_errors_malformed_json_and_streams():
+    errors = TestClient(create_app(MockConfig(latency="fixed:0", error_429=1.0)))
+    resp = errors.post("/v1/chat/completions", json=_chat("ROWS:\n[]"))
+    assert resp.status_code == 429 and resp.headers["Retry-After"]
+
+    broken = TestClient(create_app(MockConfig(latency="fixed:0", malformed=1.0)))
+    content = broken.post("/v1/chat/completions", json=_chat("ROWS:\n[]")).json()
+    with pytest.raises(ValueError):
+        json.loads(content["choices"][0]["message"]["content"])
+    assert broken.get("/stats").json() == {"malformed": 1}
+
+    streaming = TestClient(create_app(MockConfig(latency="fixed:0")))
+    resp = streaming.post("/v1/chat/completions", json=_chat("ROWS:\n[]", stream=True))
+    deltas = [
+        json.loads(line[len("data: ") :])["choices"][0]["delta"]["content"]
+        for line in resp.text.splitlines()
+        if line.startswith("data: {")
+    ]
+    assert resp.text.rstrip().endswith("data: [DONE]")
+    InterpretationOut.model_validate_json("".join(deltas))
+
+
+def test_latency_specs():
+    rng = random.Random(0)
+    assert parse_latency("fixed:250")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:100:200")(rng) <= 0.2
+    assert parse_latency("bimodal:100:900:1")(rng) == 0.9
+    with pytest.raises(ValueError):
+        parse_latency("normal:1")
+
+
+def test_load_driver_reports_per_kind(monkeypatch):
+    # No API key: interpretations take the fallback, which the report must count
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    mix = parse_mix("parse=1,interpret=1")
+    assert mix == {"parse": 0.5, "interpret": 0.5}
+    requests = build_requests(12, mix, seed=3)
+    assert requests == build_requests(12, mix, seed=3)
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            return await run_load(client, requests, rps=200)
+
+    report = asyncio.run(go())
+    assert report["requests"] == report["ok"] == 12
+    assert report["kinds"]["interpret"]["fallback_rate"] == 1.0
+    assert "fallback_rate" not in report["kinds"]["parse"]
+    assert report["loop_lag_ms"]["p99"] is not None
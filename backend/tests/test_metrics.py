@@ -0,0 +1,92 @@
+import re
+
+from fastapi.testclient import TestClient
+from test_interpret import sample_rows
+
+from app.main import app
+from app.services import llm as llm_module
+from app.services.metrics import (
+    HTTP_REQUESTS,
+    LLM_CALLS,
+    LLM_FALLBACKS,
+    LLM_REPAIRS,
+    LLM_TOKENS,
+    STAGE_LATENCY,
+    Counter,
+    Histogram,
+    Registry,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = registry.register(Histogram("t_seconds", "Test.", ("stage",), buckets=(0.1, 1.0)))
+    counter = registry.register(Counter("t_total", "Test.", ("route",)))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, "parse")
+    counter.inc('a"b')
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="parse",le="1"} 3' in text
+    assert 't_seconds_bucket{stage="parse",le="+Inf"} 4' in text
+    assert 't_seconds_count{stage="parse"} 4' in text
+    assert 't_total{route="a\\"b"} 1' in text
+
+
+def test_requests_are_labelled_by_route_template():
+    client = TestClient(app)
+    before = HTTP_REQUESTS.value("GET", "/api/v1/health", "200")
+    client.get("/api/v1/health")
+    client.get("/api/v1/no-such-page-123")
+    assert HTTP_REQUESTS.value("GET", "/api/v1/health", "200") == before + 1
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/api/v1/health"' in resp.text
+    assert 'route="unmatched"' in resp.text
+    # Raw paths never become label values
+    assert "no-such-page-123" not in resp.text
+    assert re.search(
+        r'^reportrx_cache_lookups_total\{cache="parse",result="miss"\} \d+$', resp.text, re.M
+    )
+
+
+def test_parse_records_stage_latency():
+    client = TestClient(app)
+    before = STAGE_LATENCY.count("parse_text")
+    resp = client.post("/api/v1/parse", json={"text": "Glucose 130 mg/dL 70-99"})
+    assert resp.status_code == 200
+    assert STAGE_LATENCY.count("parse_text") == before + 1
+
+
+def test_llm_repair_fallback_and_tokens_are_counted(monkeypatch):
+    calls = {"n": 0}
+
+    async def bad_call(prompt: str, timeout_s: float) -> str:  # type: ignore
+        calls["n"] += 1
+        llm_module._count_tokens({"prompt_tokens": 100, "completion_tokens": 7})
+        return "not-json"
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", bad_call)
+    before = {
+        "repairs": LLM_REPAIRS.value(),
+        "fallbacks": LLM_FALLBACKS.value(),
+        "primary": LLM_CALLS.value("primary", "ok"),
+        "repair": LLM_CALLS.value("repair", "ok"),
+        "tokens": LLM_TOKENS.value("prompt"),
+        "repair_latency": STAGE_LATENCY.count("llm_repair"),
+    }
+    rows = sample_rows()
+    rows[0]["test_name"] = "Metrics Hemoglobin"  # miss the interpretation cache
+    resp = TestClient(app).post("/api/v1/interpret", json={"rows": rows})
+    assert resp.status_code == 200
+    assert calls["n"] == 2
+    assert LLM_REPAIRS.value() == before["repairs"] + 1
+    assert LLM_FALLBACKS.value() == before["fallbacks"] + 1
+    assert LLM_CALLS.value("primary", "ok") == before["primary"] + 1
+    assert LLM_CALLS.value("repair", "ok") == before["repair"] + 1
+    assert LLM_TOKENS.value("prompt") == before["tokens"] + 200
+    assert STAGE_LATENCY.count("llm_repair") == before["repair_latency"] + 1
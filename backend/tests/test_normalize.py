@@ -0,0 +1,75 @@
+import pytest
+
+from app.services import llm
+from app.services.normalize import (
+    TEST_INDEX,
+    canonical_test,
+    canonical_unit,
+    display_name,
+    to_canonical,
+)
+from app.services.parser import parse_text
+
+
+def test_test_name_aliases():
+    for name in ("HGB", "Haemoglobin", "hemoglobin", "Hemoglobin (Hb)", "Hb"):
+        assert canonical_test(name) == "HGB"
+    assert canonical_test("25(OH)D") == canonical_test("Vitamin D 25-OH") == "VITD"
+    assert canonical_test("Unobtainium") is None
+    assert display_name("LDL") == "LDL cholesterol"
+
+
+def test_distinct_analytes_do_not_collapse():
+    # Urea is BUN × 2.14 and a clearance is not an eGFR: each keeps its own code or unit
+    assert canonical_test("Urea") == "UREA" and canonical_test("Blood urea nitrogen") == "BUN"
+    assert to_canonical("UREA", 5.0, "mmol/L") == (5.0, "mmol/L")
+    assert to_canonical("UREA", 5.0, "mg/dL") != to_canonical("BUN", 5.0, "mg/dL")
+    assert canonical_unit("mL/min") == "mL/min"
+    assert canonical_unit("mL/min/1.73m2") == "mL/min/1.73m2"
+    assert to_canonical("EGFR", 90.0, "mL/min") is None
+    # Bare stray tokens are not test names
+    assert canonical_test("K") is None and canonical_test("Cr") is None
+    assert canonical_test("Potassium") == "K" and canonical_test("Creatinine (Cr)") == "CREAT"
+
+
+def test_unit_spellings():
+    assert canonical_unit("mg/dl") == canonical_unit("MG/DL") == "mg/dL"
+    assert canonical_unit("K/µL") == canonical_unit("x10^9/L") == "10^9/L"
+    assert canonical_unit("µmol/L") == canonical_unit("μmol/L") == "umol/L"
+    assert canonical_unit(None) is None
+    assert canonical_unit("furlongs") is None
+    assert canonical_unit("mg / dL") == "mg/dL"
+
+
+def test_units_a_magnitude_apart_stay_distinct():
+    assert canonical_unit("mIU/mL") == "mIU/mL" != canonical_unit("mIU/L")
+    assert canonical_unit("uIU/mL") == canonical_unit("mIU/L") == "mIU/L"
+    assert canonical_unit("U/L") == "U/L" and canonical_unit("uL") is None
+
+
+def test_conversion_to_canonical_unit():
+    value, unit = to_canonical("GLU", 5.5, "mmol/L")
+    assert unit == "mg/dL" and value == pytest.approx(99.09, abs=0.01)
+    assert to_canonical("HGB", 13.2, "g/dL") == (13.2, "g/dL")
+    assert to_canonical("HGB", 1.0, "U/L") is None
+    assert to_canonical(None, 1.0, "mg/dL") is None
+
+
+def test_index_is_read_only():
+    with pytest.raises(TypeError):
+        TEST_INDEX["hgb"] = "GLU"
+
+
+def test_parsed_rows_carry_canonical_fields():
+    rows, _ = parse_text("Haemoglobin 13.2 g/dL 12.0-15.5\nMystery marker 4 zz 1-5")
+    assert (rows[0].test_code, rows[0].unit_canonical) == ("HGB", "g/dL")
+    assert (rows[1].test_code, rows[1].unit_canonical) == (None, None)
+
+
+def test_synonyms_share_prompt_and_cache_key():
+    def key(name, unit):
+        row = llm.ParsedRowIn(test_name=name, value=13.2, unit=unit, confidence=0.8)
+        return llm._cache_key(llm._trim_rows([row]))
+
+    assert key("HGB", "g/dl") == key("Haemoglobin", "g/dL") == key("Hemoglobin (Hb)", "gm/dl")
+    assert key("HGB", "g/dL") != key("Glucose", "g/dL")
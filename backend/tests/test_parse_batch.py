@@ -0,0 +1,69 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from test_parser_pdf import make_pdf_bytes
+
+from app.main import app
+from app.services import workers
+from app.services.workers import WorkerPool
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    pool = WorkerPool("parse", workers=0, queue_size=4, timeout_s=10)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_parse_batch_pdfs_with_per_document_errors(thread_pool):
+    client = TestClient(app)
+    files = [
+        ("files", ("a.pdf", make_pdf_bytes("Glucose 100 mg/dL 70-99"), "application/pdf")),
+        ("files", ("a.pdf", make_pdf_bytes("LDL 210 mg/dL 0-200"), "application/pdf")),
+        ("files", ("broken.pdf", io.BytesIO(b"not a pdf"), "application/pdf")),
+        ("files", ("notes.txt", io.BytesIO(b"hello"), "text/plain")),
+    ]
+    resp = client.post("/api/v1/parse/batch", files=files)
+    assert resp.status_code == 200
+    body = resp.json()
+    results = body["results"]
+    assert list(results) == ["a.pdf", "a.pdf#2", "broken.pdf", "notes.txt"]
+    assert results["a.pdf"]["rows"][0]["test_name"] == "Glucose"
+    assert results["a.pdf#2"]["rows"][0]["flag"] == "high"
+    assert results["broken.pdf"]["status"] == 400
+    assert results["notes.txt"]["status"] == 400
+    assert body["meta"]["documents"] == 4 and body["meta"]["failed"] == 2
+    assert thread_pool.stats()["submitted"] == 3
+
+
+def test_parse_batch_texts_and_size_limit(thread_pool, monkeypatch):
+    monkeypatch.setenv("PARSE_BATCH_MAX_DOC_BYTES", "40")
+    client = TestClient(app)
+    payload = {
+        "texts": [
+            "Hemoglobin 13.2 g/dL 12.0-15.5",
+            {"id": "ldl", "text": "LDL 210 mg/dL ≤ 200"},
+            "Sodium 140 mmol/L 135-145\n" * 5,
+        ]
+    }
+    resp = client.post("/api/v1/parse/batch", json=payload)
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert results["0"]["rows"][0]["value"] == 13.2
+    assert results["ldl"]["rows"][0]["test_name"] == "LDL"
+    assert results["2"]["status"] == 413
+
+    # A bare array works too
+    resp = client.post("/api/v1/parse/batch", json=["Glucose 100 mg/dL 70-99"])
+    assert resp.json()["results"]["0"]["rows"][0]["flag"] == "high"
+
+
+def test_parse_batch_rejects_too_many_documents(thread_pool, monkeypatch):
+    monkeypatch.setenv("PARSE_BATCH_MAX_DOCS", "2")
+    client = TestClient(app)
+    resp = client.post("/api/v1/parse/batch", json=["a", "b", "c"])
+    assert resp.status_code == 413
+    resp = client.post("/api/v1/parse/batch", json={"texts": "nope"})
+    assert resp.status_code == 400
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers.parse import ROW_FIELDS
+from app.services import bulk
+from app.services.bulk import BulkInputError, flag_columns
+from app.services.parser import parse_text
+from benchmarks.bulk_ingest import per_row_columns
+from benchmarks.corpus import make_feed
+
+ENGINES = [
+    "python",
+    pytest.param(
+        "numpy", marks=pytest.mark.skipif(not bulk.numpy_available(), reason="numpy missing")
+    ),
+]
+
+COLUMNS = {
+    "test_name": ["Hemoglobin", "Glucose", "HIV Ab", "", "LDL", "TSH", "ALT"],
+    "value": [13.2, "130", "Positive", 5, None, 5.2, "12"],
+    "unit": ["g/dL", "mg/dL", None, "x", "mg/dL", "mIU/L", "U/L"],
+    "low": [12.0, 70, None, None, None, None, 7],
+    "high": [15.5, 99, None, None, 100, None, None],
+    "le": [None, None, None, None, None, 4.5, None],
+    "ge": [None, None, None, None, None, None, None],
+}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_match_per_row_flagging(engine):
+    columns = make_feed(3000, seed=3)
+    assert flag_columns(columns, engine) == per_row_columns(columns)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_rows_match_the_text_parser(engine):
+    rows, _ = parse_text("Hemoglobin 13.2 g/dL 12.0-15.5\nGlucose 130 mg/dL 70-99 H")
+    out, rejected = flag_columns(COLUMNS, engine)
+    assert rejected == [3, 4]  # no name; no value
+    assert [dict(zip(ROW_FIELDS, v)) for v in zip(*(out[f] for f in ROW_FIELDS))][:2] == [
+        {f: getattr(r, f) for f in ROW_FIELDS} for r in rows
+    ]
+    assert out["flag"] == ["normal", "high", "abnormal", "high", "normal"]
+    assert out["reference_range"] == ["12.0-15.5", "70.0-99.0", None, "≤ 4.5", "≥ 7.0"]
+    assert out["confidence"] == [1.0, 1.0, 0.6, 1.0, 1.0]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_unreadable_bounds_reject_the_row(engine):
+    columns = {"test_name": ["Sodium", "Sodium"], "value": [140, 150], "high": ["", "n/a"]}
+    out, rejected = flag_columns(columns, engine)
+    assert rejected == [1] and out["flag"] == [None] and out["test_code"] == ["NA"]
+    with pytest.raises(BulkInputError):
+        flag_columns({"test_name": ["Sodium"], "value": [1, 2]}, engine)
+
+
+def test_bulk_endpoint_json_csv_and_ndjson():
+    client = TestClient(app)
+    resp = client.post("/api/v1/parse/bulk", json={"columns": COLUMNS})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["rows"][1]["flag"] == "high" and body["rows"][1]["test_code"] == "GLU"
+    assert body["unparsed_lines"] == []
+    assert body["meta"]["results"] == 7 and body["meta"]["rejected_rows"] == [3, 4]
+
+    csv_body = "test_name,value,unit,low,high\nGlucose,130,mg/dL,70,99\nHIV Ab,Negative,,,\n"
+    resp = client.post(
+        "/api/v1/parse/bulk?format=columnar",
+        content=csv_body,
+        headers={"content-type": "text/csv"},
+    )
+    assert resp.json()["columns"]["flag"] == ["high", "normal"]
+    assert resp.json()["row_count"] == 2
+
+    lines = [{"test_name": "Sodium", "value": 150, "unit": "mmol/L", "low": 135, "high": 145}]
+    resp = client.post(
+        "/api/v1/parse/bulk",
+        content="\n".join(json.dumps(r) for r in lines),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.json()["rows"][0]["flag"] == "high"
+
+
+def test_bulk_endpoint_rejects_bad_input(monkeypatch):
+    client = TestClient(app)
+    assert client.post("/api/v1/parse/bulk", json={"text": "x"}).status_code == 400
+    bad = {"columns": {"test_name": ["A"], "value": [1, 2]}}
+    assert client.post("/api/v1/parse/bulk", json=bad).status_code == 400
+    ragged = "test_name,value\nA,1,extra\n"
+    headers = {"content-type": "text/csv"}
+    assert client.post("/api/v1/parse/bulk", content=ragged, headers=headers).status_code == 400
+    monkeypatch.setenv("BULK_MAX_ROWS", "2")
+    assert client.post("/api/v1/parse/bulk", json={"columns": COLUMNS}).status_code == 413
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from test_parse_stream import make_multipage_pdf
+
+from app.main import app
+from app.services import cache as cache_module
+from app.services import parse_cache, parser, workers
+from app.services.parse_cache import get_parse_cache, parse_cache_stats, text_cache_key
+from app.services.workers import WorkerPool
+
+TEXT = "Hemoglobin 13.2 g/dL 12.0-15.5\nGlucose 130 mg/dL 70-99"
+
+
+def test_repeat_text_parse_is_served_from_cache():
+    client = TestClient(app)
+    first = client.post("/api/v1/parse", json={"text": TEXT})
+    second = client.post("/api/v1/parse", json={"text": TEXT})
+    assert first.headers["x-parse-cache"] == "miss"
+    assert second.headers["x-parse-cache"] == "hit"
+    assert first.json() == second.json()
+    stats = parse_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["bytes_saved"] == len(TEXT.encode("utf-8"))
+
+
+def test_repeat_pdf_upload_skips_extraction(monkeypatch):
+    pool = WorkerPool("parse", workers=0, queue_size=4, timeout_s=10)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    client = TestClient(app)
+    data = make_multipage_pdf(TEXT.splitlines())
+    for _ in range(3):
+        resp = client.post("/api/v1/parse", files={"file": ("r.pdf", data, "application/pdf")})
+        assert [r["test_name"] for r in resp.json()["rows"]] == ["Hemoglobin", "Glucose"]
+    assert pool.stats()["submitted"] == 1
+    assert parse_cache_stats()["bytes_saved"] == 2 * len(data)
+    pool.shutdown()
+
+
+def test_key_covers_parser_version(monkeypatch):
+    key, _ = text_cache_key(TEXT)
+    monkeypatch.setattr(parse_cache, "PARSER_VERSION", parser.PARSER_VERSION + "-next")
+    assert text_cache_key(TEXT)[0] != key
+
+
+def test_disk_tier_is_sealed(tmp_path, monkeypatch):
+    pytest.importorskip("cryptography")
+    path = tmp_path / "parse.db"
+    monkeypatch.setenv("PARSE_CACHE_PATH", str(path))
+    cache = get_parse_cache()
+    key, _ = text_cache_key(TEXT)
+    value = {"rows": [{"test_name": "Hemoglobin", "value": 13.2}], "unparsed_lines": []}
+    asyncio.run(cache.set(key, value))
+
+    conn = sqlite3.connect(path)
+    stored = conn.execute("SELECT key, value FROM cache").fetchall()
+    conn.close()
+    assert len(stored) == 1
+    assert key not in stored[0][0] and "Hemoglobin" not in stored[0][1]
+
+    cache.memory._data.clear()
+    assert asyncio.run(cache.get(key)) == value
+
+
+def test_disk_tier_needs_cryptography(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(cache_module, "sealed_cache_available", lambda: False)
+    monkeypatch.setenv("PARSE_CACHE_PATH", str(tmp_path / "parse.db"))
+    with caplog.at_level("WARNING", logger="reportrx.cache"):
+        with TestClient(app) as client:  # the lifespan opens the caches
+            stats = client.get("/api/v1/health/stats").json()["parse_cache"]
+    assert stats["disk"] is False and stats["disk_ignored"] is True
+    ignored = [r.msg for r in caplog.records if isinstance(r.msg, dict)]
+    assert [(e["event"], e["setting"]) for e in ignored] == [
+        ("cache_path_ignored", "PARSE_CACHE_PATH")
+    ]
+    assert not (tmp_path / "parse.db").exists()
@@ -0,0 +1,53 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import fastjson
+from app.services.parser import ParsedRow, parse_text
+
+TEXT = "Hemoglobin 13.2 g/dL 12.0-15.5\nGlucose 130 mg/dL 70-99 H\nHIV Ab: Negative\nnoise"
+
+
+def test_parsed_row_has_slots():
+    row = parse_text(TEXT)[0][0]
+    assert isinstance(row, ParsedRow)
+    assert not hasattr(row, "__dict__")
+
+
+def test_columnar_matches_rows():
+    client = TestClient(app)
+    rows = client.post("/api/v1/parse", json={"text": TEXT}).json()
+    resp = client.post("/api/v1/parse?format=columnar", json={"text": TEXT})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    # Second request is a cache hit: both shapes come from the same stored result
+    assert resp.headers["X-Parse-Cache"] == "hit"
+    col = resp.json()
+    assert col["row_count"] == len(rows["rows"]) == 3
+    rebuilt = [dict(zip(col["columns"], values)) for values in zip(*col["columns"].values())]
+    assert rebuilt == rows["rows"]
+    assert col["unparsed_lines"] == rows["unparsed_lines"] == ["noise"]
+    assert client.post("/api/v1/parse?format=csv", json={"text": TEXT}).status_code == 422
+
+
+def test_empty_report_columnar():
+    resp = TestClient(app).post("/api/v1/parse?format=columnar", json={"text": "nothing here"})
+    assert resp.json()["row_count"] == 0
+    assert resp.json()["columns"]["test_name"] == []
+
+
+def test_batch_columnar():
+    resp = TestClient(app).post(
+        "/api/v1/parse/batch?format=columnar", json=[TEXT, "Sodium 140 mmol/L 135-145"]
+    )
+    results = resp.json()["results"]
+    assert results["0"]["row_count"] == 3
+    assert results["1"]["columns"]["test_name"] == ["Sodium"]
+
+
+def test_fast_json_fallback_matches(monkeypatch):
+    payload = {"rows": [{"test_name": "Glucose ≥", "value": 1.5, "unit": None}], "n": [1, 2]}
+    fast = fastjson.dumps(payload)
+    monkeypatch.setattr(fastjson, "_orjson", None)
+    assert json.loads(fastjson.dumps(payload)) == json.loads(fast) == payload
@@ -0,0 +1,97 @@
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+from test_parse_stream import make_multipage_pdf
+
+from app.main import app
+from app.services import workers
+from app.services.pdf import PageOptions, parse_page_ranges, parse_pdf, select_pages
+from app.services.workers import WorkerPool
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    pool = WorkerPool("parse", workers=0, queue_size=4, timeout_s=10)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def make_table_pdf() -> bytes:
+    # Each column is drawn separately, the way lab systems lay out result tables
+    doc = fitz.open()
+    page = doc.new_page()
+    table = (
+        (72, ("Hemoglobin", "13.2", "g/dL", "12.0-15.5")),
+        (90, ("Glucose", "130", "mg/dL", "70-99")),
+    )
+    for y, cells in table:
+        for x, cell in zip((72, 200, 260, 330), cells):
+            page.insert_text((x, y), cell)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_page_ranges_and_selection():
+    assert parse_page_ranges("1-3, 5,8-") == ((1, 3), (5, 5), (8, None))
+    for bad in ("0", "3-1", "a", "1,,2"):
+        with pytest.raises(ValueError):
+            parse_page_ranges(bad)
+    opts = PageOptions(pages=((2, 3), (9, None)), max_pages=3)
+    assert select_pages(10, opts) == [1, 2, 8]
+    assert select_pages(2, PageOptions(pages=((5, None),))) == []
+
+
+def test_words_mode_keeps_table_rows_together():
+    data = make_table_pdf()
+    rows, unparsed, _ = parse_pdf(data)
+    assert rows == [] and "Hemoglobin" in unparsed
+
+    rows, unparsed, meta = parse_pdf(data, options=PageOptions(mode="words"))
+    assert [(r.test_name, r.value, r.unit, r.flag) for r in rows] == [
+        ("Hemoglobin", 13.2, "g/dL", "normal"),
+        ("Glucose", 130.0, "mg/dL", "high"),
+    ]
+    assert unparsed == [] and meta["mode"] == "words"
+    assert parse_pdf(data, options=PageOptions(mode="blocks"))[0] == rows
+
+
+def test_prefilter_skips_pages_without_values():
+    data = make_multipage_pdf(["Glucose 130 mg/dL 70-99", "Terms and conditions apply"])
+    doc = fitz.open(stream=data, filetype="pdf")
+    doc.new_page()  # no text layer at all
+    data = doc.tobytes()
+    doc.close()
+
+    rows, unparsed, meta = parse_pdf(data, options=PageOptions(prefilter=True))
+    assert [r.test_name for r in rows] == ["Glucose"] and unparsed == []
+    skipped = {t["page"]: t.get("skipped") for t in meta["page_timings"]}
+    assert skipped == {1: None, 2: "no_values", 3: "no_text_layer"}
+    assert meta["pages"] == 3 and meta["pages_read"] == 1
+    assert all(t["ms"] >= 0 and "parse_ms" in t for t in meta["page_timings"])
+
+
+def test_parse_endpoint_page_selection(thread_pool, monkeypatch):
+    monkeypatch.setenv("PARSE_MAX_PAGES", "1")
+    client = TestClient(app)
+    data = make_multipage_pdf(["Hemoglobin 13.2 g/dL 12.0-15.5", "Glucose 130 mg/dL 70-99"])
+    files = {"file": ("r.pdf", data, "application/pdf")}
+
+    resp = client.post("/api/v1/parse", files=files)
+    assert resp.status_code == 413
+
+    resp = client.post("/api/v1/parse?pages=2", files=files)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["test_name"] for r in body["rows"]] == ["Glucose"]
+    assert [t["page"] for t in body["meta"]["page_timings"]] == [2]
+
+    resp = client.post("/api/v1/parse?max_pages=1", files=files)
+    assert [r["test_name"] for r in resp.json()["rows"]] == ["Hemoglobin"]
+
+    resp = client.post("/api/v1/parse/stream?pages=2", files=files)
+    frames = resp.text.splitlines()
+    assert '"page": 2' in frames[0] and '"page_timings"' in frames[-1]
+
+    assert client.post("/api/v1/parse?pages=x", files=files).status_code == 400
@@ -0,0 +1,103 @@
+import asyncio
+import io
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+from test_parser_pdf import make_pdf_bytes
+
+from app.main import app
+from app.services import workers
+from app.services.workers import PoolSaturatedError, WorkerPool
+
+
+def test_parse_pdf_saturated_returns_503(monkeypatch):
+    pool = WorkerPool("parse", workers=1, queue_size=0, timeout_s=5)
+    pool._pending = pool.max_pending  # simulate a full queue
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+
+    client = TestClient(app)
+    pdf_bytes = make_pdf_bytes("Glucose 100 mg/dL 70-99")
+    files = {"file": ("sample.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    resp = client.post("/api/v1/parse", files=files)
+    assert resp.status_code == 503
+    assert int(resp.headers["retry-after"]) >= 1
+    assert pool.stats()["rejected"] == 1
+
+
+def test_worker_pool_bounds_and_timeout():
+    pool = WorkerPool("test", workers=0, queue_size=0, timeout_s=0.05)
+
+    async def scenario():
+        first = asyncio.create_task(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(time.sleep, 0)
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats["rejected"] == 1 and stats["timed_out"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("workers_n", [0, 1])
+def test_timed_out_job_frees_its_worker(workers_n):
+    # A hung job must not keep its worker (or its slot): the next job still runs
+    pool = WorkerPool("test", workers=workers_n, queue_size=0, timeout_s=3)
+
+    async def scenario():
+        await pool.run(abs, -1)  # start the worker before timing anything
+        pool.timeout_s = 0.2
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 1)
+        pool.timeout_s = 3
+        return await pool.run(abs, -2)
+
+    assert asyncio.run(scenario()) == 2
+    stats = pool.stats()
+    assert stats["timed_out"] == 1 and stats["pending"] == 0 and stats["completed"] == 2
+    pool.shutdown()
+
+
+def test_broken_jobs_spare_the_fresh_executor():
+    # When a hung job's worker is killed, the jobs beside it fail with BrokenProcessPool;
+    # they must not shut down the executor that later jobs have already started on
+    pool = WorkerPool("test", workers=1, queue_size=4, timeout_s=10)
+
+    async def scenario():
+        await pool.run(abs, -1)
+        beside = asyncio.create_task(pool.run(time.sleep, 1))
+        await asyncio.sleep(0.1)
+        pool._recycle(pool._executor)  # what a timeout beside it does
+        later = [asyncio.create_task(pool.run(abs, -i)) for i in (2, 3, 4)]
+        return await asyncio.gather(beside, *later, return_exceptions=True)
+
+    beside, *later = asyncio.run(scenario())
+    assert isinstance(beside, BrokenProcessPool) and later == [2, 3, 4]
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
+
+
+def test_timeout_beside_queued_jobs_fails_them_as_broken():
+    pool = WorkerPool("test", workers=1, queue_size=3, timeout_s=3)
+
+    async def scenario():
+        await pool.run(abs, -1)
+        pool.timeout_s = 0.3
+        hung = asyncio.create_task(pool.run(time.sleep, 2))
+        await asyncio.sleep(0.05)
+        queued = [asyncio.create_task(pool.run(abs, -i)) for i in (2, 3, 4)]
+        with pytest.raises(asyncio.TimeoutError):
+            await hung
+        pool.timeout_s = 10
+        behind = await asyncio.gather(*queued, return_exceptions=True)
+        return behind, await pool.run(abs, -5)
+
+    behind, after = asyncio.run(scenario())
+    # 503-able errors, not a CancelledError the routers never map
+    assert [type(e) for e in behind] == [BrokenProcessPool] * 3
+    assert after == 5 and pool.stats()["pending"] == 0
+    pool.shutdown()
@@ -0,0 +1,87 @@
+import io
+import json
+import time
+
+import fitz  # PyMuPDF
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import parse
+from app.services import workers
+from app.services.parser import iter_parse_lines, parse_text
+from app.services.pdf import parse_pdf_pages
+from app.services.workers import WorkerPool
+
+TEXT = "Patient: Jane\nHemoglobin 13.2 g/dL 12.0-15.5\nsee comments\nCOVID-19 PCR: Positive"
+
+
+def make_multipage_pdf(pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_iter_parse_lines_matches_parse_text():
+    rows, unparsed = parse_text(TEXT)
+    items = list(iter_parse_lines(TEXT.splitlines()))
+    assert [i for i in items if not isinstance(i, str)] == rows
+    assert [i for i in items if isinstance(i, str)] == unparsed
+
+
+def test_parse_stream_ndjson_text():
+    client = TestClient(app)
+    resp = client.post("/api/v1/parse/stream", json={"text": TEXT})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    frames = [json.loads(line) for line in resp.text.splitlines()]
+    assert [f["type"] for f in frames] == ["row", "unparsed", "row", "summary"]
+    assert frames[0]["row"]["test_name"] == "Hemoglobin"
+    assert frames[-1]["rows"] == 2 and frames[-1]["unparsed_lines"] == 1
+
+
+def test_parse_stream_sse_pdf_pages():
+    pdf_bytes = make_multipage_pdf(["Glucose 100 mg/dL 70-99", "Sodium 140 mmol/L 135-145"])
+    client = TestClient(app)
+    files = {"file": ("sample.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    resp = client.post("/api/v1/parse/stream?format=sse", files=files)
+    assert resp.status_code == 200
+    events = [block.split("\n") for block in resp.text.strip().split("\n\n")]
+    rows = [json.loads(e[1][len("data: ") :]) for e in events if e[0] == "event: row"]
+    assert [(r["page"], r["row"]["test_name"]) for r in rows] == [(1, "Glucose"), (2, "Sodium")]
+    assert events[-1][0] == "event: summary"
+
+
+def test_parse_stream_pdf_is_admitted_by_the_parse_pool(monkeypatch):
+    pool = WorkerPool("parse", workers=1, queue_size=0, timeout_s=5)
+    pool._pending = pool.max_pending  # simulate a full queue
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    pdf_bytes = make_multipage_pdf(["Glucose 100 mg/dL 70-99"])
+    files = {"file": ("sample.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    resp = TestClient(app).post("/api/v1/parse/stream", files=files)
+    assert resp.status_code == 503
+    assert int(resp.headers["retry-after"]) >= 1
+    assert pool.stats()["rejected"] == 1
+
+
+def test_parse_stream_page_jobs_time_out(monkeypatch):
+    # Pages are read a job at a time; one that overruns PARSE_JOB_TIMEOUT_S ends the stream
+    def slow_second_job(source, options, indexes):
+        if indexes[0] > 0:
+            time.sleep(0.5)
+        return parse_pdf_pages(source, options, indexes)
+
+    pool = WorkerPool("parse", workers=0, queue_size=1, timeout_s=0.2)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    monkeypatch.setattr(parse, "parse_pdf_pages", slow_second_job)
+    monkeypatch.setenv("PARSE_STREAM_PAGES_PER_JOB", "1")
+    pdf_bytes = make_multipage_pdf(["Glucose 100 mg/dL 70-99", "Sodium 140 mmol/L 135-145"])
+    files = {"file": ("sample.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+    resp = TestClient(app).post("/api/v1/parse/stream", files=files)
+    frames = [json.loads(line) for line in resp.text.splitlines()]
+    assert [f["type"] for f in frames] == ["row", "error"]
+    assert frames[-1]["status"] == 504
+    assert pool.stats()["timed_out"] == 1
+    pool.shutdown()
@@ -0,0 +1,84 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from test_parse_stream import make_multipage_pdf
+
+from app.main import app
+from app.services import workers
+from app.services.parser import parse_text
+from app.services.pdf import extract_pdf_text, parse_pdf
+from app.services.uploads import UploadTooLargeError, spool_upload
+from app.services.workers import WorkerPool
+
+PAGES = ["Hemoglobin 13.2 g/dL 12.0-15.5", "Glucose 130 mg/dL 70-99", "Sodium 140 mmol/L 135-145"]
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    pool = WorkerPool("parse", workers=0, queue_size=4, timeout_s=10)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), size=len(data), filename="r.pdf")
+
+
+def test_spool_upload_small_in_memory_large_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOAD_TMP_DIR", str(tmp_path))
+    data = make_multipage_pdf(PAGES)
+
+    small = asyncio.run(spool_upload(_upload(data), max_bytes=10**7, threshold=len(data)))
+    assert small.path is None and small.source == data
+
+    large = asyncio.run(spool_upload(_upload(data), max_bytes=10**7, threshold=64))
+    assert large.path is not None and large.size == len(data)
+    with open(large.path, "rb") as f:
+        assert f.read() == data
+    large.close()
+    assert os.listdir(tmp_path) == []
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(_upload(data), max_bytes=100, threshold=64))
+    assert os.listdir(tmp_path) == []
+
+
+def test_parse_pdf_by_path_matches_whole_text(tmp_path):
+    data = make_multipage_pdf(PAGES)
+    path = tmp_path / "r.pdf"
+    path.write_bytes(data)
+    assert parse_pdf(str(path))[:2] == parse_text(extract_pdf_text(data))
+    assert parse_pdf(data)[:2] == parse_pdf(str(path))[:2]
+
+
+def test_parse_spools_large_upload_and_cleans_up(thread_pool, tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOAD_TMP_DIR", str(tmp_path))
+    monkeypatch.setenv("UPLOAD_SPOOL_MAX_BYTES", "64")
+    client = TestClient(app)
+    files = {"file": ("r.pdf", make_multipage_pdf(PAGES), "application/pdf")}
+    resp = client.post("/api/v1/parse", files=files)
+    assert resp.status_code == 200
+    assert [r["test_name"] for r in resp.json()["rows"]] == ["Hemoglobin", "Glucose", "Sodium"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_parse_rejects_oversized_and_long_pdfs(thread_pool, monkeypatch):
+    client = TestClient(app)
+    data = make_multipage_pdf(PAGES)
+
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", "100")
+    resp = client.post("/api/v1/parse", files={"file": ("r.pdf", data, "application/pdf")})
+    assert resp.status_code == 413
+
+    monkeypatch.delenv("UPLOAD_MAX_BYTES")
+    monkeypatch.setenv("PARSE_MAX_PAGES", "2")
+    resp = client.post("/api/v1/parse", files={"file": ("r.pdf", data, "application/pdf")})
+    assert resp.status_code == 413
+    assert "3 pages" in resp.json()["detail"]
+    resp = client.post("/api/v1/parse/stream", files={"file": ("r.pdf", data, "application/pdf")})
+    assert resp.status_code == 413
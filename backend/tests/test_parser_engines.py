@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from app.services.parser import iter_parse_lines, parse_text
+
+CORPUS = """
+Laboratory Report
+Patient: Jane Doe
+Page 1 of 2
+Hemoglobin 13.2 g/dL 12.0-15.5
+LDL Cholesterol 210 mg/dL ≤ 200
+WBC 5.4 10^9/L 3.5-11.0
+COVID-19 PCR: Positive
+HIV 1/2 Ab: Non-Reactive
+Hepatitis C Ab: non reactive
+Glucose 100 mg/dL 70-99
+HbA1c 5.6 % 4.0 – 5.6
+Vitamin D [repeat] 18* ng/mL >= 30
+Ferritin 12 ng/mL Reference range: 15 - 150
+TSH 2.1 mIU/L REFERENCE INTERVAL 0.4-4.0
+Free T4 1.2.3-4 ng/dL
+Creatinine   0.9	mg/dL   0.6 –1.2
+eGFR 95 ≥ 60
+Comments: specimen received at ambient temperature
+- 12 -
+    Sodium 140 mmol/L 135-145
+Platelets: 250 10^9/L (150-400)
+Urine culture: negative
+**
+[redacted]
+""".strip()
+
+FRAGMENTS = [
+    "Hemoglobin",
+    "HbA1c",
+    "Sodium",
+    "COVID-19 PCR",
+    " ",
+    "  ",
+    "\t",
+    " ",
+    ":",
+    "-",
+    "–",
+    "≤",
+    "<=",
+    "≥",
+    ">=",
+    "13.2",
+    "1.2.3",
+    "12.0-15.5",
+    "70 - 99",
+    "4.0–5.6",
+    "0",
+    "١٢",
+    "g/dL",
+    "mg/dL",
+    "10^9/L",
+    "%",
+    "mIU/L",
+    "Reference range:",
+    "REFERENCE interval",
+    "positive",
+    "Non-Reactive",
+    "non reactive",
+    "reactive",
+    "[note]",
+    "[",
+    "]",
+    "*",
+    "**",
+    "Page 2",
+    "page",
+    "Patient:",
+    "x",
+    "(",
+    ")",
+]
+
+
+def _fuzz_lines(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 8)))
+
+
+def test_scan_engine_matches_regex_engine_on_corpus():
+    assert parse_text(CORPUS, engine="scan") == parse_text(CORPUS, engine="regex")
+
+
+def test_scan_engine_matches_regex_engine_line_by_line():
+    lines = list(_fuzz_lines(20000))
+    regex_items = list(iter_parse_lines(lines, engine="regex"))
+    scan_items = list(iter_parse_lines(lines, engine="scan"))
+    assert scan_items == regex_items
+
+
+def test_engine_selected_from_env(monkeypatch):
+    monkeypatch.setenv("PARSER_ENGINE", "scan")
+    assert parse_text(CORPUS) == parse_text(CORPUS, engine="regex")
+    monkeypatch.setenv("PARSER_ENGINE", "nope")
+    with pytest.raises(ValueError):
+        parse_text(CORPUS)
@@ -0,0 +1,90 @@
+import os
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+from test_parser_pdf import make_pdf_bytes
+
+from app.main import app
+from app.services import profiling, workers
+from app.services.workers import WorkerPool
+
+TEXT = "Glucose 130 mg/dL 70-99 SECRET-PATIENT-MARKER"
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("PROFILE_SECRET", "s3cret")
+    return tmp_path
+
+
+def _read_all(directory) -> bytes:
+    return b"".join((directory / name).read_bytes() for name in os.listdir(directory))
+
+
+def test_profile_header_writes_artifacts_without_request_data(profiles):
+    client = TestClient(app)
+    resp = client.post("/api/v1/parse", json={"text": TEXT}, headers={"X-Profile": "s3cret"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["X-Profile-Id"]
+    assert sorted(os.listdir(profiles)) == [f"{profile_id}.pstats", f"{profile_id}.txt"]
+
+    stats = pstats.Stats(str(profiles / f"{profile_id}.pstats"))
+    assert any(func[2] == "parse_text" for func in stats.stats)
+    summary = (profiles / f"{profile_id}.txt").read_text()
+    assert "route: /api/v1/parse" in summary and "scope: event loop thread" in summary
+    assert b"SECRET-PATIENT-MARKER" not in _read_all(profiles)
+
+
+def test_profiling_is_off_without_secret_or_with_wrong_header(profiles, monkeypatch):
+    client = TestClient(app)
+    resp = client.post("/api/v1/parse", json={"text": TEXT}, headers={"X-Profile": "guess"})
+    assert "X-Profile-Id" not in resp.headers
+
+    monkeypatch.delenv("PROFILE_SECRET")
+    monkeypatch.setenv("PROFILE_SAMPLE_EVERY", "1")
+    resp = client.post("/api/v1/parse", json={"text": TEXT}, headers={"X-Profile": ""})
+    assert "X-Profile-Id" not in resp.headers
+    assert os.listdir(profiles) == []
+
+
+def test_sampling_profiles_every_nth_request(profiles, monkeypatch):
+    monkeypatch.setenv("PROFILE_SAMPLE_EVERY", "1")
+    resp = TestClient(app).get("/api/v1/health")
+    assert "X-Profile-Id" in resp.headers
+
+
+def test_worker_jobs_of_profiled_request_are_profiled(profiles, monkeypatch):
+    pool = WorkerPool("parse", workers=0, queue_size=4, timeout_s=10)
+    monkeypatch.setattr(workers, "_parse_pool", pool)
+    try:
+        files = {"file": ("r.pdf", make_pdf_bytes("Glucose 130 mg/dL 70-99"), "application/pdf")}
+        resp = TestClient(app).post("/api/v1/parse", files=files, headers={"X-Profile": "s3cret"})
+    finally:
+        pool.shutdown()
+    assert resp.status_code == 200
+    worker_stats = profiles / f"{resp.headers['X-Profile-Id']}.worker1.pstats"
+    stats = pstats.Stats(str(worker_stats))
+    assert any(func[2] == "parse_pdf" for func in stats.stats)
+
+
+@pytest.mark.parametrize("error", [ValueError, RuntimeError])
+def test_failed_enable_releases_the_profiler(profiles, monkeypatch, error):
+    class Unavailable:
+        def enable(self):
+            raise error("profiler busy")
+
+    headers = {b"x-profile": b"s3cret"}
+    with monkeypatch.context() as m:
+        m.setattr(profiling.cProfile, "Profile", Unavailable)
+        if error is ValueError:
+            assert profiling.start_profile(headers) is None
+        else:
+            with pytest.raises(RuntimeError):
+                profiling.start_profile(headers)
+    assert profiling.current_profile() is None
+    # The next request can still be profiled
+    profile = profiling.start_profile(headers)
+    assert profile is not None
+    profiling.stop_profile(profile)
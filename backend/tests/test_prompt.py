@@ -0,0 +1,74 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import llm as llm_module
+from app.services.cache import TieredCache, TTLCache
+from app.services.prompt import encode_row, estimate_tokens, select_rows
+
+
+def row(i, flag=None):
+    return {
+        "test_name": f"Marker {i}",
+        "value": i,
+        "unit": "mg/dL",
+        "reference_range": "1-99",
+        "flag": flag,
+        "confidence": 0.8,
+    }
+
+
+def test_compact_encoding_drops_trailing_empty_fields():
+    assert encode_row("Glucose", 90, "mg/dL", None, None) == ["Glucose", 90, "mg/dL"]
+    assert encode_row("HIV Ab", "Negative", None, None, "normal") == [
+        "HIV Ab",
+        "Negative",
+        None,
+        None,
+        "normal",
+    ]
+
+
+def test_estimate_tokens_is_in_the_right_range():
+    text = json.dumps([row(i) for i in range(20)])
+    # Real tokenizers give roughly one token per 3-4 characters of JSON like this
+    assert len(text) / 5 < estimate_tokens(text) < len(text) / 2
+    assert estimate_tokens("") == 1
+
+
+def test_select_rows_prefers_abnormal_and_keeps_order():
+    rows = [encode_row(f"Marker {i}", i, "mg/dL", "1-9", None) for i in range(50)]
+    rows[40][4:] = ["high"]
+    rows[45][4:] = ["low"]
+    budget = 10 * estimate_tokens(json.dumps(rows[0]))
+    selected, elided = select_rows(rows, budget)
+    assert rows[40] in selected and rows[45] in selected
+    assert selected == sorted(selected, key=rows.index)
+    assert len(selected) + elided == 50 and elided >= 40
+
+
+def test_prompt_is_compact_and_meta_counts_rows(monkeypatch):
+    prompts = []
+
+    async def fake_call(prompt, timeout_s):
+        prompts.append(prompt)
+        return "not json"
+
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "120")
+    monkeypatch.setattr(llm_module, "_call_openai_chat", fake_call)
+    monkeypatch.setattr(llm_module, "_interpret_cache", TieredCache(TTLCache(8, 60)))
+    monkeypatch.setattr(llm_module, "_breaker", None)
+
+    rows = [row(i) for i in range(40)] + [row(99, "high")]
+    resp = TestClient(app).post("/api/v1/interpret", json={"rows": rows})
+    meta = resp.json()["meta"]
+    assert meta["rows"]["included"] + meta["rows"]["elided"] == 41
+    assert 0 < meta["rows"]["included"] < 41
+
+    prompt = prompts[0]
+    assert '"test_name"' not in prompt.split("ROWS:\n", 1)[1]
+    encoded = json.loads(prompt.split("ROWS:\n", 1)[1])
+    assert ["Marker 99", 99, "mg/dL", "1-99", "high"] in encoded
+    assert len(encoded) == meta["rows"]["included"]
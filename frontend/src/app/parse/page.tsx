@@ -14,6 +14,8 @@ type Row = {
   reference_range: string | null;
   flag: 'low' | 'high' | 'normal' | 'abnormal' | null;
   confidence: number;
+  test_code?: string | null;
+  unit_canonical?: string | null;
 };
 
 export default function ParsePage() {